@@ -0,0 +1,172 @@
+# Importing necessary libraries and files
+import copy
+import numpy as np
+import measurement
+
+
+## Check that all spaces share the grid, time step and polarisation, so their fields can be stacked
+def check_compatible(spaces):
+    reference = spaces[0]
+    for box in spaces[1:]:
+        if (
+            box.N_x,
+            box.N_y,
+            box.N_t,
+            box.Delta_x,
+            box.Delta_y,
+            box.Delta_t,
+            box.dtype,
+            box.polarization,
+        ) != (
+            reference.N_x,
+            reference.N_y,
+            reference.N_t,
+            reference.Delta_x,
+            reference.Delta_y,
+            reference.Delta_t,
+            reference.dtype,
+            reference.polarization,
+        ):
+            raise ValueError(
+                "All spaces of a batch need the same discretization, duration and polarization"
+            )
+
+
+### Parts class: the absorbing boundaries of all spaces of a batch, updated like a single one
+class Parts:
+    def __init__(self, parts):
+        self.parts = parts
+
+    def update_H(self):
+        for part in self.parts:
+            part.update_H()
+
+    def update_E(self):
+        for part in self.parts:
+            part.update_E()
+
+
+### Bound_monitor class: a running DFT of one space of a batch, which the time loop of the batch updates
+class Bound_monitor:
+    def __init__(self, monitor, box):
+        self.monitor = monitor
+        self.box = box
+
+    def update(self, n, box):
+        self.monitor.update(n, self.box)
+
+
+## Implementation of the FDTD method for K spaces at once, using (K, N_x, N_y) field arrays
+def FDTD(spaces, eps_averaging=True, plot_space=False):
+    """Steps K spaces which only differ in dielectrics, sources and measurement points
+
+    The fields of all spaces are stacked into arrays with a leading axis of
+    length K, and Space.leapfrog steps the stack: the H and E updates of
+    Space (numpy backend) and the scatter-add of the line sources run once
+    per step for the whole batch, which spreads the overhead of the Python
+    loop over the batch and pays off for small grids. Everything a space
+    adds on top (absorbing boundary, lossy and dispersive dielectrics, plane
+    waves, refinements, frequency monitors and near-to-far-field
+    transforms) is prepared by the space itself on its view of the stack.
+
+    Parameters
+    ----------
+    spaces : list of Space
+        Spaces with source, discretization and measurement points, which
+        all share x_length, y_length, t_length, the discretization steps
+        and the polarization
+    eps_averaging : bool
+        See Space.initialize_space
+    plot_space : bool
+        See Space.initialize_space
+
+    Returns
+    -------
+    measurements : list
+        The measurement points of every space (as returned by Space.FDTD)
+    """
+    check_compatible(spaces)
+    K = len(spaces)
+
+    # Stacked zero-valued fields, the fields of every space are views into them
+    # (before prepare, so everything a space builds on its fields uses the views)
+    for name in spaces[0].fields:
+        field = np.zeros((K,) + getattr(spaces[0], name).shape, dtype=spaces[0].dtype)
+        for k, box in enumerate(spaces):
+            setattr(box, name, field[k])
+    for box in spaces:
+        box.prepare(eps_averaging, plot_space)
+
+    # The stack: the first space with the stacked fields, coefficients, work buffers and sources of all spaces
+    stack = copy.copy(spaces[0])
+    for name in stack.fields:
+        setattr(stack, name, getattr(spaces[0], name).base)
+    coefficients = (["C_ezx", "C_ezy"] if stack.TM else []) + (
+        ["C_exy", "C_eyx"] if stack.TE else []
+    )
+    for name in coefficients:
+        setattr(stack, name, np.stack([getattr(box, name) for box in spaces]))
+    buffers = (["dE_x", "dE_y", "dH"] if stack.TM else []) + (
+        ["dE", "dH_x", "dH_y"] if stack.TE else []
+    )
+    for name in buffers:
+        shape = (K,) + getattr(stack, name).shape
+        setattr(stack, name, np.empty(shape, dtype=stack.dtype))
+    stack.set_region()
+    # Line sources: (space, i, j) indices into the stacked E_z (and H_z), their terms stay float64 as in Space
+    stack.source_index = (
+        np.concatenate(
+            [np.full(len(box.sources), k, dtype=int) for k, box in enumerate(spaces)]
+        ),
+        np.concatenate([box.i_sources for box in spaces]),
+        np.concatenate([box.j_sources for box in spaces]),
+    )
+    stack.source_terms = np.concatenate([box.source_terms for box in spaces], axis=1)
+    if stack.TE:
+        stack.source_terms_TE = np.concatenate(
+            [box.source_terms_TE for box in spaces], axis=1
+        )
+
+    # The additions of every space keep working on the views of their own space
+    stack.tfsf = [injection for box in spaces for injection in box.tfsf]
+    stack.materials = [material for box in spaces for material in box.materials]
+    stack.subgrids = [patch for box in spaces for patch in box.subgrids]
+    pmls = [box.pml for box in spaces if box.pml is not None]
+    stack.pml = Parts(pmls) if len(pmls) > 0 else None
+    stack.frequency_monitors = [
+        Bound_monitor(monitor, box) for box in spaces for monitor in box.running_dfts()
+    ]
+    stack.far_fields = []
+
+    # One recorder for the measurement points of all spaces, every space keeps a view of its part
+    stack.recorder = measurement.Recorder(
+        np.concatenate([box.measurement_points for box in spaces]),
+        np.concatenate([box.recorder.indices_x for box in spaces]),
+        np.concatenate([box.recorder.indices_y for box in spaces]),
+        stack.N_t,
+        stack.dtype,
+        indices_batch=np.concatenate(
+            [[k] * len(box.measurement_points) for k, box in enumerate(spaces)]
+        ),
+        components=stack.fields,
+    )
+    offset = 0
+    for box in spaces:
+        box.recorder.attach(
+            stack.recorder.data[offset : offset + len(box.measurement_points)]
+        )
+        offset += len(box.measurement_points)
+
+    # The time loop of Space, without snapshots, checkpoints, stopping policies or an active region
+    stack.checkpoint = None
+    stack.growing = False
+    stack.set_stop()
+    stack.set_profiler()
+    last, stopped_by = stack.leapfrog(1)
+    for box in spaces:
+        box.set_stop()
+        box.set_profiler()
+        box.skipped_updates = 0
+        box.finish(1, last, stopped_by)
+
+    return [box.measurement_points for box in spaces]
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Importing necessary libraries and files
+import argparse
+import importlib.util
+import itertools
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import stopping
+import cache
+
+# Cases of the default and the quick benchmark suite
+MATRIX = {
+    "cells": [128, 256, 512],
+    "probes": [1, 64],
+    "dielectrics": [0, 8],
+    "backend": ["numpy", "numba"],
+}
+QUICK_MATRIX = {
+    "cells": [64, 128],
+    "probes": [1, 64],
+    "dielectrics": [0, 8],
+    "backend": ["numpy", "numba"],
+}
+Delta = 10 ** (-3)  # [m]
+
+
+## Square space of cells x cells E_z points with a centered line source, dielectric cylinders and probes
+def build(cells, probes, dielectrics, steps):
+    Delta_t = 1 / (3 * c * np.sqrt(2 / Delta ** 2))
+    length = (cells - 1 / 2) * Delta
+    box = space.Space(length, length, (steps + 3 / 2) * Delta_t)
+    # Cylinders on a ring around the source
+    angles = 2 * np.pi * np.arange(dielectrics) / max(dielectrics, 1)
+    box.add_objects(
+        [
+            dielectric.Circle(
+                length * (1 + np.cos(angle) / 3) / 2,
+                length * (1 + np.sin(angle) / 3) / 2,
+                length / 20,
+                4,
+            )
+            for angle in angles
+        ]
+    )
+    box.set_source(
+        source.Gaussian_pulse(length / 2, length / 2, 1, 30 * Delta_t, 10 * Delta_t)
+    )
+    box.define_discretization(Delta, Delta, Delta_t)
+    # Probes on a wider ring
+    angles = 2 * np.pi * np.arange(probes) / probes
+    box.add_measurement_points(
+        [
+            (
+                length * (1 + np.cos(angle) / 1.5) / 2,
+                length * (1 + np.sin(angle) / 1.5) / 2,
+            )
+            for angle in angles
+        ]
+    )
+    return box
+
+
+## Time the time loop of one case (best of repeat runs) and measure its memory with tracemalloc
+def run_case(cells, probes, dielectrics, backend, steps, repeat, memory_steps):
+    """Benchmarks Space.FDTD for one case of the matrix
+
+    Returns
+    -------
+    result : dict
+        cell_updates_per_s : cells * steps / time of the time loop (best run)
+        setup_s : time of Space.prepare (eps_r and update coefficients)
+        peak_memory_bytes : peak of the memory allocated by the run (tracemalloc)
+        step_temporary_bytes : memory allocated and freed again within a step,
+            the largest over the measured steps
+        step_blocks : net amount of allocated memory blocks per step (0 without leaks)
+    """
+    result = {
+        "cells": cells,
+        "probes": probes,
+        "dielectrics": dielectrics,
+        "backend": backend,
+        "steps": steps,
+    }
+    if backend == "numba":
+        # Compile (or load the compiled kernels) outside of the timed runs
+        build(16, 1, 0, 2).FDTD(plot_space=False, backend="numba")
+
+    # Throughput: time of the time loop only
+    loops, setups = [], []
+    for _ in range(repeat):
+        box = build(cells, probes, dielectrics, steps)
+        start = time.perf_counter()
+        box.prepare(eps_averaging=True, backend=backend)
+        setups.append(time.perf_counter() - start)
+        box.set_stop()
+        box.set_profiler()
+        box.set_active_region()
+        box.checkpoint = None
+        start = time.perf_counter()
+        box.time_steps(1)
+        loops.append(time.perf_counter() - start)
+    result["loop_s"] = min(loops)
+    result["setup_s"] = min(setups)
+    result["cell_updates_per_s"] = (
+        box.N_x * box.N_y * box.run_info["steps"] / min(loops)
+    )
+
+    # Memory: a separate (shorter) run, as tracemalloc slows down allocations
+    # samples[n] = current and peak traced memory and allocated blocks after step n,
+    # in an array so the measurement itself doesn't allocate
+    samples = np.zeros((memory_steps + 1, 3), dtype=np.int64)
+
+    def measure(box, n):
+        samples[n, 2] = sys.getallocatedblocks()
+        samples[n, :2] = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        return n >= memory_steps
+
+    tracemalloc.start()
+    box = build(cells, probes, dielectrics, steps)
+    box.FDTD(
+        plot_space=False, backend=backend, stop=stopping.Callback(measure, interval=1)
+    )
+    tracemalloc.stop()
+    current, peak, blocks = samples[1:].T
+    # The peak was reset every step, so the peak of the setup is in the first sample
+    result["peak_memory_bytes"] = int(peak.max())
+    # The first steps allocate the lazily created buffers
+    result["step_temporary_bytes"] = int(np.max(peak[2:] - current[1:-1]))
+    result["step_blocks"] = float(np.mean(np.diff(blocks[2:])))
+    return result
+
+
+## Versions of the solver and its dependencies, and the machine (to compare results between runs)
+def environment():
+    versions = {
+        "solver": cache.solver_version(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+    try:
+        import numba
+
+        versions["numba"] = numba.__version__
+    except ImportError:
+        versions["numba"] = None
+    return {
+        "versions": versions,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+## Run all cases of a matrix (dict of lists, all combinations are run)
+def run(matrix=MATRIX, steps=200, repeat=3, memory_steps=10, progress=print):
+    results = []
+    cases = list(itertools.product(*matrix.values()))
+    for k, values in enumerate(cases, start=1):
+        case = dict(zip(matrix.keys(), values))
+        if case["backend"] == "numba" and importlib.util.find_spec("numba") is None:
+            continue
+        result = run_case(steps=steps, repeat=repeat, memory_steps=memory_steps, **case)
+        results.append(result)
+        if progress is not None:
+            progress(
+                "[{}/{}] {cells}^2 cells, {probes} probes, {dielectrics} dielectrics, {backend}: "
+                "{cell_updates_per_s:.3g} cell updates/s, peak {peak_memory_bytes} B, "
+                "{step_temporary_bytes} B temporaries per step".format(
+                    k, len(cases), **result
+                )
+            )
+    return {"environment": environment(), "results": results}
+
+
+## Throughput of the cases in both benchmark results, relative to a baseline
+def compare(baseline, results):
+    def key(result):
+        return (
+            result["cells"],
+            result["probes"],
+            result["dielectrics"],
+            result["backend"],
+        )
+
+    old = {key(result): result for result in baseline["results"]}
+    ratios = {}
+    for result in results["results"]:
+        if key(result) in old:
+            ratios[key(result)] = (
+                result["cell_updates_per_s"] / old[key(result)]["cell_updates_per_s"]
+            )
+    return ratios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite of Space.FDTD")
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("--quick", action="store_true", help="small grids only")
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--compare", default=None, help="earlier benchmark JSON to compare with"
+    )
+    args = parser.parse_args(argv)
+    results = run(QUICK_MATRIX if args.quick else MATRIX, args.steps, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    if args.compare is not None:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        for case, ratio in compare(baseline, results).items():
+            print("{}: {:.2f}x the throughput of the baseline".format(case, ratio))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# Importing necessary libraries and files
+import errno
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+import scenario
+
+# Modules whose code determines the outcome of Space.FDTD (the solver version is a hash of their code)
+SOLVER_MODULES = [
+    "constants",
+    "dielectric",
+    "dispersion",
+    "geometry",
+    "kernels",
+    "measurement",
+    "monitors",
+    "farfield",
+    "pml",
+    "source",
+    "space",
+    "stopping",
+    "subgrid",
+    "tfsf",
+]
+
+
+## Hash of the code of the solver modules, so results of an older solver are never reused
+def solver_version():
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in SOLVER_MODULES:
+        with open(os.path.join(directory, name + ".py"), "rb") as file:
+            digest.update(file.read())
+    return digest.hexdigest()
+
+
+### Cache class: content-addressed store of the measurements of Space.FDTD runs
+class Cache:
+    """On-disk cache of the probe data of FDTD runs
+
+    Every entry is a directory named after the key of the run: a hash of the
+    canonical JSON description of the scenario (scenario.describe), the
+    options of Space.FDTD and the solver version. A hit returns the
+    memory-mapped probe data instead of recomputing it. When the entries
+    take more than max_bytes, the least recently used ones are removed.
+
+    Store layout
+    ------------
+    data.npy : (n_probes, n_components, n) recorded fields of the measurement points (see Space.fields)
+    monitor_<k>.npy : values of the k-th frequency monitor (then of the near-to-far-field transforms)
+    run_info.json : the run_info of the space (time steps, steps saved, ...)
+
+    Parameters
+    ----------
+    path : str
+        Directory of the cache
+    max_bytes : int
+        Size bound of the cache
+    refresh : bool
+        Bypass the lookup: always run, and overwrite the stored entry
+    """
+
+    def __init__(self, path="./cache", max_bytes=2 * 1024 ** 3, refresh=False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.refresh = refresh
+        self.solver = solver_version()
+
+    ## Key of a run of Space.FDTD for a space and options, None when the run can't be described
+    def key(self, box, options):
+        description = scenario.describe(box)
+        # The titles of the measurement points don't change the outcome
+        description.pop("measurement_titles")
+        options = dict(options)
+        options["stop"] = [policy.to_dict() for policy in options.get("stop", [])]
+        if None in options["stop"]:
+            return None
+        text = json.dumps(
+            {"scenario": description, "options": options, "solver": self.solver},
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def entry(self, key):
+        return os.path.join(self.path, key)
+
+    ## Stored results of a run (memory-mapped, read-only) or None on a miss
+    def load(self, key):
+        entry = self.entry(key)
+        if self.refresh:
+            return None
+        # Another process may evict or replace the entry meanwhile: a file which is gone is a miss
+        try:
+            with open(os.path.join(entry, "run_info.json")) as file:
+                run_info = json.load(file)
+            data = np.load(os.path.join(entry, "data.npy"), mmap_mode="r")
+            monitors = [
+                np.load(os.path.join(entry, "monitor_{}.npy".format(k)), mmap_mode="r")
+                for k in range(run_info["monitors"])
+            ]
+            # The modification time of an entry is its last use
+            os.utime(entry)
+        except FileNotFoundError:
+            return None
+        return {"data": data, "monitors": monitors, "run_info": run_info["run_info"]}
+
+    ## Store the results of a finished run, then evict the least recently used entries
+    def store(self, key, box):
+        entry = self.entry(key)
+        # Written next to the entry and renamed, so a crash never leaves a half-written entry
+        temporary = "{}.tmp{}".format(entry, os.getpid())
+        os.makedirs(temporary, exist_ok=True)
+        np.save(os.path.join(temporary, "data.npy"), box.recorder.data)
+        for k, monitor in enumerate(box.running_dfts()):
+            np.save(os.path.join(temporary, "monitor_{}.npy".format(k)), monitor.values)
+        with open(os.path.join(temporary, "run_info.json"), "w") as file:
+            json.dump(
+                {"run_info": box.run_info, "monitors": len(box.running_dfts())},
+                file,
+            )
+        if os.path.isdir(entry) and not self.refresh:
+            # Another process stored the same run meanwhile: the same key means the same results
+            shutil.rmtree(temporary, ignore_errors=True)
+        else:
+            shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.replace(temporary, entry)
+            except OSError as error:
+                shutil.rmtree(temporary, ignore_errors=True)
+                # Another process stored the entry between the removal and the renaming
+                if error.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                    raise
+        self.evict()
+
+    ## Entries with their size [bytes] and last use, the least recently used first
+    def entries(self):
+        if not os.path.isdir(self.path):
+            return []
+        entries = []
+        for name in os.listdir(self.path):
+            entry = self.entry(name)
+            if ".tmp" in name or not os.path.isdir(entry):
+                continue
+            # Entries which another process removes meanwhile are skipped
+            try:
+                size = sum(
+                    os.path.getsize(os.path.join(entry, file))
+                    for file in os.listdir(entry)
+                )
+                entries.append((os.path.getmtime(entry), size, entry))
+            except FileNotFoundError:
+                continue
+        return sorted(entries)
+
+    ## Total size of the cache [bytes]
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    ## Remove the least recently used entries until the cache fits in max_bytes
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    ## Remove all entries
+    def clear(self):
+        for _, _, entry in self.entries():
+            shutil.rmtree(entry, ignore_errors=True)
+
+    def __str__(self):
+        return "Cache at {} ({} entries, {:.3g} MB of {:.3g} MB)".format(
+            self.path,
+            len(self.entries()),
+            self.size() / 1024 ** 2,
+            self.max_bytes / 1024 ** 2,
+        )
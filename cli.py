@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Importing necessary libraries and files
+# The solver is only imported by the jobs, and matplotlib only by jobs that plot
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# Current profiles of the line source, as numbered in the dialog of main.py
+PROFILES = {1: "Gaussian_pulse", 2: "Gaussian_modulated_rf_pulse"}
+
+
+## Read a scenario file (.json or .toml)
+def read_scenario(path):
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as file:
+            return tomllib.load(file)
+    with open(path) as file:
+        return json.load(file)
+
+
+## Description of the space of a scenario file, as understood by scenario.build
+def describe(config):
+    """Turns the fields of a scenario file into a description for scenario.build
+
+    A scenario file holds the fields asked by the dialog of main.py:
+
+    - space: x_length, y_length, t_length (and optionally polarization:
+      "TM", "TE" or "TE+TM")
+    - dielectrics: list of pos_x, pos_y, width, height, eps_r (rectangles,
+      other shapes of dielectric.py with an extra "type"), optionally with a
+      conductivity sigma and poles (e.g. {"type": "Debye", "delta_eps": 8,
+      "tau": 1e-11})
+    - eps_averaging: true or false
+    - source: pos_x, pos_y, profile (1 or "Gaussian_pulse", 2 or
+      "Gaussian_modulated_rf_pulse") and its parameters J0, sigma, tc (and omega_c)
+    - discretization: Delta_x, Delta_y, Delta_t
+    - measurement_points: list of [x, y]
+    - visualize_fields: seconds between the field snapshots, or 0
+
+    and optionally absorbing_boundary: thickness (and the other arguments
+    of Space.set_absorbing_boundary).
+
+    Parameters
+    ----------
+    config : dict
+
+    Returns
+    -------
+    description : dict
+    """
+    source = dict(config["source"])
+    profile = source.pop("profile", 1)
+    source["type"] = PROFILES.get(profile, profile)
+    absorbing_boundary = config.get("absorbing_boundary")
+    if isinstance(absorbing_boundary, (int, float)):
+        absorbing_boundary = {"thickness": absorbing_boundary}
+    points = [tuple(point) for point in config.get("measurement_points", [])]
+    return {
+        **config["space"],
+        **config["discretization"],
+        "dielectrics": [
+            dict(diel, type=diel.get("type", "Dielectric"))
+            for diel in config.get("dielectrics", [])
+        ],
+        "sources": [source],
+        "absorbing_boundary": absorbing_boundary,
+        "measurement_points": points,
+        "measurement_titles": [
+            "  at ({:g} , {:g})".format(point[0], point[1]) for point in points
+        ],
+    }
+
+
+## Scenario files in a directory (or the file itself)
+def find_scenarios(path):
+    if os.path.isdir(path):
+        return sorted(
+            os.path.join(path, name)
+            for name in os.listdir(path)
+            if name.endswith((".json", ".toml"))
+        )
+    return [path]
+
+
+## Build and simulate a single scenario file and write its probe data (runs in a worker process)
+def run_job(path, output, backend="numpy", plot=False):
+    import numpy as np
+    import scenario
+
+    start = time.perf_counter()
+    name = os.path.splitext(os.path.basename(path))[0]
+    try:
+        config = read_scenario(path)
+        box = scenario.build(describe(config))
+        visualize_fields = int(config.get("visualize_fields", 0) // box.Delta_t)
+        snapshot_path = os.path.join(output, name + "_snapshots")
+        box.FDTD(
+            eps_averaging=bool(config.get("eps_averaging", False)),
+            plot_space=plot,
+            visualize_fields=visualize_fields,
+            backend=backend,
+            snapshot_path=snapshot_path,
+        )
+        # Probe data (n_probes, n_components, N_t): the components of the polarization (H_x, H_y, E_z for TM,
+        # E_x, E_y, H_z for TE, all six for TE+TM) of every measurement point
+        np.savez(
+            os.path.join(output, name + ".npz"),
+            data=box.recorder.data,
+            components=np.array(box.fields),
+            polarization=box.polarization,
+            Delta_t=box.Delta_t,
+            measurement_points=np.array(
+                [[meas.pos_x, meas.pos_y] for meas in box.measurement_points]
+            ).reshape(-1, 2),
+        )
+        if plot:
+            plot_job(box, name, snapshot_path if visualize_fields != 0 else None)
+        return {
+            "name": name,
+            "cells": box.N_x * box.N_y,
+            "steps": box.run_info["steps"],
+            "duration": time.perf_counter() - start,
+        }
+    except Exception:
+        return {
+            "name": name,
+            "error": traceback.format_exc(),
+            "duration": time.perf_counter() - start,
+        }
+
+
+## The plots of main.py for a finished job (saved in ./plots)
+def plot_job(box, name, snapshot_path=None):
+    import measurement
+    import snapshots
+
+    if snapshot_path is not None:
+        snapshots.render(snapshot_path, os.path.join("./plots", name))
+    measurements = box.measurement_points
+    measurement.plot(
+        measurements[0].time_E,
+        box.source.get_current(measurements[0].time_E),
+        "time [s]",
+        "current [A]",
+        "Source current",
+        filename=name + "_current",
+    )
+    # One plot per recorded component, so the TE fields are plotted as well
+    for meas in measurements:
+        for field in box.fields:
+            meas.plot_field(field, filename=field + name + meas.title)
+
+
+## Print the timing of a finished job
+def print_job(done, total, job):
+    if "error" in job:
+        print(
+            "[{}/{}] {}: failed after {:.2f} s".format(
+                done, total, job["name"], job["duration"]
+            )
+        )
+        print(job["error"])
+    else:
+        print(
+            "[{}/{}] {}: {} cells, {} steps, {:.2f} s ({:.3g} cell updates/s)".format(
+                done,
+                total,
+                job["name"],
+                job["cells"],
+                job["steps"],
+                job["duration"],
+                job["cells"] * job["steps"] / job["duration"],
+            )
+        )
+    sys.stdout.flush()
+
+
+## Run all scenario files at path, returns the amount of failed jobs
+def run(path, output="./results", workers=None, backend="numpy", plot=False):
+    paths = find_scenarios(path)
+    os.makedirs(output, exist_ok=True)
+    workers = min(workers or os.cpu_count(), len(paths))
+    failed = 0
+    if workers <= 1:
+        jobs = (run_job(path, output, backend, plot) for path in paths)
+        for done, job in enumerate(jobs, start=1):
+            print_job(done, len(paths), job)
+            failed += "error" in job
+        return failed
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_job, path, output, backend, plot): path for path in paths
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            try:
+                job = future.result()
+            except Exception:
+                # The worker itself died (e.g. killed or out of memory)
+                job = {
+                    "name": futures[future],
+                    "error": traceback.format_exc(),
+                    "duration": 0,
+                }
+            print_job(done, len(paths), job)
+            failed += "error" in job
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Non-interactive FDTD simulations of scenario files"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser(
+        "run", help="simulate a scenario file or a directory of them"
+    )
+    run_parser.add_argument("path", help=".json/.toml scenario file or directory")
+    run_parser.add_argument(
+        "-o", "--output", default="./results", help="directory of the probe data"
+    )
+    run_parser.add_argument(
+        "-j", "--workers", type=int, default=None, help="worker processes"
+    )
+    run_parser.add_argument("--backend", default="numpy", choices=["numpy", "numba"])
+    run_parser.add_argument(
+        "--plot", action="store_true", help="save the plots of main.py in ./plots"
+    )
+    args = parser.parse_args(argv)
+    # Never open a window in a batch job, the plots are only saved (see plotting.py)
+    os.environ.setdefault("EM_SCATTERING_HEADLESS", "1")
+    failed = run(args.path, args.output, args.workers, args.backend, args.plot)
+    return 1 if failed > 0 else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+# Importing necessary libraries and files
+import multiprocessing as mp
+import os
+from multiprocessing import shared_memory
+import numpy as np
+
+
+### Shared_array class: Numpy array in a block of shared memory, which worker processes attach to by name
+class Shared_array:
+    ## Allocate a new block (name=None) or attach to an existing one
+    def __init__(self, shape, dtype=np.float64, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        if name is None:
+            size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            # Workers share the resource tracker of the main process, which unlinks the block
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)
+
+    ## Allocate a block holding a copy of the given array
+    @classmethod
+    def from_array(cls, array):
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    ## Pickling only sends the name of the block, the worker attaches to it
+    def __getstate__(self):
+        return self.shape, self.dtype.str, self.shm.name
+
+    def __setstate__(self, state):
+        shape, dtype, name = state
+        self.__init__(shape, dtype, name)
+
+    ## Release (and for the creating process: remove) the shared memory
+    def release(self, unlink=True):
+        self.array = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+## Split the rows 0..N_x-1 of E_z into one contiguous slab per worker: [(i_start, i_end), ...]
+def split_rows(N_x, workers):
+    bounds = np.linspace(0, N_x, workers + 1).astype(int)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+## Step the fields of one slab of rows for all time steps (runs in a worker process)
+def step_slab(rows, fields, coefficients, source, recording, barrier):
+    E_z, H_x, H_y, data = (shared.array for shared in fields)
+    C_ezx, C_ezy = (shared.array for shared in coefficients[:2])
+    C_hx, C_hy = coefficients[2:]
+    N_x, N_y = E_z.shape
+    N_t = data.shape[-1]
+    i_start, i_end = rows
+
+    # Owned rows: H_x and E_z rows i_start..i_end-1, H_y rows up to N_x-2 (it has one row less)
+    # The halo rows (E_z[i_end] for H_y, H_y[i_start-1] for E_z) are owned by the neighbours
+    # and read from shared memory once the barrier guarantees they are up to date
+    hy_end = min(i_end, N_x - 1)
+    ez_start, ez_end = max(i_start, 1), min(i_end, N_x - 1)
+    dE_x = np.empty((hy_end - i_start, N_y), dtype=E_z.dtype)
+    dE_y = np.empty((i_end - i_start, N_y - 1), dtype=E_z.dtype)
+    dH = np.empty((max(ez_end - ez_start, 0), N_y - 2), dtype=E_z.dtype)
+
+    # Update views of the owned rows
+    H_y_own, E_z_x = H_y[i_start:hy_end], E_z[i_start : hy_end + 1]
+    H_x_own, E_z_own = H_x[i_start:i_end], E_z[i_start:i_end]
+    E_z_inner = E_z[ez_start:ez_end, 1:-1]
+    H_y_e, H_x_e = H_y[ez_start - 1 : ez_end, 1:-1], H_x[ez_start:ez_end]
+    C_ezx_own, C_ezy_own = (
+        C_ezx[ez_start - 1 : ez_end - 1],
+        C_ezy[ez_start - 1 : ez_end - 1],
+    )
+
+    # Sources and measurement points which lie in this slab
+    i_source, j_source, source_terms = source
+    owned = (i_source >= i_start) & (i_source < i_end)
+    i_source, j_source = i_source[owned], j_source[owned]
+    source_terms = source_terms[:, owned]
+    probes, i_probe, j_probe = recording
+    owned = (i_probe >= i_start) & (i_probe < i_end)
+    probes, i_probe, j_probe = probes[owned], i_probe[owned], j_probe[owned]
+
+    for n in range(1, N_t):
+        # 1-2: Update H_y and H_x
+        np.subtract(E_z_x[1:], E_z_x[:-1], out=dE_x)
+        np.multiply(dE_x, C_hy, out=dE_x)
+        np.add(H_y_own, dE_x, out=H_y_own)
+        np.subtract(E_z_own[:, 1:], E_z_own[:, :-1], out=dE_y)
+        np.multiply(dE_y, C_hx, out=dE_y)
+        np.subtract(H_x_own, dE_y, out=H_x_own)
+        barrier.wait()
+
+        # 3: Update E_z and add the source currents
+        np.subtract(H_y_e[1:], H_y_e[:-1], out=dH)
+        np.multiply(dH, C_ezx_own, out=dH)
+        np.add(E_z_inner, dH, out=E_z_inner)
+        np.subtract(H_x_e[:, 1:], H_x_e[:, :-1], out=dH)
+        np.multiply(dH, C_ezy_own, out=dH)
+        np.subtract(E_z_inner, dH, out=E_z_inner)
+        np.subtract.at(E_z, (i_source, j_source), source_terms[n])
+
+        # 4: Saving measurements
+        data[probes, 0, n] = H_x[i_probe, j_probe]
+        data[probes, 1, n] = H_y[i_probe, j_probe]
+        data[probes, 2, n] = E_z[i_probe, j_probe]
+        barrier.wait()
+
+
+## Implementation of the FDTD method with the grid split over several processes
+def FDTD(box, workers=None, eps_averaging=True, plot_space=False):
+    """Runs Space.FDTD with the rows of the grid divided over worker processes
+
+    The fields live in shared memory. Every worker updates its own slab of
+    rows and reads the one-row halos of its neighbours directly from shared
+    memory. Barriers between the H and E updates keep the halos consistent.
+    Every element goes through the same operations as in Space.update_H and
+    Space.update_E, so the results equal those of the single-process solver.
+
+    Parameters
+    ----------
+    box : Space
+        Space with source, discretization and measurement points
+    workers : int
+        Number of worker processes (default: the amount of CPUs)
+    eps_averaging : bool
+        See Space.initialize_space
+    plot_space : bool
+        See Space.initialize_space
+
+    Returns
+    -------
+    measurements : numpy array of Measurement
+        The measurement points of the space, as returned by Space.FDTD
+    """
+    if box.polarization != "TM":
+        raise NotImplementedError(
+            "The decomposed solver only supports the TM polarisation"
+        )
+    if any(diel.is_dispersive() for diel in box.dielectrics):
+        raise NotImplementedError(
+            "The decomposed solver doesn't support lossy or dispersive dielectrics"
+        )
+    if box.absorbing_boundary is not None:
+        raise NotImplementedError("The decomposed solver only supports PEC walls")
+    if len(box.frequency_monitors) > 0:
+        raise NotImplementedError(
+            "The decomposed solver doesn't support frequency monitors"
+        )
+    if len(box.far_fields) > 0:
+        raise NotImplementedError(
+            "The decomposed solver doesn't support near-to-far-field transforms"
+        )
+    if len(box.plane_waves) > 0:
+        raise NotImplementedError("The decomposed solver doesn't support plane waves")
+    if len(box.refinements) > 0:
+        raise NotImplementedError("The decomposed solver doesn't support refinements")
+    workers = min(workers or os.cpu_count(), box.N_x)
+    box.initialize_space(eps_averaging, plot_space)
+    box.initialize_coefficients()
+    time_H = (np.arange(box.N_t) + 1 / 2) * box.Delta_t
+    time_E = np.arange(box.N_t) * box.Delta_t
+    for meas in box.measurement_points:
+        meas.set_time(time_H, time_E)
+
+    # Moving the fields, per-cell coefficients and measurement storage to shared memory
+    fields = [
+        Shared_array.from_array(array)
+        for array in (box.E_z, box.H_x, box.H_y, box.recorder.data)
+    ]
+    shared_coefficients = [
+        Shared_array.from_array(array) for array in (box.C_ezx, box.C_ezy)
+    ]
+    coefficients = shared_coefficients + [box.C_hx, box.C_hy]
+    source = (box.i_sources, box.j_sources, box.source_terms)
+    recording = (
+        np.arange(len(box.measurement_points)),
+        box.recorder.indices_x,
+        box.recorder.indices_y,
+    )
+
+    barrier = mp.Barrier(workers)
+    processes = [
+        mp.Process(
+            target=step_slab,
+            args=(rows, fields, coefficients, source, recording, barrier),
+        )
+        for rows in split_rows(box.N_x, workers)
+    ]
+    try:
+        for process in processes:
+            process.start()
+        # Waiting for the workers; if one of them dies the others are released from the barrier
+        while any(process.is_alive() for process in processes):
+            for process in processes:
+                process.join(timeout=0.1)
+                if process.exitcode not in (None, 0):
+                    barrier.abort()
+                    raise RuntimeError(
+                        "Worker {} exited with code {}".format(
+                            processes.index(process), process.exitcode
+                        )
+                    )
+        # Copying the results back into the space
+        for array, shared in zip(
+            (box.E_z, box.H_x, box.H_y, box.recorder.data), fields
+        ):
+            array[...] = shared.array
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        for shared in fields + shared_coefficients:
+            shared.release()
+
+    return box.measurement_points
@@ -1,18 +1,245 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0
+
+
 ### Dielectric class
 class Dielectric:
-    ## Intialization function with all properties
-    def __init__(self, pos_x, pos_y, width, height, eps_r):
+    ## Intialization function with all properties: eps_r (eps_inf of a dispersive material), conductivity sigma [S/m] and dispersion poles
+    def __init__(self, pos_x, pos_y, width, height, eps_r, sigma=0, poles=()):
         self.pos_x = pos_x
         self.pos_y = pos_y
         self.width = width
         self.height = height
         self.eps_r = eps_r
+        self.sigma = sigma
+        self.poles = list(poles)
+
+    ## Whether the material has losses or dispersion (which need the updates of dispersion.py)
+    def is_dispersive(self):
+        return self.sigma != 0 or len(self.poles) > 0
+
+    ## Complex relative permittivity at the angular frequencies omega (time dependence exp(j omega t))
+    def permittivity(self, omega):
+        omega = np.asarray(omega, dtype=float)
+        eps = self.eps_r - 1j * self.sigma / (omega * eps_0)
+        for pole in self.poles:
+            eps = eps + pole.susceptibility(omega)
+        return eps
+
+    ## Whether the points (x, y) lie inside the dielectric (element-wise for arrays)
+    def contains(self, x, y):
+        return (
+            (x >= self.pos_x)
+            & (x < self.pos_x + self.width)
+            & (y >= self.pos_y)
+            & (y < self.pos_y + self.height)
+        )
 
     ## String representation functions
     def __str__(self):
-        return "x: {}, y: {}, w: {}, h: {}, eps_r: {}".format(
-            self.pos_x, self.pos_y, self.width, self.height, self.eps_r
+        return (
+            "x: {}, y: {}, w: {}, h: {}, eps_r: {}".format(
+                self.pos_x, self.pos_y, self.width, self.height, self.eps_r
+            )
+            + self.losses()
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+    ## Conductivity and poles, for the string representation (empty for a plain dielectric)
+    def losses(self):
+        s = ", sigma: {}".format(self.sigma) if self.sigma != 0 else ""
+        return s + "".join(", {}".format(pole) for pole in self.poles)
+
+
+### Circle class: Circular dielectric, pos_x/pos_y/width/height describe its bounding box
+class Circle(Dielectric):
+    ## Intialization function with the centre, radius and eps_r
+    def __init__(self, center_x, center_y, radius, eps_r, sigma=0, poles=()):
+        super().__init__(
+            center_x - radius,
+            center_y - radius,
+            2 * radius,
+            2 * radius,
+            eps_r,
+            sigma,
+            poles,
+        )
+        self.center_x = center_x
+        self.center_y = center_y
+        self.radius = radius
+
+    def contains(self, x, y):
+        return (x - self.center_x) ** 2 + (y - self.center_y) ** 2 <= self.radius ** 2
+
+    def __str__(self):
+        return (
+            "circle x: {}, y: {}, r: {}, eps_r: {}".format(
+                self.center_x, self.center_y, self.radius, self.eps_r
+            )
+            + self.losses()
+        )
+
+
+### Polygon class: Dielectric bounded by a closed polygon, pos_x/pos_y/width/height describe its bounding box
+class Polygon(Dielectric):
+    ## Intialization function with the list of vertices [(x, y), ...] and eps_r
+    def __init__(self, vertices, eps_r, sigma=0, poles=()):
+        self.vertices = np.asarray(vertices, dtype=float)
+        x_min, y_min = self.vertices.min(axis=0)
+        x_max, y_max = self.vertices.max(axis=0)
+        super().__init__(
+            x_min, y_min, x_max - x_min, y_max - y_min, eps_r, sigma, poles
+        )
+
+    ## Even-odd rule: a point is inside if a ray in the +x direction crosses the edges an odd number of times
+    def contains(self, x, y):
+        inside = np.zeros(np.broadcast(x, y).shape, dtype=bool)
+        for (x_1, y_1), (x_2, y_2) in zip(
+            self.vertices, np.roll(self.vertices, -1, axis=0)
+        ):
+            if y_1 == y_2:
+                continue
+            crosses = (y_1 > y) != (y_2 > y)
+            x_cross = x_1 + (y - y_1) * (x_2 - x_1) / (y_2 - y_1)
+            inside ^= crosses & (x < x_cross)
+        return inside
+
+    def __str__(self):
+        return (
+            "polygon vertices: {}, eps_r: {}".format(self.vertices.tolist(), self.eps_r)
+            + self.losses()
+        )
+
+
+### Box class: Rectangular block of dielectric in a 3D space (see space3d.py), pos_x/pos_y/pos_z is its lower corner
+class Box:
+    ## Intialization function with the lower corner, the size along x, y and z and eps_r
+    def __init__(self, pos_x, pos_y, pos_z, width, height, depth, eps_r):
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.pos_z = pos_z
+        self.width = width
+        self.height = height
+        self.depth = depth
+        self.eps_r = eps_r
+
+    ## Whether the points (x, y, z) lie inside the dielectric (element-wise for arrays)
+    def contains(self, x, y, z):
+        return (
+            (x >= self.pos_x)
+            & (x < self.pos_x + self.width)
+            & (y >= self.pos_y)
+            & (y < self.pos_y + self.height)
+            & (z >= self.pos_z)
+            & (z < self.pos_z + self.depth)
+        )
+
+    def __str__(self):
+        return "box x: {}, y: {}, z: {}, w: {}, h: {}, d: {}, eps_r: {}".format(
+            self.pos_x,
+            self.pos_y,
+            self.pos_z,
+            self.width,
+            self.height,
+            self.depth,
+            self.eps_r,
         )
 
     def __repr__(self):
         return self.__str__()
+
+
+### Sphere class: Spherical dielectric in a 3D space, pos_x/.../depth describe its bounding box
+class Sphere(Box):
+    ## Intialization function with the centre, radius and eps_r
+    def __init__(self, center_x, center_y, center_z, radius, eps_r):
+        super().__init__(
+            center_x - radius,
+            center_y - radius,
+            center_z - radius,
+            2 * radius,
+            2 * radius,
+            2 * radius,
+            eps_r,
+        )
+        self.center_x = center_x
+        self.center_y = center_y
+        self.center_z = center_z
+        self.radius = radius
+
+    def contains(self, x, y, z):
+        return (x - self.center_x) ** 2 + (y - self.center_y) ** 2 + (
+            z - self.center_z
+        ) ** 2 <= self.radius ** 2
+
+    def __str__(self):
+        return "sphere x: {}, y: {}, z: {}, r: {}, eps_r: {}".format(
+            self.center_x, self.center_y, self.center_z, self.radius, self.eps_r
+        )
+
+
+### Debye class: relaxation pole, adds delta_eps / (1 + j omega tau) to eps_r (e.g. water)
+class Debye:
+    def __init__(self, delta_eps, tau):
+        self.delta_eps = delta_eps
+        self.tau = tau
+
+    def susceptibility(self, omega):
+        return self.delta_eps / (1 + 1j * omega * self.tau)
+
+    ## Coefficients (k, beta, d, c) of J = k J + beta (eps_0 d E - c P), P += Delta_t J (see dispersion.py)
+    def coefficients(self, Delta_t):
+        # Exact for a constant E over the time step: P relaxes towards eps_0 delta_eps E
+        return 0, (1 - np.exp(-Delta_t / self.tau)) / Delta_t, self.delta_eps, 1
+
+    def __str__(self):
+        return "Debye delta_eps: {}, tau: {}".format(self.delta_eps, self.tau)
+
+
+### Drude class: free electrons, adds -omega_p^2 / (omega^2 - j omega gamma) to eps_r (metals, plasmas)
+class Drude:
+    def __init__(self, omega_p, gamma):
+        self.omega_p = omega_p
+        self.gamma = gamma
+
+    def susceptibility(self, omega):
+        return -(self.omega_p ** 2) / (omega ** 2 - 1j * omega * self.gamma)
+
+    def coefficients(self, Delta_t):
+        k = (1 - self.gamma * Delta_t / 2) / (1 + self.gamma * Delta_t / 2)
+        return k, Delta_t / (1 + self.gamma * Delta_t / 2), self.omega_p ** 2, 0
+
+    def __str__(self):
+        return "Drude omega_p: {}, gamma: {}".format(self.omega_p, self.gamma)
+
+
+### Lorentz class: resonance, adds delta_eps omega_0^2 / (omega_0^2 - omega^2 + 2 j omega delta) to eps_r
+class Lorentz:
+    def __init__(self, delta_eps, omega_0, delta):
+        self.delta_eps = delta_eps
+        self.omega_0 = omega_0
+        self.delta = delta
+
+    def susceptibility(self, omega):
+        return (
+            self.delta_eps
+            * self.omega_0 ** 2
+            / (self.omega_0 ** 2 - omega ** 2 + 2j * omega * self.delta)
+        )
+
+    def coefficients(self, Delta_t):
+        k = (1 - self.delta * Delta_t) / (1 + self.delta * Delta_t)
+        return (
+            k,
+            Delta_t / (1 + self.delta * Delta_t),
+            self.delta_eps * self.omega_0 ** 2,
+            self.omega_0 ** 2,
+        )
+
+    def __str__(self):
+        return "Lorentz delta_eps: {}, omega_0: {}, delta: {}".format(
+            self.delta_eps, self.omega_0, self.delta
+        )
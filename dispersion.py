@@ -0,0 +1,179 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0
+import geometry
+
+
+### ADE class: conductivity and dispersion poles (auxiliary differential equations) of the dielectrics, for one E component
+class ADE:
+    """Lossy and dispersive dielectrics on the points of one E component of a Space
+
+    The dielectrics give every point eps_r (eps_inf), a conductivity sigma
+    and poles (dielectric.Debye, Drude and Lorentz), blended like eps_r
+    when eps_averaging is on. Every pole has a polarisation current J at
+    the half steps (and a polarisation P at the full steps):
+
+    J = k J + beta (eps_0 d E - c P),  P += Delta_t J
+
+    with (k, beta, d, c) from pole.coefficients. The lossless update of E
+    (the usual FDTD update, E' = E + Delta_t / (eps_0 eps_r) curl H) is
+    corrected afterwards for the conductivity (semi-implicit) and the
+    currents:
+
+    E = (E' - s E_old - Delta_t / (eps_0 eps_r) sum(J)) / (1 + s),
+    s = sigma Delta_t / (2 eps_0 eps_r)
+
+    All arrays only cover the points where a lossy or dispersive dielectric
+    is present (those of every pole only where its dielectric is), so a
+    small dispersive object takes little memory on a large grid.
+
+    Parameters
+    ----------
+    box : Space
+    E : numpy array
+        The (contiguous) field array of the component
+    eps_r : numpy array
+        eps_r at the inner points of the component
+    offset : (int, int)
+        Index in E of eps_r[0, 0]
+    N_x, N_y, origin :
+        Grid of geometry.property_map which gives the inner points of the component
+    """
+
+    def __init__(self, box, E, eps_r, offset, N_x, N_y, origin=(0, 0)):
+        dtype = box.dtype
+        grid = (N_x, N_y, box.Delta_x, box.Delta_y, box.eps_averaging)
+        dielectrics = box.dielectrics
+        sigma = geometry.property_map(
+            dielectrics,
+            [diel.sigma for diel in dielectrics],
+            *grid,
+            origin=origin,
+            background=0
+        )
+        covered = sigma != 0
+        # Fill fraction (what is visible on top) of every dispersive dielectric
+        weights = []
+        for k, diel in enumerate(dielectrics):
+            if len(diel.poles) == 0:
+                continue
+            weight = geometry.property_map(
+                dielectrics,
+                [float(l == k) for l in range(len(dielectrics))],
+                *grid,
+                origin=origin,
+                background=0
+            )
+            covered |= weight > 0
+            weights.append((diel, weight))
+        i, j = np.nonzero(covered)
+        # Flat indices of the covered points in E (the fields are contiguous, so reshape gives a view)
+        self.E = E.reshape(-1)
+        self.index = np.ravel_multi_index((i + offset[0], j + offset[1]), E.shape)
+        self.Delta_t = dtype.type(box.Delta_t)
+        # A fully covered rectangle (e.g. a slab) is updated through a view of E instead of the flat indices
+        self.view = None
+        shape = (len(i),)
+        if len(i) > 0 and len(i) == (np.ptp(i) + 1) * (np.ptp(j) + 1):
+            self.view = E[
+                i[0] + offset[0] : i[-1] + 1 + offset[0],
+                j[0] + offset[1] : j[-1] + 1 + offset[1],
+            ]
+            shape = self.view.shape
+            self.index = None
+
+        # Coefficients of the correction of E
+        eps_r = eps_r[i, j]
+        s = sigma[i, j] * box.Delta_t / (2 * eps_0 * eps_r)
+        self.C_new = (1 / (1 + s)).astype(dtype).reshape(shape)
+        self.C_old = (s / (1 + s)).astype(dtype).reshape(shape)
+        self.C_J = (
+            (box.Delta_t / (eps_0 * eps_r) / (1 + s)).astype(dtype).reshape(shape)
+        )
+
+        # Poles: (points among the covered ones, k, eps_0 beta d (weighted), beta c, J, P, work buffer)
+        # points is None when a pole covers all points, which saves the gather and scatter
+        self.poles = []
+        for diel, weight in weights:
+            points = np.nonzero(weight[i, j] > 0)[0]
+            weight = weight[i, j][points]
+            if len(points) == len(i):
+                points = None
+                weight = weight.reshape(shape)
+            for pole in diel.poles:
+                k, beta, d, c = pole.coefficients(box.Delta_t)
+                self.poles.append(
+                    (
+                        points,
+                        dtype.type(k),
+                        (eps_0 * beta * d * weight).astype(dtype),
+                        dtype.type(beta * c),
+                        np.zeros(weight.shape, dtype=dtype),
+                        np.zeros(weight.shape, dtype=dtype) if c != 0 else None,
+                        np.empty(weight.shape, dtype=dtype),
+                    )
+                )
+
+        # Work buffers: E before and after the lossless update, and the sum of the currents
+        self.E_old = np.empty(shape, dtype=dtype)
+        self.E_new = np.empty(shape, dtype=dtype) if self.view is None else self.view
+        self.J = np.zeros(shape, dtype=dtype)
+        self.work = np.empty(
+            max([pole[4].size for pole in self.poles], default=0), dtype=dtype
+        )
+
+    ## Before the E update: save E and advance the polarisation currents of all poles to the next half step
+    def update_currents(self):
+        if self.view is None:
+            np.take(self.E, self.index, out=self.E_old)
+        else:
+            np.copyto(self.E_old, self.view)
+        self.J.fill(0)
+        for points, k, C_E, C_P, J, P, E in self.poles:
+            work = self.work[: J.size].reshape(J.shape)
+            if points is None:
+                np.multiply(self.E_old, C_E, out=E)
+            else:
+                np.take(self.E_old, points, out=E)
+                np.multiply(E, C_E, out=E)
+            if P is not None:
+                np.multiply(P, C_P, out=work)
+                np.subtract(E, work, out=E)
+            np.multiply(J, k, out=J)
+            np.add(J, E, out=J)
+            if P is not None:
+                np.multiply(J, self.Delta_t, out=work)
+                np.add(P, work, out=P)
+            if points is None:
+                np.add(self.J, J, out=self.J)
+            else:
+                np.add.at(self.J.reshape(-1), points, J)
+
+    ## After the (lossless) E update: add the conductivity and the currents on the covered points
+    def update_E(self):
+        # E_new is the view of E itself for a rectangle, or else the gathered points
+        if self.view is None:
+            np.take(self.E, self.index, out=self.E_new)
+        np.multiply(self.E_new, self.C_new, out=self.E_new)
+        np.multiply(self.E_old, self.C_old, out=self.E_old)
+        np.subtract(self.E_new, self.E_old, out=self.E_new)
+        np.multiply(self.J, self.C_J, out=self.J)
+        np.subtract(self.E_new, self.J, out=self.E_new)
+        if self.view is None:
+            np.put(self.E, self.index, self.E_new)
+
+    ## Arrays which make up the state of the poles (for checkpoints)
+    def arrays(self):
+        arrays = []
+        for pole in self.poles:
+            arrays += [array for array in pole[4:6] if array is not None]
+        return arrays
+
+    ## Memory taken by the coefficients, currents and work buffers [bytes]
+    def nbytes(self):
+        arrays = [self.C_new, self.C_old, self.C_J, self.E_old, self.J, self.work]
+        if self.view is None:
+            arrays += [self.index, self.E_new]
+        for pole in self.poles:
+            arrays += [a for a in pole[:1] + pole[2:3] + pole[4:] if a is not None]
+        return sum(array.nbytes for array in arrays)
@@ -0,0 +1,221 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0, mu_0, c
+
+# Steps after which the phase of the running DFTs is computed anew instead of rotated, bounding its round-off
+PHASE_PERIOD = 1000
+
+
+### Near_to_far_field class: running DFTs of the tangential fields on a closed contour, transformed to the far field
+class Near_to_far_field:
+    """Far field and bistatic radar cross section (scattering width) of the TM fields
+
+    During FDTD, running DFTs of E_z and of the tangential H on the edges
+    of a rectangle around the scatterers are accumulated, as in
+    monitors.Frequency_monitor. The equivalent currents on the contour,
+    J_z = (n x H)_z and M = -n x E_z, radiate the far field
+
+    E_z(rho, phi) = sqrt(2j / (pi k rho)) exp(-j k rho) k / 4 (eta N_z - cos(phi) L_y + sin(phi) L_x)
+
+    with N and L the integrals of J and M times exp(j k (x cos(phi) + y sin(phi))).
+    The scattering width of a plane wave (source.Plane_wave) with incident
+    field E_inc(omega) at the centre of the contour is
+
+    sigma(phi) = 2 pi rho |E_z|^2 / |E_inc|^2 = k / 4 |eta N_z - cos(phi) L_y + sin(phi) L_x|^2 / |E_inc|^2
+
+    The contour should lie in vacuum, outside of the total-field regions of
+    the plane waves (so it only sees the scattered field) and inside the
+    absorbing boundary. Per time step, only the 2 (N_x' + N_y') points of
+    the contour are transformed.
+
+    Parameters
+    ----------
+    omegas : array
+        Angular frequencies [rad/s]
+    x, y : float
+        Lower left corner of the contour [m]
+    width, height : float
+        Size of the contour [m]
+    """
+
+    def __init__(self, omegas, x, y, width, height):
+        self.omegas = np.atleast_1d(np.asarray(omegas, dtype=np.float64))
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    ## Points of the contour and the indices of their fields, for the grid of a space (called by Space.FDTD)
+    def initialize(self, box):
+        self.Delta_t = box.Delta_t
+        # The contour runs along the E_z points i_0..i_1, j_0..j_1
+        i_0 = int(self.x / box.Delta_x)
+        i_1 = int((self.x + self.width) / box.Delta_x)
+        j_0 = int(self.y / box.Delta_y)
+        j_1 = int((self.y + self.height) / box.Delta_y)
+        if not (1 <= i_0 < i_1 <= box.N_x - 2) or not (1 <= j_0 < j_1 <= box.N_y - 2):
+            raise ValueError(
+                "The contour of a near-to-far-field transform must lie inside the space"
+            )
+        for injection in box.tfsf:
+            if not (
+                i_0 < injection.i0
+                and injection.i1 < i_1
+                and j_0 < injection.j0
+                and injection.j1 < j_1
+            ):
+                raise ValueError(
+                    "The contour of a near-to-far-field transform must enclose the total-field regions"
+                )
+
+        # Edges: E_z points (i, j) and their outward normal
+        i = np.arange(i_0, i_1 + 1)
+        j = np.arange(j_0, j_1 + 1)
+        edges = [
+            (np.full(len(j), i_0), j, (-1, 0)),
+            (np.full(len(j), i_1), j, (1, 0)),
+            (i, np.full(len(i), j_0), (0, -1)),
+            (i, np.full(len(i), j_1), (0, 1)),
+        ]
+        # The tangential H is H_y on the left and right edges, H_x on the bottom and top ones,
+        # H_y[i - 1, j] and H_y[i, j] (H_x[i, j - 1] and H_x[i, j]) lie on either side of E_z[i, j]
+        H_shapes = [box.H_y.shape] * 2 + [box.H_x.shape] * 2
+        steps = [(1, 0)] * 2 + [(0, 1)] * 2
+        index_E, index_H, normals, weights = [], [], [], []
+        for (i_E, j_E, normal), shape, step in zip(edges, H_shapes, steps):
+            index_E.append(np.ravel_multi_index((i_E, j_E), box.E_z.shape))
+            index_H.append(
+                [
+                    np.ravel_multi_index((i_E - step[0], j_E - step[1]), shape),
+                    np.ravel_multi_index((i_E, j_E), shape),
+                ]
+            )
+            normals.append(np.tile(normal, (len(i_E), 1)))
+            # Trapezoidal rule along the edge (the corners belong to two edges)
+            weight = np.full(len(i_E), box.Delta_x if step[1] else box.Delta_y)
+            weight[[0, -1]] /= 2
+            weights.append(weight)
+        self.vertical = len(j)
+        self.index_E = np.concatenate(index_E)
+        # The indices of the H points below, then above the E_z points, for H_y and for H_x
+        self.index_H = [
+            np.concatenate([np.concatenate(index) for index in zip(*index_H[:2])]),
+            np.concatenate([np.concatenate(index) for index in zip(*index_H[2:])]),
+        ]
+        self.normals = np.concatenate(normals)
+        self.weights = np.concatenate(weights)
+        # Positions of the points relative to the centre of the contour
+        self.center = (
+            (i_0 + i_1) / 2 * box.Delta_x,
+            (j_0 + j_1) / 2 * box.Delta_y,
+        )
+        self.positions = np.stack(
+            (
+                box.Delta_x * np.unravel_index(self.index_E, box.E_z.shape)[0],
+                box.Delta_y * np.unravel_index(self.index_E, box.E_z.shape)[1],
+            ),
+            axis=-1,
+        ) - np.array(self.center)
+
+        # The incident E_z of the first plane wave at the centre of the contour
+        self.incident = None
+        if len(box.tfsf) > 0:
+            injection = box.tfsf[0]
+            self.incident = (injection.e, int((i_0 + i_1) // 2) - injection.offset)
+
+        # values[:, 0]: DFT of E_z at the points (and of the incident field, last), values[:, 1]: DFT of the
+        # sum of the H points on either side, both with the phase of the E fields (see dfts)
+        points = len(self.index_E)
+        self.values = np.zeros((len(self.omegas), 2, points + 1), dtype=np.complex128)
+        self.samples = np.zeros((2, points + 1), dtype=box.dtype)
+        self.buffer = np.empty(
+            max(len(index) for index in self.index_H), dtype=box.dtype
+        )
+        self.work = np.empty((len(self.omegas), 2 * (points + 1)), dtype=np.complex128)
+        # exp(-j omega n Delta_t) Delta_t is updated by a rotation per step, and computed anew every PHASE_PERIOD steps
+        self.rotation = np.exp(-1j * self.omegas * self.Delta_t)
+        self.phase = None
+        self.next_step = None
+
+    ## Add the fields on the contour after time step n to the running DFTs
+    def update(self, n, box):
+        E, H = self.samples
+        vertical = 2 * self.vertical
+        np.take(box.E_z.reshape(-1), self.index_E, out=E[:-1])
+        if self.incident is not None:
+            E[-1] = self.incident[0][self.incident[1]]
+        # The tangential H at the E_z points: the H points on either side, gathered at once and summed
+        for H_part, array, index in [
+            (H[:vertical], box.H_y, self.index_H[0]),
+            (H[vertical:-1], box.H_x, self.index_H[1]),
+        ]:
+            buffer = self.buffer[: len(index)]
+            np.take(array.reshape(-1), index, out=buffer)
+            np.add(buffer[: len(H_part)], buffer[len(H_part) :], out=H_part)
+        # One product of the phase with the samples of E and H
+        np.multiply.outer(self.step_phase(n), self.samples.reshape(-1), out=self.work)
+        np.add(self.values, self.work.reshape(self.values.shape), out=self.values)
+
+    ## exp(-j omega n Delta_t) Delta_t, the same for a given n whether the run was resumed or not
+    def step_phase(self, n):
+        if n == self.next_step and n % PHASE_PERIOD != 0:
+            self.phase *= self.rotation
+        else:
+            start = n - n % PHASE_PERIOD
+            self.phase = (
+                np.exp(-1j * self.omegas * (start * self.Delta_t)) * self.Delta_t
+            )
+            for _ in range(n - start):
+                self.phase *= self.rotation
+        self.next_step = n + 1
+        return self.phase
+
+    ## DFTs of E_z and the tangential H on the contour (and of the incident E_z, last), shape (frequencies, points + 1)
+    def dfts(self):
+        # The H fields of step n live at (n + 1/2) Delta_t, half a step after the phase they were added with,
+        # and the tangential H is the mean of the two H points which were summed
+        return (
+            self.values[:, 0],
+            self.values[:, 1]
+            * (np.exp(-1j * self.omegas * self.Delta_t / 2) / 2)[:, None],
+        )
+
+    ## Far field sqrt(rho) exp(j k rho) E_z(rho, phi) [V/m^(1/2)] at the angles phi [rad], shape (frequencies, angles)
+    def far_field(self, angles):
+        angles = np.atleast_1d(np.asarray(angles, dtype=np.float64))
+        E, H = [values[:, :-1] for values in self.dfts()]
+        n_x, n_y = self.normals.T
+        # Equivalent currents: J_z = n_x H_y - n_y H_x, M = (-n_y E_z, n_x E_z)
+        J_z = (n_x - n_y) * self.weights * H
+        M_x = -n_y * self.weights * E
+        M_y = n_x * self.weights * E
+        direction = np.stack((np.cos(angles), np.sin(angles)))
+        eta = np.sqrt(mu_0 / eps_0)
+        field = np.empty((len(self.omegas), len(angles)), dtype=np.complex128)
+        for f, omega in enumerate(self.omegas):
+            k = omega / c
+            phase = np.exp(1j * k * (self.positions @ direction))
+            radiation = (
+                eta * (J_z[f] @ phase)
+                - np.cos(angles) * (M_y[f] @ phase)
+                + np.sin(angles) * (M_x[f] @ phase)
+            )
+            field[f] = np.sqrt(2j / (np.pi * k)) * k / 4 * radiation
+        return field
+
+    ## Bistatic radar cross section (scattering width, 2 pi rho |E_z|^2 / |E_inc|^2) [m] at the angles phi [rad]
+    def rcs(self, angles):
+        if self.incident is None:
+            raise ValueError("The radar cross section needs a plane wave")
+        incident = np.abs(self.values[:, 0, -1]) ** 2
+        return 2 * np.pi * np.abs(self.far_field(angles)) ** 2 / incident[:, None]
+
+    ## Description of the transform as plain python values (see scenario.py)
+    def to_dict(self):
+        return {
+            "omegas": self.omegas.tolist(),
+            "x": self.x,
+            "y": self.y,
+            "width": self.width,
+            "height": self.height,
+        }
@@ -0,0 +1,156 @@
+# Importing necessary libraries and files
+import numpy as np
+import dielectric
+
+
+## Range [start, end) of the inner E_z points (along one axis) whose dual cell overlaps [low, high]
+def overlapping_points(low, high, Delta, N):
+    # The dual cell of inner point k (at (k + 1) Delta) spans [(k + 1/2) Delta, (k + 3/2) Delta]
+    start = max(int(np.floor(low / Delta - 3 / 2)), 0)
+    end = min(int(np.ceil(high / Delta - 1 / 2)) + 1, N - 2)
+    return start, max(start, end)
+
+
+## Fraction of the dual cells [x - Delta/2, x + Delta/2] (with x the given point coordinates) inside [low, high]
+def overlap(points, low, high, Delta):
+    return (
+        np.clip(
+            np.minimum(high, points + Delta / 2) - np.maximum(low, points - Delta / 2),
+            0,
+            Delta,
+        )
+        / Delta
+    )
+
+
+## Fill fractions of the dual cells of the inner E_z points covered by a dielectric
+def fill_fraction(diel, N_x, N_y, Delta_x, Delta_y, samples=4, origin=(0, 0)):
+    """Computes which part of every dual cell (centred on an E_z point) lies inside a dielectric
+
+    Rectangles (Dielectric) are handled exactly. Other shapes are sampled on
+    a samples x samples grid of points inside every dual cell. The grid
+    starts at origin (the position of E_z[0, 0]).
+
+    Returns
+    -------
+    region : tuple of slices
+        Part of the (N_x - 2, N_y - 2) inner space covering the dielectric
+    fraction : numpy array
+        Fill fractions (between 0 and 1) in that part of the inner space
+    """
+    x_0, y_0 = origin
+    i_start, i_end = overlapping_points(
+        diel.pos_x - x_0, diel.pos_x + diel.width - x_0, Delta_x, N_x
+    )
+    j_start, j_end = overlapping_points(
+        diel.pos_y - y_0, diel.pos_y + diel.height - y_0, Delta_y, N_y
+    )
+    region = (slice(i_start, i_end), slice(j_start, j_end))
+    x = x_0 + (np.arange(i_start, i_end) + 1) * Delta_x
+    y = y_0 + (np.arange(j_start, j_end) + 1) * Delta_y
+
+    if type(diel) is dielectric.Dielectric:
+        # Rectangle: product of the overlaps along both axes
+        fraction = np.outer(
+            overlap(x, diel.pos_x, diel.pos_x + diel.width, Delta_x),
+            overlap(y, diel.pos_y, diel.pos_y + diel.height, Delta_y),
+        )
+    else:
+        # General shape: average over sample points inside every dual cell
+        offsets = (np.arange(samples) + 1 / 2) / samples - 1 / 2
+        x_samples = (x[:, None] + offsets * Delta_x)[:, :, None, None]
+        y_samples = (y[:, None] + offsets * Delta_y)[None, None, :, :]
+        fraction = diel.contains(x_samples, y_samples).mean(axis=(1, 3))
+    return region, fraction
+
+
+## Relative permittivity at the inner E_z points of a grid, for a list of dielectrics
+def permittivity_map(
+    dielectrics,
+    N_x,
+    N_y,
+    Delta_x,
+    Delta_y,
+    eps_averaging=True,
+    samples=4,
+    origin=(0, 0),
+):
+    """Rasterises dielectrics into the (N_x - 2, N_y - 2) map of eps_r used by Space
+
+    Parameters
+    ----------
+    dielectrics : list of Dielectric
+        Rectangles, circles and polygons, later objects are drawn on top of
+        earlier ones
+    N_x, N_y : int
+        Number of E_z points along both axes
+    Delta_x, Delta_y : float
+        Discretization steps
+    eps_averaging : bool
+        True: eps_r at every point is the average over its dual cell,
+        weighted with the fill fraction of every dielectric.
+        False: every point takes the eps_r of the cell to its upper right
+        (the dielectrics are shifted half a step left- and downward)
+    samples : int
+        Sample points per axis per cell for shapes other than rectangles
+    origin : (float, float)
+        Position of E_z[0, 0] (for grids covering part of a space)
+
+    Returns
+    -------
+    eps_r : numpy array
+    """
+    return property_map(
+        dielectrics,
+        [diel.eps_r for diel in dielectrics],
+        N_x,
+        N_y,
+        Delta_x,
+        Delta_y,
+        eps_averaging,
+        samples,
+        origin,
+    )
+
+
+## Any material property (one value per dielectric, background elsewhere), rasterised like eps_r in permittivity_map
+def property_map(
+    dielectrics,
+    values,
+    N_x,
+    N_y,
+    Delta_x,
+    Delta_y,
+    eps_averaging=True,
+    samples=4,
+    origin=(0, 0),
+    background=1,
+):
+    prop = np.full((N_x - 2, N_y - 2), background, dtype=float)
+    for diel, value in zip(dielectrics, values):
+        if eps_averaging:
+            region, fraction = fill_fraction(
+                diel, N_x, N_y, Delta_x, Delta_y, samples, origin
+            )
+            # Blending with whatever lies underneath: prop += fraction * (value - prop)
+            underneath = prop[region]
+            underneath += fraction * (value - underneath)
+        elif type(diel) is dielectric.Dielectric:
+            # Discretizing given dimensions and positions
+            i = int((diel.pos_x - origin[0]) / Delta_x)
+            j = int((diel.pos_y - origin[1]) / Delta_y)
+            x_length = int(diel.width / Delta_x)
+            y_length = int(diel.height / Delta_y)
+            prop[i : i + x_length, j : j + y_length] = value
+        else:
+            # Cells whose centre lies inside the dielectric
+            x_low, y_low = diel.pos_x - origin[0], diel.pos_y - origin[1]
+            i_start = max(int(x_low / Delta_x), 0)
+            i_end = min(int(np.ceil((x_low + diel.width) / Delta_x)), N_x - 2)
+            j_start = max(int(y_low / Delta_y), 0)
+            j_end = min(int(np.ceil((y_low + diel.height) / Delta_y)), N_y - 2)
+            x = origin[0] + (np.arange(i_start, i_end) + 1 / 2) * Delta_x
+            y = origin[1] + (np.arange(j_start, j_end) + 1 / 2) * Delta_y
+            inside = diel.contains(x[:, None], y[None, :])
+            prop[i_start:i_end, j_start:j_end][inside] = value
+    return prop
@@ -0,0 +1,118 @@
+# Numba is optional: without it, Space falls back to the NumPy implementation
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Amount of consecutive rows handled by one thread (the single sweep of update_HE only keeps the few rows
+# around the current one in cache, whatever the block size; its seams are the first rows of the blocks)
+ROWS_PER_BLOCK = 16
+
+
+### Compiled kernels for the leapfrog updates in Space (only defined when numba is installed)
+if numba is not None:
+
+    ## Row i of the TM H update: H_y between rows i and i+1 of E_z, H_x between its columns
+    @numba.njit(cache=True)
+    def update_H_row(i, E_z, H_x, H_y, C_hx, C_hy):
+        N_x, N_y = E_z.shape
+        # H_y is not defined on the last row
+        if i < N_x - 1:
+            for j in range(N_y):
+                H_y[i, j] += (E_z[i + 1, j] - E_z[i, j]) * C_hy
+        for j in range(N_y - 1):
+            H_x[i, j] -= (E_z[i, j + 1] - E_z[i, j]) * C_hx
+
+    ## Row i of the E_z update (inner space, edges = 0 as per boundary conditions) with both curl terms
+    @numba.njit(cache=True)
+    def update_E_row(i, E_z, H_x, H_y, C_ezx, C_ezy):
+        N_x, N_y = E_z.shape
+        if 0 < i < N_x - 1:
+            for j in range(1, N_y - 1):
+                # Same order of operations as the NumPy path, so both agree to round-off
+                E_z[i, j] += (H_y[i, j] - H_y[i - 1, j]) * C_ezx[i - 1, j - 1]
+                E_z[i, j] -= (H_x[i, j] - H_x[i, j - 1]) * C_ezy[i - 1, j - 1]
+
+    ## Row i of the TE H_z update (H_z has one row less than E_y)
+    @numba.njit(cache=True)
+    def update_H_TE_row(i, E_x, E_y, H_z, C_hzx, C_hzy):
+        N_x, N_y = E_y.shape
+        if i < N_x - 1:
+            for j in range(N_y):
+                H_z[i, j] -= (E_y[i + 1, j] - E_y[i, j]) * C_hzx
+                H_z[i, j] += (E_x[i, j + 1] - E_x[i, j]) * C_hzy
+
+    ## Row i of the TE E_x and E_y updates (inner space, tangential E on the edges = 0)
+    @numba.njit(cache=True)
+    def update_E_TE_row(i, E_x, E_y, H_z, C_exy, C_eyx):
+        N_x, N_y = E_y.shape
+        if i < N_x - 1:
+            for j in range(1, N_y):
+                E_x[i, j] += (H_z[i, j] - H_z[i, j - 1]) * C_exy[i, j - 1]
+        if 0 < i < N_x - 1:
+            for j in range(N_y):
+                E_y[i, j] -= (H_z[i, j] - H_z[i - 1, j]) * C_eyx[i - 1, j]
+
+    ## Fused update of H_x and H_y in a single pass over E_z
+    @numba.njit(parallel=True, cache=True)
+    def update_H(E_z, H_x, H_y, C_hx, C_hy):
+        N_x = E_z.shape[0]
+        N_blocks = (N_x + ROWS_PER_BLOCK - 1) // ROWS_PER_BLOCK
+        for block in numba.prange(N_blocks):
+            for i in range(
+                block * ROWS_PER_BLOCK, min((block + 1) * ROWS_PER_BLOCK, N_x)
+            ):
+                update_H_row(i, E_z, H_x, H_y, C_hx, C_hy)
+
+    ## Fused update of E_z with both curl terms
+    @numba.njit(parallel=True, cache=True)
+    def update_E(E_z, H_x, H_y, C_ezx, C_ezy):
+        N_x = E_z.shape[0]
+        N_blocks = (N_x + ROWS_PER_BLOCK - 1) // ROWS_PER_BLOCK
+        for block in numba.prange(N_blocks):
+            for i in range(
+                block * ROWS_PER_BLOCK, min((block + 1) * ROWS_PER_BLOCK, N_x)
+            ):
+                update_E_row(i, E_z, H_x, H_y, C_ezx, C_ezy)
+
+    ## H and E updates of a time step in a single sweep over the rows, E lagging one row behind H
+    # Row i of E_z needs rows i - 1 and i of H_y, row i of H needs rows i and i + 1 of E_z before its update,
+    # so after the H update of row i, rows up to i - 1 of E_z can be updated. The first row of E_z of a block
+    # needs the last row of H_y of the block before, so these rows are updated in a second pass.
+    @numba.njit(parallel=True, cache=True)
+    def update_HE(E_z, H_x, H_y, C_hx, C_hy, C_ezx, C_ezy):
+        N_x = E_z.shape[0]
+        N_blocks = (N_x + ROWS_PER_BLOCK - 1) // ROWS_PER_BLOCK
+        for block in numba.prange(N_blocks):
+            first = block * ROWS_PER_BLOCK
+            last = min(first + ROWS_PER_BLOCK, N_x) - 1
+            for i in range(first, last + 1):
+                update_H_row(i, E_z, H_x, H_y, C_hx, C_hy)
+                if i - 1 > first:
+                    update_E_row(i - 1, E_z, H_x, H_y, C_ezx, C_ezy)
+            if last > first:
+                update_E_row(last, E_z, H_x, H_y, C_ezx, C_ezy)
+        for block in numba.prange(N_blocks):
+            update_E_row(block * ROWS_PER_BLOCK, E_z, H_x, H_y, C_ezx, C_ezy)
+
+    ## Update of H_z (TE) in a single pass over E_x and E_y
+    @numba.njit(parallel=True, cache=True)
+    def update_H_TE(E_x, E_y, H_z, C_hzx, C_hzy):
+        N_x = E_y.shape[0]
+        N_blocks = (N_x + ROWS_PER_BLOCK - 1) // ROWS_PER_BLOCK
+        for block in numba.prange(N_blocks):
+            for i in range(
+                block * ROWS_PER_BLOCK, min((block + 1) * ROWS_PER_BLOCK, N_x)
+            ):
+                update_H_TE_row(i, E_x, E_y, H_z, C_hzx, C_hzy)
+
+    ## Fused update of E_x and E_y (TE) in a single pass over H_z
+    @numba.njit(parallel=True, cache=True)
+    def update_E_TE(E_x, E_y, H_z, C_exy, C_eyx):
+        N_x = E_y.shape[0]
+        N_blocks = (N_x + ROWS_PER_BLOCK - 1) // ROWS_PER_BLOCK
+        for block in numba.prange(N_blocks):
+            for i in range(
+                block * ROWS_PER_BLOCK, min((block + 1) * ROWS_PER_BLOCK, N_x)
+            ):
+                update_E_TE_row(i, E_x, E_y, H_z, C_exy, C_eyx)
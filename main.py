@@ -8,6 +8,7 @@ import space
 import dielectric
 import source as src
 import measurement
+import snapshots
 from constants import c
 
 # global dictionaries
@@ -350,6 +351,9 @@ def simulate(simulation):
         plot_space=True,
         visualize_fields=simulation["visualize_fields"],
     )
+    if simulation["visualize_fields"] != 0:
+        # Rendering the field snapshots that were streamed to disk during the simulation
+        snapshots.render("./plots/snapshots")
     measurement.plot(
         measurements[0].time_E,
         box.source.get_current(measurements[0].time_E),
@@ -1,41 +1,45 @@
 # Importing necessary libraries and files
 import numpy as np
-import matplotlib.pyplot as plt
-
-plt.rcParams.update({"font.size": 22})
+import plotting
 
 ### Simple plotting function taking care of matplotlib syntax
 def plot(x_values, y_values, x_title, y_title, title, yscale="linear", filename="none"):
-    fig = plt.gcf()
-    plt.plot(x_values, y_values, marker=".")
-    plt.title(title)
-    plt.xlabel(x_title)
-    plt.ylabel(y_title)
-    plt.yscale(yscale)
-    plt.xlim(
-        x_values[0], x_values[-1]
-    )  # confirming plot width to overrule interference line (if to far away)
-    plt.ticklabel_format(axis="both", style="sci", scilimits=(-4, 4))
-    if filename != "none":
-        fig.set_size_inches(20, 12)
-        fig.savefig("./plots/" + filename + ".png")
-    plt.show()
+    plt = plotting.pyplot()
+    with plotting.style():
+        fig = plt.gcf()
+        plt.plot(x_values, y_values, marker=".")
+        plt.title(title)
+        plt.xlabel(x_title)
+        plt.ylabel(y_title)
+        plt.yscale(yscale)
+        plt.xlim(
+            x_values[0], x_values[-1]
+        )  # confirming plot width to overrule interference line (if to far away)
+        plt.ticklabel_format(axis="both", style="sci", scilimits=(-4, 4))
+        if filename != "none":
+            fig.set_size_inches(20, 12)
+            fig.savefig("./plots/" + filename + ".png")
+    plotting.show()
 
 
 def plot_multiple(
     x_values_list, y_values_list, labels_list, x_title, y_title, title, filename="none"
 ):
-    fig = plt.figure()
-    for i in range(len(x_values_list)):
-        plt.plot(x_values_list[i], y_values_list[i], label=labels_list[i], marker=".")
-    plt.title(title)
-    plt.xlabel(x_title)
-    plt.ylabel(y_title)
-    plt.legend()
-    if filename != "none":
-        fig.set_size_inches(14, 10)
-        fig.savefig("./plots/" + filename + ".png")
-    plt.show()
+    plt = plotting.pyplot()
+    with plotting.style():
+        fig = plt.figure()
+        for i in range(len(x_values_list)):
+            plt.plot(
+                x_values_list[i], y_values_list[i], label=labels_list[i], marker="."
+            )
+        plt.title(title)
+        plt.xlabel(x_title)
+        plt.ylabel(y_title)
+        plt.legend()
+        if filename != "none":
+            fig.set_size_inches(14, 10)
+            fig.savefig("./plots/" + filename + ".png")
+    plotting.show()
 
 
 ### Measurement class: Combine all measurement data for a certain point into a single callable instance
@@ -57,25 +61,26 @@ class Measurement:
         self.H_y = H_y
         self.E_z = E_z
 
-    def append_fields(self, H_x, H_y, E_z):
-        self.H_x = np.append(self.H_x, H_x)
-        self.H_y = np.append(self.H_y, H_y)
-        self.E_z = np.append(self.E_z, E_z)
-
     def set_time(self, time_H, time_E):
         self.time_H = time_H
         self.time_E = time_E
 
     ## General plot function to include lines for interference and
     def plot(self, *args, **kwargs):
-        try:
-            plt.axvline(
-                self.interference_time, linestyle="--", label="Interference can start"
-            )
-            plt.axvline(self.wave_time, color="green", label="Wave from source arrives")
-            plt.legend(title="Guidelines:")
-        except AttributeError:
-            pass
+        plt = plotting.pyplot()
+        with plotting.style():
+            try:
+                plt.axvline(
+                    self.interference_time,
+                    linestyle="--",
+                    label="Interference can start",
+                )
+                plt.axvline(
+                    self.wave_time, color="green", label="Wave from source arrives"
+                )
+                plt.legend(title="Guidelines:")
+            except AttributeError:
+                pass
         plot(*args, **kwargs)
 
     ## Plot function for H_x
@@ -153,6 +158,26 @@ class Measurement:
             filename=filename,
         )
 
+    ## Plot function for any recorded component: H_x, H_y, E_z (TM) or E_x, E_y, H_z (TE)
+    def plot_field(self, field, filename="none", indicators=True):
+        # The H fields are sampled at time_H, the E fields at time_E
+        time, unit = (
+            (self.time_H, r"\frac{A}{m}")
+            if field.startswith("H")
+            else (self.time_E, r"\frac{V}{m}")
+        )
+        arguments = (
+            time,
+            getattr(self, field),
+            "time (s)",
+            r"${}\ ({})$".format(field, unit),
+            r"${}$".format(field) + self.title,
+        )
+        if indicators:
+            self.plot(*arguments, filename=filename)
+        else:
+            plot(*arguments, filename=filename)
+
     ## Plot function for all measurement data, H-fields plotted separately
     def plot_all_separate(self, filename="none", indicators=True):
         self.plot_H_x(
@@ -171,3 +196,48 @@ class Measurement:
         self.plot_E_z(
             filename="E_z" * (filename != "none") + filename, indicators=indicators
         )
+
+
+### Recorder class: Preallocated storage for the fields of all measurement points
+class Recorder:
+    ## Allocate one contiguous (n_probes, 3, N_t) buffer and hand out views of it to the measurements
+    def __init__(
+        self,
+        measurements,
+        indices_x,
+        indices_y,
+        N_t,
+        dtype=np.float64,
+        indices_batch=None,
+        indices_z=None,
+        components=("H_x", "H_y", "E_z"),
+    ):
+        self.measurements = measurements
+        self.components = components
+        self.indices_x = np.asarray(indices_x, dtype=int)
+        self.indices_y = np.asarray(indices_y, dtype=int)
+        # Index of the measurement points in the field arrays (batched fields have a leading scenario axis)
+        self.index = (self.indices_x, self.indices_y)
+        if indices_z is not None:
+            self.index += (np.asarray(indices_z, dtype=int),)
+        if indices_batch is not None:
+            self.index = (np.asarray(indices_batch, dtype=int),) + self.index
+        # data[k, 0/1/2, n] holds H_x/H_y/E_z (the components) of the k-th measurement at time step n
+        self.attach(np.zeros((len(measurements), len(components), N_t), dtype=dtype))
+
+    ## Use the given (n_probes, n_components, N_t) array as storage
+    def attach(self, data):
+        self.data = data
+        for k, meas in enumerate(self.measurements):
+            # The fields of a measurement are zero-copy views into the buffer
+            for m, component in enumerate(self.components):
+                setattr(meas, component, self.data[k, m])
+
+    ## Keep only the first 'length' time steps (the measurements become views of the shorter buffer)
+    def truncate(self, length):
+        self.attach(self.data[..., :length])
+
+    ## Save the fields (in the order of the components) at all measurement points for time step n (one gather per field)
+    def record(self, n, *fields):
+        for m, field in enumerate(fields):
+            self.data[:, m, n] = field[self.index]
@@ -0,0 +1,73 @@
+# Importing necessary libraries and files
+import numpy as np
+
+
+### Frequency_monitor class: running DFT of a field at a point or over a region, accumulated during FDTD
+class Frequency_monitor:
+    """Accumulates F(omega) = sum_n f(t_n) exp(-j omega t_n) Delta_t at the given angular frequencies
+
+    Only the (n_freq, ...) complex result is stored, instead of the time
+    series of every point. Up to the stop time, the result equals the
+    (zero-padded) FFT of the recorded field at these frequencies.
+
+    Parameters
+    ----------
+    omegas : array
+        Angular frequencies [rad/s]
+    field : str
+        "E_z", "H_x" or "H_y" (TM), "H_z", "E_x" or "E_y" (TE)
+    x, y : float, (float, float) or None
+        Position of a point [m], a range [low, high] [m] or None for the whole axis
+    stop_time : float or None
+        Only samples at t < stop_time are used (e.g. the interference time of a measurement point)
+    """
+
+    def __init__(self, omegas, field="E_z", x=None, y=None, stop_time=None):
+        self.omegas = np.atleast_1d(np.asarray(omegas, dtype=np.float64))
+        self.field = field
+        self.x = x
+        self.y = y
+        self.stop_time = stop_time
+
+    ## Array index (or slice) along one axis for a point, a range or the whole axis
+    def axis_index(self, position, Delta):
+        if position is None:
+            return slice(None)
+        if np.ndim(position) == 0:
+            return int(position / Delta)
+        return slice(int(position[0] / Delta), int(position[1] / Delta) + 1)
+
+    ## Allocate the result for the grid of a space (called by Space.FDTD)
+    def initialize(self, box):
+        self.Delta_t = box.Delta_t
+        self.index = (
+            self.axis_index(self.x, box.Delta_x),
+            self.axis_index(self.y, box.Delta_y),
+        )
+        shape = (len(self.omegas),) + getattr(box, self.field)[self.index].shape
+        self.values = np.zeros(shape, dtype=np.complex128)
+        self.work = np.empty(shape, dtype=np.complex128)
+        # The E fields of step n live at n Delta_t, the H fields at (n + 1/2) Delta_t
+        self.offset = 0 if self.field.startswith("E") else 1 / 2
+        self.stop_step = box.N_t
+        if self.stop_time is not None:
+            self.stop_step = min(int(self.stop_time // self.Delta_t), box.N_t)
+
+    ## Add the field after time step n to the running DFT
+    def update(self, n, box):
+        if n >= self.stop_step:
+            return
+        phase = np.exp(-1j * self.omegas * ((n + self.offset) * self.Delta_t))
+        phase *= self.Delta_t
+        np.multiply.outer(phase, getattr(box, self.field)[self.index], out=self.work)
+        np.add(self.values, self.work, out=self.values)
+
+    ## Description of the monitor as plain python values (see scenario.py)
+    def to_dict(self):
+        return {
+            "omegas": self.omegas.tolist(),
+            "field": self.field,
+            "x": self.x,
+            "y": self.y,
+            "stop_time": self.stop_time,
+        }
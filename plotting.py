@@ -0,0 +1,49 @@
+# Importing necessary libraries and files
+# matplotlib itself is only imported by the first plot, so the solver never needs it
+import os
+
+# Style of all plots, applied per plot instead of changing the global rcParams
+STYLE = {"font.size": 22}
+
+# headless: use a non-interactive backend and never open a window, plots are only saved
+# block: show() waits until the windows are closed
+mode = {
+    "headless": os.environ.get("EM_SCATTERING_HEADLESS", "0") not in ("", "0"),
+    "block": True,
+}
+
+
+## Choose how plots are shown: headless (only saved) and/or in non-blocking windows
+def set_mode(headless=None, block=None):
+    if headless is not None:
+        mode["headless"] = bool(headless)
+    if block is not None:
+        mode["block"] = bool(block)
+
+
+## matplotlib.pyplot, imported on first use
+def pyplot():
+    import matplotlib
+
+    if mode["headless"]:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+## Context in which the plots get the style of this project
+def style():
+    return pyplot().rc_context(STYLE)
+
+
+## Show the open figures, or close them when headless (the next plot starts on a new figure)
+def show():
+    plt = pyplot()
+    if mode["headless"]:
+        plt.close("all")
+    elif mode["block"]:
+        plt.show()
+    else:
+        plt.show(block=False)
+        plt.pause(0.001)
@@ -0,0 +1,144 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0, mu_0
+
+
+### CPML class: Convolutional perfectly matched layer absorbing the waves in the outer cells of a space
+class CPML:
+    ## Build the layer for a space whose update coefficients are initialized
+    def __init__(self, box, thickness=10, order=3, reflection=1e-6, alpha_max=0):
+        self.thickness = thickness
+        self.order = order
+        self.reflection = reflection
+        self.alpha_max = alpha_max
+        N_x, N_y = box.N_x, box.N_y
+        E_z, H_x, H_y = box.E_z, box.H_x, box.H_y
+
+        # Every slab is one side of the layer for one term of the update equations:
+        # (field, plus, minus, add, b, c, psi, work buffer)
+        # with the convolution psi = b * psi + c * (plus - minus) added to (or subtracted from) field
+        self.slabs_H = []
+        self.slabs_E = []
+        # H_y at x = (i + 1/2) Delta_x, differences of E_z along x
+        for a, b, profile in self.sides(np.arange(N_x - 1) + 1 / 2, N_x, box.Delta_x):
+            self.add_slab(
+                self.slabs_H,
+                H_y[a:b],
+                E_z[a + 1 : b + 1],
+                E_z[a:b],
+                True,
+                profile,
+                (slice(None), None),
+                box.C_hy,
+                box.Delta_t,
+            )
+        # H_x at y = (j + 1/2) Delta_y, differences of E_z along y
+        for a, b, profile in self.sides(np.arange(N_y - 1) + 1 / 2, N_y, box.Delta_y):
+            self.add_slab(
+                self.slabs_H,
+                H_x[:, a:b],
+                E_z[:, a + 1 : b + 1],
+                E_z[:, a:b],
+                False,
+                profile,
+                (None, slice(None)),
+                box.C_hx,
+                box.Delta_t,
+            )
+        # E_z (inner space) at x = i Delta_x, differences of H_y along x
+        for a, b, profile in self.sides(np.arange(1, N_x - 1), N_x, box.Delta_x):
+            self.add_slab(
+                self.slabs_E,
+                E_z[a:b, 1:-1],
+                H_y[a:b, 1:-1],
+                H_y[a - 1 : b - 1, 1:-1],
+                True,
+                profile,
+                (slice(None), None),
+                box.C_ezx[a - 1 : b - 1],
+                box.Delta_t,
+            )
+        # E_z (inner space) at y = j Delta_y, differences of H_x along y
+        for a, b, profile in self.sides(np.arange(1, N_y - 1), N_y, box.Delta_y):
+            self.add_slab(
+                self.slabs_E,
+                E_z[1:-1, a:b],
+                H_x[1:-1, a:b],
+                H_x[1:-1, a - 1 : b - 1],
+                False,
+                profile,
+                (None, slice(None)),
+                box.C_ezy[:, a - 1 : b - 1],
+                box.Delta_t,
+            )
+
+    ## Split grid positions (in cells) into the two sides of the layer: [(start, end, (sigma, depth)), ...]
+    def sides(self, positions, N, Delta):
+        # Relative depth in the layer: 0 at the inner interface, 1 at the PEC wall
+        depth = (
+            np.maximum(self.thickness - positions, positions - (N - 1 - self.thickness))
+            / self.thickness
+        )
+        # Graded conductivity, with its maximum chosen for the requested reflection at normal incidence
+        sigma_max = (
+            -(self.order + 1)
+            * np.log(self.reflection)
+            / (2 * np.sqrt(mu_0 / eps_0) * self.thickness * Delta)
+        )
+        sigma = sigma_max * np.clip(depth, 0, 1) ** self.order
+        sides = []
+        for side in (positions < (N - 1) / 2, positions >= (N - 1) / 2):
+            indices = np.nonzero(side & (depth > 0))[0]
+            if len(indices) > 0:
+                # Array indices of the first and (one past) the last row/column in this side
+                a, b = int(positions[indices[0]]), int(positions[indices[-1]]) + 1
+                sides.append((a, b, (sigma[indices], depth[indices])))
+        return sides
+
+    ## Recursive convolution coefficients and storage for one slab
+    def add_slab(self, slabs, field, plus, minus, add, profile, axis, C, Delta_t):
+        # Profiles along x are columns, profiles along y are rows
+        sigma, depth = (array[axis] for array in profile)
+        # Complex frequency shift: alpha decreases from alpha_max at the interface to 0 at the wall
+        alpha = self.alpha_max * (1 - depth)
+        b = np.exp(-(sigma + alpha) * Delta_t / eps_0)
+        # psi is stored multiplied with the update coefficient C of the field (which includes 1/eps_r)
+        c = sigma / (sigma + alpha) * (b - 1) * C
+        # Everything is stored with the precision of the field
+        b, c = b.astype(field.dtype), c.astype(field.dtype)
+        slabs.append(
+            (
+                field,
+                plus,
+                minus,
+                add,
+                b,
+                c,
+                np.zeros(field.shape, dtype=field.dtype),
+                np.empty(field.shape, dtype=field.dtype),
+            )
+        )
+
+    ## Add the convolution terms to the fields of the given slabs (in-place)
+    def apply(self, slabs):
+        for field, plus, minus, add, b, c, psi, work in slabs:
+            np.subtract(plus, minus, out=work)
+            np.multiply(work, c, out=work)
+            np.multiply(psi, b, out=psi)
+            np.add(psi, work, out=psi)
+            if add:
+                np.add(field, psi, out=field)
+            else:
+                np.subtract(field, psi, out=field)
+
+    ## The convolution arrays of all slabs (the state of the layer)
+    def arrays(self):
+        return [slab[6] for slab in self.slabs_H + self.slabs_E]
+
+    ## Correction of H_x and H_y after their regular update
+    def update_H(self):
+        self.apply(self.slabs_H)
+
+    ## Correction of E_z after its regular update
+    def update_E(self):
+        self.apply(self.slabs_E)
@@ -0,0 +1,183 @@
+# Importing necessary libraries and files
+import json
+import sys
+import time
+
+# Phases of a time step of Space.leapfrog, in order
+PHASES = [
+    "active_region",
+    "update_H",
+    "plane_waves",
+    "materials",
+    "update_E",
+    "sources",
+    "subgrids",
+    "probes",
+    "snapshots",
+    "checkpoint",
+    "stop",
+    "progress",
+]
+
+
+## Default progress callback: step, step rate and estimated time left on a single line
+def print_progress(n, total, steps_per_s, eta):
+    sys.stdout.write(
+        "\rstep {}/{}, {:.1f} steps/s, {:.0f} s left".format(n, total, steps_per_s, eta)
+    )
+    # The last call of a run has nothing left, also when a stopping policy ended it early
+    if n >= total or eta == 0:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+### Null_profiler class: what Space.leapfrog uses when profiling is off (does nothing)
+class Null_profiler:
+    def start(self, box, start):
+        pass
+
+    def lap(self, phase):
+        pass
+
+    def step(self, n):
+        pass
+
+    def stop(self, last):
+        pass
+
+
+### Profiler class: cumulative time per phase of the time loop, sampled step rate and progress
+class Profiler:
+    """Instrumentation of the time loop of Space.FDTD
+
+    After every phase of a time step, lap() adds the time since the previous
+    lap to the total of that phase. Every interval steps the step rate is
+    sampled and the progress callback (if any) is called with the step, the
+    total amount of steps, the step rate and the estimated time left.
+
+    Parameters
+    ----------
+    interval : int
+        Time steps between the samples of the step rate
+    progress : callable
+        Called as progress(n, total, steps_per_s, eta) at every sample,
+        e.g. print_progress. The last call of a run has eta = 0, also when
+        a stopping policy ended the run before the last time step
+    trace : bool
+        Keep every phase of every time step for the Chrome trace (without it,
+        the trace has one event per sampling interval)
+    """
+
+    def __init__(self, interval=100, progress=None, trace=False):
+        self.interval = interval
+        self.progress = progress
+        self.trace = trace
+
+    ## Called by Space.time_steps before the first time step
+    def start(self, box, start):
+        self.total = box.N_t - 1
+        self.first = start
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.samples = []
+        self.events = []
+        self.begin = self.last = time.perf_counter()
+        self.sample_step, self.sample_time = start - 1, self.begin
+
+    ## End of a phase of the current time step
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.totals[phase] += now - self.last
+        if self.trace:
+            self.events.append((phase, self.last, now))
+        self.last = now
+
+    ## End of time step n: sample the step rate every interval steps
+    def step(self, n):
+        if n % self.interval != 0 and n != self.total:
+            return
+        self.sample(n, self.total - n)
+
+    ## Sample the step rate after time step n, with 'left' time steps to go
+    def sample(self, n, left):
+        now = self.last
+        steps_per_s = (n - self.sample_step) / max(now - self.sample_time, 10 ** (-9))
+        self.samples.append(
+            {
+                "step": n,
+                "time": now - self.begin,
+                "steps_per_s": steps_per_s,
+                "start": self.sample_time - self.begin,
+            }
+        )
+        self.sample_step, self.sample_time = n, now
+        if self.progress is not None:
+            self.progress(n, self.total, steps_per_s, left / steps_per_s)
+            self.lap("progress")
+
+    ## Called after the last time step
+    def stop(self, last):
+        # A run ended early by a stopping policy: the steps since the last sample and the final progress call
+        if last > self.sample_step:
+            self.sample(last, 0)
+        self.elapsed = time.perf_counter() - self.begin
+        self.steps = last - self.first + 1
+
+    ## Totals per phase, overall step rate and the samples of the step rate
+    def summary(self):
+        return {
+            "steps": self.steps,
+            "time": self.elapsed,
+            "steps_per_s": self.steps / self.elapsed if self.elapsed > 0 else 0,
+            "phases": {
+                phase: {
+                    "time": total,
+                    "fraction": total / self.elapsed if self.elapsed > 0 else 0,
+                }
+                for phase, total in self.totals.items()
+            },
+            "samples": self.samples,
+        }
+
+    def to_json(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    ## Write a trace for chrome://tracing or Perfetto (times in microseconds)
+    def to_chrome_trace(self, path):
+        events = [
+            {
+                "name": "steps {}-{}".format(previous + 1, sample["step"]),
+                "ph": "X",
+                "ts": sample["start"] * 10 ** 6,
+                "dur": (sample["time"] - sample["start"]) * 10 ** 6,
+                "pid": 0,
+                "tid": 0,
+            }
+            for previous, sample in zip(
+                [self.first - 1] + [sample["step"] for sample in self.samples],
+                self.samples,
+            )
+        ]
+        events += [
+            {
+                "name": "steps/s",
+                "ph": "C",
+                "ts": sample["time"] * 10 ** 6,
+                "args": {"steps/s": sample["steps_per_s"]},
+                "pid": 0,
+            }
+            for sample in self.samples
+        ]
+        events += [
+            {
+                "name": phase,
+                "ph": "X",
+                "ts": (start - self.begin) * 10 ** 6,
+                "dur": (end - start) * 10 ** 6,
+                "pid": 0,
+                "tid": 1,
+            }
+            for phase, start, end in self.events
+        ]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,125 @@
+# Importing necessary libraries and files
+import inspect
+import numpy as np
+import space
+import source
+import dielectric
+
+
+## Plain python value (for JSON) of a number, array, list or object (e.g. the poles of a dielectric)
+def plain(value):
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if hasattr(value, "__dict__"):
+        return object_to_dict(value)
+    return value
+
+
+## Description of a source or dielectric: its type and the arguments of its constructor
+def object_to_dict(obj):
+    parameters = list(inspect.signature(type(obj).__init__).parameters)[1:]
+    description = {"type": type(obj).__name__}
+    for name in parameters:
+        description[name] = plain(getattr(obj, name))
+    return description
+
+
+## Rebuild a source or dielectric from its description, the type is looked up in the given module
+def object_from_dict(description, module):
+    description = dict(description)
+    cls = getattr(module, description.pop("type"))
+    # Objects (e.g. the prototype of a delayed source) and lists of objects (e.g. poles) are rebuilt from the same module
+    for name, value in description.items():
+        if isinstance(value, dict) and "type" in value:
+            description[name] = object_from_dict(value, module)
+        elif isinstance(value, list) and any(
+            isinstance(item, dict) and "type" in item for item in value
+        ):
+            description[name] = [object_from_dict(item, module) for item in value]
+    return cls(**description)
+
+
+## Description of everything that determines the outcome of Space.FDTD for a space
+def describe(box):
+    """Describes a space (with discretization and measurement points) as plain python values
+
+    The description can be written to JSON and turned back into an
+    equivalent space with build().
+
+    Parameters
+    ----------
+    box : Space
+
+    Returns
+    -------
+    description : dict
+    """
+    return {
+        "x_length": plain(box.x_length),
+        "y_length": plain(box.y_length),
+        "t_length": plain(box.t_length),
+        "polarization": box.polarization,
+        "Delta_x": plain(box.Delta_x),
+        "Delta_y": plain(box.Delta_y),
+        "Delta_t": plain(box.Delta_t),
+        "dtype": box.dtype.name,
+        "dielectrics": [object_to_dict(diel) for diel in box.dielectrics],
+        "sources": [object_to_dict(src) for src in box.sources],
+        "plane_waves": [object_to_dict(wave) for wave in box.plane_waves],
+        "absorbing_boundary": box.absorbing_boundary,
+        "refinements": box.refinements,
+        "measurement_points": [
+            [plain(meas.pos_x), plain(meas.pos_y)] for meas in box.measurement_points
+        ],
+        "measurement_titles": [meas.title for meas in box.measurement_points],
+        "frequency_monitors": [monitor.to_dict() for monitor in box.frequency_monitors],
+        "far_fields": [transform.to_dict() for transform in box.far_fields],
+    }
+
+
+## Build a space from its description (see describe)
+def build(description):
+    box = space.Space(
+        description["x_length"],
+        description["y_length"],
+        description["t_length"],
+        description.get("polarization", "TM"),
+    )
+    box.add_objects(
+        [
+            object_from_dict(diel, dielectric)
+            for diel in description.get("dielectrics", [])
+        ]
+    )
+    # A single "source" is accepted as well
+    sources = description.get("sources", [])
+    if "source" in description:
+        sources = [description["source"]] + sources
+    box.add_sources([object_from_dict(src, source) for src in sources])
+    for wave in description.get("plane_waves", []):
+        box.add_plane_wave(object_from_dict(wave, source))
+    box.define_discretization(
+        description["Delta_x"],
+        description["Delta_y"],
+        description["Delta_t"],
+        dtype=description.get("dtype", "float64"),
+    )
+    for refinement in description.get("refinements", []):
+        refinement = dict(refinement)
+        diel = box.dielectrics[refinement.pop("dielectric")]
+        box.add_refinement(diel, **refinement)
+    if description.get("absorbing_boundary") is not None:
+        box.set_absorbing_boundary(**description["absorbing_boundary"])
+    box.add_measurement_points(
+        [tuple(point) for point in description["measurement_points"]],
+        description.get("measurement_titles", []),
+    )
+    for monitor in description.get("frequency_monitors", []):
+        box.add_frequency_monitor(**monitor)
+    for transform in description.get("far_fields", []):
+        box.add_far_field(**transform)
+    return box
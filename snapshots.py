@@ -0,0 +1,174 @@
+# Importing necessary libraries and files
+import json
+import os
+import queue
+import threading
+import warnings
+import numpy as np
+import plotting
+
+
+### Snapshot_writer class: streams decimated E_z and |H| frames of a running FDTD to disk from a background thread
+class Snapshot_writer:
+    """Stores a frame every 'interval' time steps in a directory of .npy files
+
+    The solver only copies the (decimated) fields into a free buffer and
+    hands it to a bounded queue; the writer thread computes |H| and writes
+    the frame into memory-mapped arrays. When no buffer is free (the disk
+    can't keep up), the frame is dropped instead of stalling the solver.
+
+    Store layout
+    ------------
+    E_z.npy : (n_frames, ...) decimated E_z
+    H.npy : (n_frames, ...) decimated amplitude of H (at the points of H_x[1:,] and H_y[:, 1:])
+    steps.npy : time step of every frame, -1 for dropped frames
+    info.json : discretization, decimation and the source and measurement points (in cells)
+    """
+
+    ## Create (or, when resuming, reopen) the store and start the writer thread
+    def __init__(self, path, box, interval, decimation=1, queue_size=8, resume=False):
+        self.path = path
+        self.interval = int(interval)
+        self.decimation = decimation
+        self.dropped = 0
+        d = decimation
+        n_frames = (box.N_t - 1) // self.interval
+        shape_E = box.E_z[::d, ::d].shape
+        shape_H = box.H_x[1::d, ::d].shape
+        files = [os.path.join(path, name) for name in ("E_z.npy", "H.npy", "steps.npy")]
+        if resume and all(os.path.exists(file) for file in files):
+            self.E_z, self.H, self.steps = (
+                np.load(file, mmap_mode="r+") for file in files
+            )
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.E_z = np.lib.format.open_memmap(
+                files[0], "w+", box.dtype, (n_frames,) + shape_E
+            )
+            self.H = np.lib.format.open_memmap(
+                files[1], "w+", box.dtype, (n_frames,) + shape_H
+            )
+            self.steps = np.lib.format.open_memmap(
+                files[2], "w+", np.int64, (n_frames,)
+            )
+            self.steps[:] = -1
+        info = {
+            "Delta_x": box.Delta_x,
+            "Delta_y": box.Delta_y,
+            "Delta_t": box.Delta_t,
+            "interval": self.interval,
+            "decimation": decimation,
+            "sources": [
+                [src.pos_x // box.Delta_x, src.pos_y // box.Delta_y]
+                for src in box.sources
+            ],
+            "measurement_points": [
+                [float(i), float(j)] for i, j in zip(box.meas_pos_x, box.meas_pos_y)
+            ],
+        }
+        with open(os.path.join(path, "info.json"), "w") as file:
+            json.dump(info, file)
+
+        # Buffers travel from 'free' (owned by nobody) to 'full' (filled by the solver) and back
+        self.free = queue.Queue()
+        for _ in range(queue_size):
+            self.free.put(
+                (
+                    np.empty(shape_E, box.dtype),
+                    np.empty(shape_H, box.dtype),
+                    np.empty(shape_H, box.dtype),
+                )
+            )
+        self.full = queue.Queue()
+        self.thread = threading.Thread(target=self.write, daemon=True)
+        self.thread.start()
+
+    ## Hand the fields after time step n to the writer (called by the solver, never blocks)
+    def put(self, n, E_z, H_x, H_y):
+        try:
+            buffers = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return
+        d = self.decimation
+        np.copyto(buffers[0], E_z[::d, ::d])
+        np.copyto(buffers[1], H_x[1::d, ::d])
+        np.copyto(buffers[2], H_y[::d, 1::d])
+        self.full.put((n, buffers))
+
+    ## Writer thread: move the frames from the queue into the store
+    def write(self):
+        while True:
+            item = self.full.get()
+            if item is None:
+                break
+            n, (E_z, H_x, H_y) = item
+            k = n // self.interval - 1
+            self.E_z[k] = E_z
+            np.hypot(H_x, H_y, out=self.H[k])
+            self.steps[k] = n
+            self.free.put((E_z, H_x, H_y))
+
+    ## Wait for the queued frames and flush the store
+    def close(self):
+        self.full.put(None)
+        self.thread.join()
+        for array in (self.E_z, self.H, self.steps):
+            array.flush()
+        if self.dropped > 0:
+            warnings.warn(
+                "{} snapshots were dropped because the writer could not keep up".format(
+                    self.dropped
+                )
+            )
+
+
+## Open a snapshot store written by Snapshot_writer (the frames are memory-mapped)
+def load(path):
+    with open(os.path.join(path, "info.json")) as file:
+        info = json.load(file)
+    for name in ("E_z", "H", "steps"):
+        info[name] = np.load(os.path.join(path, name + ".npy"), mmap_mode="r")
+    return info
+
+
+## Plot one frame with the source and measurement points, and save it as a png
+def frame_plot(field, info, title, filename):
+    d = info["decimation"]
+    points = np.asarray(info["measurement_points"]).reshape(-1, 2) / d
+    sources = np.asarray(info["sources"]).reshape(-1, 2) / d
+    plt = plotting.pyplot()
+    with plotting.style():
+        fig = plt.figure(figsize=(20, 12))
+        plt.scatter(points[:, 0], points[:, 1], c="silver", label="measurement points")
+        plt.scatter(sources[:, 0], sources[:, 1], c="red", label="source point")
+        # get axis orientation right
+        plt.imshow(np.transpose(field), origin="lower")
+        plt.title(title)
+        plt.xlabel("i (x-axis)" if d == 1 else "i / {} (x-axis)".format(d))
+        plt.ylabel("j (y-axis)" if d == 1 else "j / {} (y-axis)".format(d))
+        plt.legend(bbox_to_anchor=(1, 1), loc="upper left")
+        fig.savefig(filename)
+    plt.close(fig)
+
+
+## Render the frames of a snapshot store to png files (offline, after or during the simulation)
+def render(path, output="./plots/"):
+    info = load(path)
+    os.makedirs(output, exist_ok=True)
+    for E_z, H, n in zip(info["E_z"], info["H"], info["steps"]):
+        if n < 0:
+            continue
+        t = n * info["Delta_t"]
+        frame_plot(
+            np.abs(E_z),
+            info,
+            r"$E_z\ \ t = {:.2g} s$".format(t),
+            os.path.join(output, "E_z-t_{:.2g}_s.png".format(t)),
+        )
+        frame_plot(
+            H,
+            info,
+            r"Amplitude $H\ \ t = {:.2g} s$".format(t),
+            os.path.join(output, "Amplitude_H-t_{:.2g}_s.png".format(t)),
+        )
@@ -59,3 +59,107 @@ class Gaussian_modulated_rf_pulse(Source):
         return s + "sigma: {}\ntc: {}\nomega_c: {}\n".format(
             self.sigma, self.tc, self.omega_c
         )
+
+
+### Dipole class: Point source of a 3D space (see space3d.py), a current element of one cell along x, y or z
+class Dipole(Source):
+    ## Gaussian pulse (omega_c = 0) or Gaussian-modulated sinusoidal pulse of current J0 [A]
+    def __init__(self, pos_x, pos_y, pos_z, J0, tc, sigma, omega_c=0, axis="z"):
+        super().__init__(pos_x, pos_y, J0)
+        if axis not in ("x", "y", "z"):
+            raise ValueError("axis should be 'x', 'y' or 'z', not {}".format(axis))
+        self.pos_z = pos_z
+        self.tc = tc
+        self.sigma = sigma
+        self.omega_c = omega_c
+        self.axis = axis
+
+    ## The waveform of the current: the line source with the same parameters
+    def waveform(self):
+        if self.omega_c == 0:
+            return Gaussian_pulse(self.pos_x, self.pos_y, self.J0, self.tc, self.sigma)
+        return Gaussian_modulated_rf_pulse(
+            self.pos_x, self.pos_y, self.J0, self.tc, self.sigma, self.omega_c
+        )
+
+    def get_current(self, t):
+        return self.waveform().get_current(t)
+
+    def get_lambda_min(self, eps_r):
+        return self.waveform().get_lambda_min(eps_r)
+
+    def __str__(self):
+        return "Dipole along {}:\nlocation: ({}, {}, {}) m\nCurrent {}\n".format(
+            self.axis, self.pos_x, self.pos_y, self.pos_z, self.J0
+        ) + "sigma: {}\ntc: {}\nomega_c: {}\n".format(self.sigma, self.tc, self.omega_c)
+
+
+### Delayed_source class: a line source at (pos_x, pos_y) with the whole waveform (envelope and carrier) of a prototype, delayed
+class Delayed_source:
+    def __init__(self, prototype, pos_x, pos_y, delay=0):
+        self.prototype = prototype
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.delay = delay
+
+    def get_current(self, t):
+        return self.prototype.get_current(t - self.delay)
+
+    def get_lambda_min(self, eps_r):
+        return self.prototype.get_lambda_min(eps_r)
+
+    def __str__(self):
+        return "Delayed source:\nlocation: ({}, {}) m\ndelay: {} s\n".format(
+            self.pos_x, self.pos_y, self.delay
+        ) + str(self.prototype)
+
+
+## Copies of a source at n points evenly spaced from (x_start, y_start) to (x_end, y_end)
+def line_array(prototype, x_start, y_start, x_end, y_end, n, delay=0):
+    # Element k is the prototype delayed by k * delay, which steers the beam of a phased array
+    return [
+        Delayed_source(
+            prototype,
+            x_start + fraction * (x_end - x_start),
+            y_start + fraction * (y_end - y_start),
+            k * delay,
+        )
+        for k, fraction in enumerate(np.linspace(0, 1, n))
+    ]
+
+
+### Plane wave travelling along +x, injected into the total-field region [pos_x, pos_x + width] x [pos_y, pos_y + height] (see tfsf.py)
+class Plane_wave:
+    def __init__(self, pos_x, pos_y, width, height, E0, tc, sigma, omega_c=0):
+        self.pos_x = pos_x
+        self.pos_y = pos_y
+        self.width = width
+        self.height = height
+        self.E0 = E0
+        self.tc = tc
+        self.sigma = sigma
+        self.omega_c = omega_c
+
+    ## Incident E_z at the left edge of the total-field region: a (modulated) Gaussian pulse
+    def get_field(self, t):
+        field = self.E0 * np.exp(-((t - self.tc) ** 2) / (2 * self.sigma ** 2))
+        if self.omega_c != 0:
+            field = field * np.sin(self.omega_c * t)
+        return field
+
+    def get_lambda_min(self, eps_r):
+        v_min = c / np.sqrt(eps_r)
+        omega_max = 3 / self.sigma + self.omega_c
+        return 2 * np.pi * v_min / omega_max
+
+    def __str__(self):
+        return "Plane wave:\ntotal field region: {} m, {} m, {} m x {} m\nE0: {}\nsigma: {}\ntc: {}\nomega_c: {}\n".format(
+            self.pos_x,
+            self.pos_y,
+            self.width,
+            self.height,
+            self.E0,
+            self.sigma,
+            self.tc,
+            self.omega_c,
+        )
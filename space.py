@@ -1,30 +1,75 @@
 # Importing necessary libraries and files
+import json
+import os
+import warnings
 import numpy as np
-import matplotlib.pyplot as plt
 from constants import eps_0, mu_0, c
 import source
 import dielectric
 import measurement
+import monitors
+import farfield
+import pml
+import dispersion
+import tfsf
+import subgrid
+import geometry
+import scenario
+import snapshots
+import plotting
+import profiler
+
+# kernels.py (numba) is imported by Space.set_backend once the numba backend is chosen
+kernels = None
+
+# Fields of both polarisations, in the order of the recorded probe data
+FIELDS = {"TM": ("H_x", "H_y", "E_z"), "TE": ("E_x", "E_y", "H_z")}
+# Cells the active region reaches beyond the light cone of the sources by default (see Space.grow_region)
+ACTIVE_MARGIN = 16
 
 
 ### Space class: Combines other classes to implement the FDTD algorithm
 class Space:
-    ## Initialize the space by giving its dimensions
-    def __init__(self, x_length, y_length, t_length):
+    ## Initialize the space by giving its dimensions and polarisation: "TM" (E_z, H_x, H_y), "TE" (H_z, E_x, E_y) or "TE+TM"
+    def __init__(self, x_length, y_length, t_length, polarization="TM"):
+        if polarization not in ("TM", "TE", "TE+TM"):
+            raise ValueError(
+                "polarization should be 'TM', 'TE' or 'TE+TM', not {}".format(
+                    polarization
+                )
+            )
+        # Both polarisations of "TE+TM" are stepped in the same time loop, one after the other
+        # (their fields are disjoint, so this costs about as much as two separate runs)
+        self.polarization = polarization
+        self.TM = "TM" in polarization
+        self.TE = "TE" in polarization
+        self.fields = FIELDS["TM"] * self.TM + FIELDS["TE"] * self.TE
         # Initializing an empty list of dielectric things
         self.dielectrics = []
+        # By default the space is a bare PEC box, without absorbing boundary
+        self.absorbing_boundary = None
+        # Line sources (the first one is 'the' source of the space) and plane waves
+        self.source = None
+        self.sources = []
+        self.plane_waves = []
+        # Local mesh refinements around dielectrics
+        self.refinements = []
+        # Running DFTs accumulated during FDTD
+        self.frequency_monitors = []
+        self.far_fields = []
 
         # Saving the given dimensions of our space
         self.x_length = x_length
         self.y_length = y_length
         self.t_length = t_length
 
-    ## Define discretization and initialize zero-valued fields
-    def define_discretization(self, Delta_x, Delta_y, Delta_t):
+    ## Define discretization and initialize zero-valued fields (stored as float64 or, to halve memory and bandwidth, float32)
+    def define_discretization(self, Delta_x, Delta_y, Delta_t, dtype=np.float64):
         # Saving the given discretization steps
         self.Delta_x = Delta_x
         self.Delta_y = Delta_y
         self.Delta_t = Delta_t
+        self.dtype = np.dtype(dtype)
 
         # Calculating the amount of space/time indices
         self.N_x = int(self.x_length / Delta_x + 1)
@@ -32,20 +77,78 @@ class Space:
         self.N_t = int(self.t_length / Delta_t)  # t_length not inclusive
 
         # Initializing zero-valued fields of the correct size (as 3D numpy array)
-        # E_z field at the corners of our discretized blocks
-        self.E_z = np.zeros((self.N_x, self.N_y))
-        # H_x and H_y fields on the edges of the discretized blocks
-        self.H_x = np.zeros((self.N_x, self.N_y - 1))
-        self.H_y = np.zeros((self.N_x - 1, self.N_y))
+        if self.TM:
+            # E_z field at the corners of our discretized blocks
+            self.E_z = np.zeros((self.N_x, self.N_y), dtype=self.dtype)
+            # H_x and H_y fields on the edges of the discretized blocks
+            self.H_x = np.zeros((self.N_x, self.N_y - 1), dtype=self.dtype)
+            self.H_y = np.zeros((self.N_x - 1, self.N_y), dtype=self.dtype)
+        if self.TE:
+            # H_z field at the centres of the blocks, E_x and E_y on their edges (E_x where H_y is, E_y where H_x is)
+            self.H_z = np.zeros((self.N_x - 1, self.N_y - 1), dtype=self.dtype)
+            self.E_x = np.zeros((self.N_x - 1, self.N_y), dtype=self.dtype)
+            self.E_y = np.zeros((self.N_x, self.N_y - 1), dtype=self.dtype)
 
-    ## Set the line source of our space
+    ## Set the line source of our space (replaces all line sources)
     def set_source(self, source):
         self.source = source
+        self.sources = [source]
+
+    ## Add a list of line sources (e.g. source.line_array), all of them are injected at once every time step
+    def add_sources(self, sources):
+        self.sources.extend(sources)
+        if self.source is None and len(self.sources) > 0:
+            self.source = self.sources[0]
+
+    ## Add a plane wave, injected in its total-field region (see source.Plane_wave and tfsf.py)
+    def add_plane_wave(self, plane_wave):
+        self.plane_waves.append(plane_wave)
 
     ## Add a list of dielectric options to the space
     def add_objects(self, dielectrics):
         self.dielectrics.extend(dielectrics)
 
+    ## Refine the grid around a dielectric (of this space): cells and time step ratio (odd) times smaller, up to margin cells around it
+    def add_refinement(self, dielectric, ratio=3, margin=2):
+        # The patch is built once the update coefficients are known (see subgrid.Subgrid)
+        self.refinements.append(
+            {
+                "dielectric": self.dielectrics.index(dielectric),
+                "ratio": ratio,
+                "margin": margin,
+            }
+        )
+
+    ## Line the PEC walls with an absorbing boundary (CPML) occupying the outer 'thickness' cells of the space
+    def set_absorbing_boundary(
+        self, thickness=10, order=3, reflection=1e-6, alpha_max=0
+    ):
+        # The layer is built from these parameters once the update coefficients are known (see pml.CPML)
+        self.absorbing_boundary = {
+            "thickness": thickness,
+            "order": order,
+            "reflection": reflection,
+            "alpha_max": alpha_max,
+        }
+
+    ## Add a running DFT of a field at the angular frequencies omegas, at a point or over a region (see monitors.Frequency_monitor)
+    def add_frequency_monitor(
+        self, omegas, field="E_z", x=None, y=None, stop_time=None
+    ):
+        monitor = monitors.Frequency_monitor(omegas, field, x, y, stop_time)
+        self.frequency_monitors.append(monitor)
+        return monitor
+
+    ## Add a near-to-far-field transform on the rectangle (x, y, width, height) around the scatterers, for the far field and radar cross section at the angular frequencies omegas (see farfield.py)
+    def add_far_field(self, omegas, x, y, width, height):
+        transform = farfield.Near_to_far_field(omegas, x, y, width, height)
+        self.far_fields.append(transform)
+        return transform
+
+    ## All running DFTs which are updated during FDTD: the frequency monitors, then the near-to-far-field transforms
+    def running_dfts(self):
+        return self.frequency_monitors + self.far_fields
+
     ## Add a list of measurement point in the form of: [(x,y), ...], as well as optional titles for the measurements
     def add_measurement_points(self, measurement_points, measurement_titles=[]):
         # Make a list of empty titles if no titles were given
@@ -56,6 +159,10 @@ class Space:
             len(measurement_points), dtype=measurement.Measurement
         )
         self.interference_times = np.empty(len(measurement_points))
+        # Positions of all line sources: the reflection of the nearest one arrives first
+        positions = np.array([(src.pos_x, src.pos_y) for src in self.sources]).reshape(
+            -1, 1, 2
+        )
         for i, meas in enumerate(measurement_points):
             # reflecting on the PEC walls
             # dist : the 4 reflection points of measurement in the PEC
@@ -64,24 +171,26 @@ class Space:
             dist[1, :] = meas[0], -meas[1]
             dist[2, :] = 2 * self.x_length - meas[0], meas[1]
             dist[3, :] = meas[0], 2 * self.y_length - meas[1]
-            dist -= (self.source.pos_x, self.source.pos_y)
+            dist = dist - positions
             # euclidian distance
             dist = np.linalg.norm(dist, axis=-1)
             # the least distance between the source & the reflection point of
             # the measurement will be approx the distance the wave has to
             # travel
-            min_dist = np.min(dist)
+            min_dist = np.min(dist, initial=np.inf)
             # set interference
             self.interference_times[i] = min_dist / c
+            if self.absorbing_boundary is not None or len(self.sources) == 0:
+                # The walls don't reflect (or there are only plane waves, whose scattered field does reach the walls)
+                self.interference_times[i] = self.t_length
             self.measurement_points[i] = measurement.Measurement(
                 meas[0], meas[1], self.interference_times[i], measurement_titles[i]
             )
-            self.measurement_points[i].wave_time = (
-                np.linalg.norm(
-                    (meas[0] - self.source.pos_x, meas[1] - self.source.pos_y)
+            if len(self.sources) > 0:
+                distances = np.linalg.norm(
+                    (meas[0], meas[1]) - positions[:, 0], axis=-1
                 )
-                / c
-            )
+                self.measurement_points[i].wave_time = np.min(distances) / c
         # return an estimate maximum of time before inteference occurs (foreach meas_point)
         self.meas_pos_x = (
             np.asarray([meas.pos_x for meas in self.measurement_points]) // self.Delta_x
@@ -89,35 +198,51 @@ class Space:
         self.meas_pos_y = (
             np.asarray([meas.pos_y for meas in self.measurement_points]) // self.Delta_y
         )
+        # Preallocating the storage for the fields at every measurement point and time step
+        self.recorder = measurement.Recorder(
+            self.measurement_points,
+            [int(meas.pos_x / self.Delta_x) for meas in self.measurement_points],
+            [int(meas.pos_y / self.Delta_y) for meas in self.measurement_points],
+            self.N_t,
+            self.dtype,
+            components=self.fields,
+        )
         return self.interference_times
 
     ## Makes a discretized representation of the (inner) space with its dielectric properties (eps_r) at the measurement points of E_z
     def initialize_space(self, eps_averaging=True, plot_space=True):
-        # Initialize space with relative permittivity (eps_r) 1 everywhere (vacuum)
-        self.space = np.ones((self.N_x - 1, self.N_y - 1))
-
-        # Changing the relative permittivity according to position and size of our objects (assuming no overlap exists)
-        for dielectric in self.dielectrics:
-            # Discretizing given dimensions and positions
-            i = int(dielectric.pos_x / self.Delta_x)
-            j = int(dielectric.pos_y / self.Delta_y)
-            x_length = int(dielectric.width / self.Delta_x)
-            y_length = int(dielectric.height / self.Delta_y)
-
-            # Changing the value for eps_r at that position
-            self.space[i : i + x_length, j : j + y_length] = dielectric.eps_r
+        # Rasterising the dielectrics (rectangles, circles, polygons) onto the points of E_z
         # Problem: The edges of the dielectric and the measurement points of E_z coincide, so eps_r is not well defined in this point
-        if eps_averaging:
-            # Default solution: We use the average value of eps_r of the surrounding regions at every point for E_z.
-            self.space = (
-                self.space[:-1, :-1]
-                + self.space[1:, :-1]
-                + self.space[:-1, 1:]
-                + self.space[1:, 1:]
-            ) / 4
-        else:
-            # Alternative solution: We shift the dielectrics slightly (1/2 step left- and downward) so we don't need to average values out.
-            self.space = self.space[:-1, :-1]
+        # Default solution (eps_averaging): eps_r at every point is averaged over the cell around it, weighted with the area each dielectric fills
+        # Alternative solution: We shift the dielectrics slightly (1/2 step left- and downward) so we don't need to average values out.
+        self.space = geometry.permittivity_map(
+            self.dielectrics,
+            self.N_x,
+            self.N_y,
+            self.Delta_x,
+            self.Delta_y,
+            eps_averaging,
+        )
+        if self.TE:
+            # The same rasterisation at the inner points of E_x and E_y: grids whose E_z[0, 0] lies half a step outside the space
+            self.space_x = geometry.permittivity_map(
+                self.dielectrics,
+                self.N_x + 1,
+                self.N_y,
+                self.Delta_x,
+                self.Delta_y,
+                eps_averaging,
+                origin=(-self.Delta_x / 2, 0),
+            )
+            self.space_y = geometry.permittivity_map(
+                self.dielectrics,
+                self.N_x,
+                self.N_y + 1,
+                self.Delta_x,
+                self.Delta_y,
+                eps_averaging,
+                origin=(0, -self.Delta_y / 2),
+            )
 
         # Visualizing our space using a plot
         if plot_space:
@@ -129,129 +254,715 @@ class Space:
                 filename="visualisation_space",
             )
 
+    ## Precompute the update coefficients and work buffers of the leapfrog scheme (after initialize_space)
+    def initialize_coefficients(self):
+        # The coefficients are computed in float64 and stored with the precision of the fields
+        # H updates: uniform coefficients
+        self.C_hy = self.dtype.type(self.Delta_t / (mu_0 * self.Delta_x))
+        self.C_hx = self.dtype.type(self.Delta_t / (mu_0 * self.Delta_y))
+        # E_z update (inner space): per-cell coefficients which already include 1/eps_r
+        self.C_ezx = (self.Delta_t / (eps_0 * self.Delta_x) / self.space).astype(
+            self.dtype
+        )
+        self.C_ezy = (self.Delta_t / (eps_0 * self.Delta_y) / self.space).astype(
+            self.dtype
+        )
+
+        # Calculating the discretized postions of our line sources and their coefficients
+        self.i_sources = np.array(
+            [int(src.pos_x / self.Delta_x) for src in self.sources], dtype=int
+        )
+        self.j_sources = np.array(
+            [int(src.pos_y / self.Delta_y) for src in self.sources], dtype=int
+        )
+        self.C_sources = (
+            self.Delta_t
+            / (
+                self.Delta_x
+                * self.Delta_y
+                * eps_0
+                * self.space[self.i_sources, self.j_sources]
+            )
+        ).astype(self.dtype)
+        # Index of the line sources in E_z (and H_z), for the scatter-add of the time loop
+        self.source_index = (self.i_sources, self.j_sources)
+        # Precomputing the source terms of all sources at all half steps (n - 1/2) Delta_t: source_terms[n, k]
+        time_source = (np.arange(self.N_t) - 1 / 2) * self.Delta_t
+        currents = np.zeros((self.N_t, len(self.sources)))
+        for k, src in enumerate(self.sources):
+            currents[:, k] = src.get_current(time_source)
+        self.source_terms = currents * self.C_sources
+
+        if self.TE:
+            # TE updates: H_z with uniform coefficients, E_x and E_y with 1/eps_r at their own points
+            self.C_hzx = self.dtype.type(self.Delta_t / (mu_0 * self.Delta_x))
+            self.C_hzy = self.dtype.type(self.Delta_t / (mu_0 * self.Delta_y))
+            self.C_exy = (self.Delta_t / (eps_0 * self.Delta_y) / self.space_x).astype(
+                self.dtype
+            )
+            self.C_eyx = (self.Delta_t / (eps_0 * self.Delta_x) / self.space_y).astype(
+                self.dtype
+            )
+            # In TE the line sources are magnetic line currents in the H_z cell around them, at n Delta_t:
+            # the middle of the H_z update of step n, from (n - 1/2) Delta_t to (n + 1/2) Delta_t
+            self.C_sources_TE = self.dtype.type(
+                self.Delta_t / (self.Delta_x * self.Delta_y * mu_0)
+            )
+            currents_TE = np.zeros((self.N_t, len(self.sources)))
+            for k, src in enumerate(self.sources):
+                currents_TE[:, k] = src.get_current(time_source + self.Delta_t / 2)
+            self.source_terms_TE = currents_TE * self.C_sources_TE
+
+        # Incident fields of the plane waves
+        self.tfsf = [tfsf.TFSF(self, wave) for wave in self.plane_waves]
+
+        # Refinement patches: the coarse E_z points around the dielectric, plus the margin
+        self.subgrids = []
+        for refinement in self.refinements:
+            diel = self.dielectrics[refinement["dielectric"]]
+            margin = refinement["margin"]
+            self.subgrids.append(
+                subgrid.Subgrid(
+                    self,
+                    int(diel.pos_x / self.Delta_x) - margin,
+                    int(np.ceil((diel.pos_x + diel.width) / self.Delta_x)) + margin,
+                    int(diel.pos_y / self.Delta_y) - margin,
+                    int(np.ceil((diel.pos_y + diel.height) / self.Delta_y)) + margin,
+                    refinement["ratio"],
+                    self.eps_averaging,
+                )
+            )
+
+        # Work buffers for the spatial differences, so stepping doesn't allocate memory
+        if self.TM:
+            self.dE_x = np.empty(self.H_y.shape, dtype=self.dtype)
+            self.dE_y = np.empty(self.H_x.shape, dtype=self.dtype)
+            self.dH = np.empty(self.space.shape, dtype=self.dtype)
+        if self.TE and self.TM:
+            # The TE updates run after the TM ones, so they can reuse the (larger) TM buffers
+            self.dE = self.dE_x.reshape(-1)[: self.H_z.size].reshape(self.H_z.shape)
+            self.dH_x = self.dE_y.reshape(-1)[: self.space_y.size].reshape(
+                self.space_y.shape
+            )
+            self.dH_y = self.dE_x.reshape(-1)[: self.space_x.size].reshape(
+                self.space_x.shape
+            )
+        elif self.TE:
+            self.dE = np.empty(self.H_z.shape, dtype=self.dtype)
+            self.dH_x = np.empty(self.space_y.shape, dtype=self.dtype)
+            self.dH_y = np.empty(self.space_x.shape, dtype=self.dtype)
+
+        # The updates cover the whole grid, until restricted with set_region
+        self.set_region()
+
+        # Absorbing layer along the walls
+        self.pml = None
+        if self.absorbing_boundary is not None:
+            self.pml = pml.CPML(self, **self.absorbing_boundary)
+
+        # Lossy and dispersive dielectrics: auxiliary currents on the points they cover, per E component
+        self.materials = []
+        if any(diel.is_dispersive() for diel in self.dielectrics):
+            if self.TM:
+                self.materials.append(
+                    dispersion.ADE(
+                        self, self.E_z, self.space, (1, 1), self.N_x, self.N_y
+                    )
+                )
+            if self.TE:
+                self.materials.append(
+                    dispersion.ADE(
+                        self,
+                        self.E_x,
+                        self.space_x,
+                        (0, 1),
+                        self.N_x + 1,
+                        self.N_y,
+                        (-self.Delta_x / 2, 0),
+                    )
+                )
+                self.materials.append(
+                    dispersion.ADE(
+                        self,
+                        self.E_y,
+                        self.space_y,
+                        (1, 0),
+                        self.N_x,
+                        self.N_y + 1,
+                        (0, -self.Delta_y / 2),
+                    )
+                )
+
+    ## Restrict the field updates to the E_z points [i_0, i_1) x [j_0, j_1) (by default the whole grid)
+    def set_region(self, i_0=0, i_1=None, j_0=0, j_1=None):
+        i_1 = self.N_x if i_1 is None else i_1
+        j_1 = self.N_y if j_1 is None else j_1
+        self.region = (i_0, i_1, j_0, j_1)
+
+        # Views of the work buffers with the shape of the region
+        def work(buffer, shape):
+            # (with the leading axes of a batch of spaces, see batch.py)
+            shape = buffer.shape[:-2] + shape
+            return buffer.reshape(-1)[: int(np.prod(shape))].reshape(shape)
+
+        # The updates work on these views of the fields, coefficients and work buffers
+        self.views = {}
+        if self.TM:
+            self.views.update(
+                E_z=self.E_z[..., i_0:i_1, j_0:j_1],
+                H_x=self.H_x[..., i_0:i_1, j_0 : j_1 - 1],
+                H_y=self.H_y[..., i_0 : i_1 - 1, j_0:j_1],
+                C_ezx=self.C_ezx[..., i_0 : i_1 - 2, j_0 : j_1 - 2],
+                C_ezy=self.C_ezy[..., i_0 : i_1 - 2, j_0 : j_1 - 2],
+                dE_x=work(self.dE_x, (i_1 - i_0 - 1, j_1 - j_0)),
+                dE_y=work(self.dE_y, (i_1 - i_0, j_1 - j_0 - 1)),
+                dH=work(self.dH, (i_1 - i_0 - 2, j_1 - j_0 - 2)),
+            )
+        if self.TE:
+            self.views.update(
+                E_x=self.E_x[..., i_0 : i_1 - 1, j_0:j_1],
+                E_y=self.E_y[..., i_0:i_1, j_0 : j_1 - 1],
+                H_z=self.H_z[..., i_0 : i_1 - 1, j_0 : j_1 - 1],
+                C_exy=self.C_exy[..., i_0 : i_1 - 1, j_0 : j_1 - 2],
+                C_eyx=self.C_eyx[..., i_0 : i_1 - 2, j_0 : j_1 - 1],
+                dE=work(self.dE, (i_1 - i_0 - 1, j_1 - j_0 - 1)),
+                dH_x=work(self.dH_x, (i_1 - i_0 - 2, j_1 - j_0 - 1)),
+                dH_y=work(self.dH_y, (i_1 - i_0 - 1, j_1 - j_0 - 2)),
+            )
+
+    def view(self, *names):
+        return [self.views[name] for name in names]
+
+    ## Leapfrog update of the H fields (in-place)
+    def update_H(self):
+        if self.single_pass:
+            # The E update of the time step as well (see update_E)
+            kernels.update_HE(
+                *self.view("E_z", "H_x", "H_y"),
+                self.C_hx,
+                self.C_hy,
+                *self.view("C_ezx", "C_ezy"),
+            )
+            return
+        if self.TM:
+            if self.backend == "numba":
+                kernels.update_H(*self.view("E_z", "H_x", "H_y"), self.C_hx, self.C_hy)
+            else:
+                self.update_H_numpy()
+        if self.TE:
+            if self.backend == "numba":
+                kernels.update_H_TE(
+                    *self.view("E_x", "E_y", "H_z"), self.C_hzx, self.C_hzy
+                )
+            else:
+                self.update_H_TE_numpy()
+        if self.pml is not None:
+            self.pml.update_H()
+
+    def update_H_numpy(self):
+        E_z, H_x, H_y, dE_x, dE_y = self.view("E_z", "H_x", "H_y", "dE_x", "dE_y")
+        # 1: Update H_y
+        np.subtract(E_z[..., 1:, :], E_z[..., :-1, :], out=dE_x)
+        np.multiply(dE_x, self.C_hy, out=dE_x)
+        np.add(H_y, dE_x, out=H_y)
+
+        # 2: Update H_x
+        np.subtract(E_z[..., 1:], E_z[..., :-1], out=dE_y)
+        np.multiply(dE_y, self.C_hx, out=dE_y)
+        np.subtract(H_x, dE_y, out=H_x)
+
+    def update_H_TE_numpy(self):
+        E_x, E_y, H_z, dE = self.view("E_x", "E_y", "H_z", "dE")
+        # Update H_z with both curl terms
+        np.subtract(E_y[..., 1:, :], E_y[..., :-1, :], out=dE)
+        np.multiply(dE, self.C_hzx, out=dE)
+        np.subtract(H_z, dE, out=H_z)
+        np.subtract(E_x[..., 1:], E_x[..., :-1], out=dE)
+        np.multiply(dE, self.C_hzy, out=dE)
+        np.add(H_z, dE, out=H_z)
+
+    ## Leapfrog update of the E fields (in-place, inner space, tangential E on the edges = 0 as per boundary conditions)
+    def update_E(self):
+        # With a single pass, update_H already updated E
+        if self.single_pass:
+            return
+        if self.TM:
+            if self.backend == "numba":
+                kernels.update_E(*self.view("E_z", "H_x", "H_y", "C_ezx", "C_ezy"))
+            else:
+                self.update_E_numpy()
+        if self.TE:
+            if self.backend == "numba":
+                kernels.update_E_TE(*self.view("E_x", "E_y", "H_z", "C_exy", "C_eyx"))
+            else:
+                self.update_E_TE_numpy()
+        if self.pml is not None:
+            self.pml.update_E()
+
+    def update_E_numpy(self):
+        E_z, H_x, H_y, C_ezx, C_ezy, dH = self.view(
+            "E_z", "H_x", "H_y", "C_ezx", "C_ezy", "dH"
+        )
+        E_z = E_z[..., 1:-1, 1:-1]
+        np.subtract(H_y[..., 1:, 1:-1], H_y[..., :-1, 1:-1], out=dH)
+        np.multiply(dH, C_ezx, out=dH)
+        np.add(E_z, dH, out=E_z)
+        np.subtract(H_x[..., 1:-1, 1:], H_x[..., 1:-1, :-1], out=dH)
+        np.multiply(dH, C_ezy, out=dH)
+        np.subtract(E_z, dH, out=E_z)
+
+    def update_E_TE_numpy(self):
+        E_x, E_y, H_z, C_exy, C_eyx, dH_x, dH_y = self.view(
+            "E_x", "E_y", "H_z", "C_exy", "C_eyx", "dH_x", "dH_y"
+        )
+        E_x = E_x[..., 1:-1]
+        np.subtract(H_z[..., 1:], H_z[..., :-1], out=dH_y)
+        np.multiply(dH_y, C_exy, out=dH_y)
+        np.add(E_x, dH_y, out=E_x)
+        E_y = E_y[..., 1:-1, :]
+        np.subtract(H_z[..., 1:, :], H_z[..., :-1, :], out=dH_x)
+        np.multiply(dH_x, C_eyx, out=dH_x)
+        np.subtract(E_y, dH_x, out=E_y)
+
+    ## Choose the implementation of the field updates: "numpy" or "numba" (compiled, multi-threaded)
+    def set_backend(self, backend):
+        global kernels
+        if backend not in ("numpy", "numba"):
+            raise ValueError(
+                "backend should be 'numpy' or 'numba', not {}".format(backend)
+            )
+        if backend == "numba":
+            # Importing numba takes longer than the rest of the solver, so only when it is used
+            import kernels
+        if backend == "numba" and kernels.numba is None:
+            warnings.warn("numba is not installed, falling back to the numpy backend")
+            backend = "numpy"
+        self.backend = backend
+
     ## Implementation of the FDTD method using the leapfrog scheme
-    def FDTD(self, eps_averaging=True, plot_space=False, visualize_fields=0):
-        # Initialize the dielectric properties of the space
+    def FDTD(
+        self,
+        eps_averaging=True,
+        plot_space=False,
+        visualize_fields=0,
+        backend="numpy",
+        checkpoint=None,
+        checkpoint_interval=1000,
+        snapshot_path="./plots/snapshots",
+        snapshot_decimation=1,
+        stop=None,
+        cache=None,
+        profile=None,
+        active_region=False,
+        active_margin=ACTIVE_MARGIN,
+    ):
+        """Runs the time loop and returns the measurement points with their recorded fields
+
+        Parameters
+        ----------
+        eps_averaging : bool
+            Average eps_r over the cells around the E_z points (see initialize_space)
+        plot_space : bool
+            Plot the space before the run
+        visualize_fields : int
+            Write a snapshot of the fields every visualize_fields steps (0: never)
+        backend : str
+            "numpy" or "numba" (compiled kernels, see kernels.py)
+        checkpoint : str or None
+            Path of the checkpoint written every checkpoint_interval steps (see resume)
+        checkpoint_interval : int
+            Steps between two checkpoints
+        snapshot_path : str
+            Directory of the snapshots
+        snapshot_decimation : int
+            Only every snapshot_decimation-th cell along each axis is written
+        stop : policy, list of policies or None
+            Stopping policies which can end the run early (see stopping.py)
+        cache : cache.Cache or None
+            Reuse the results of an identical earlier run
+        profile : None, bool or profiler.Profiler
+            Time the phases of the time loop (see profiler.py)
+        active_region : bool
+            Only update the box around the line sources which their waves can
+            have reached: the light cone c t plus active_margin cells. With a
+            fixed margin this is an approximation, as the numerical dispersion
+            lets a small precursor run ahead of the light cone (up to one cell
+            per step) and the edges of the box act as PEC walls to it; in
+            test_active.py it changes the probe fields by ~1e-6 of their
+            maximum.
+        active_margin : int or None
+            Cells of the active region beyond the light cone. None derives the
+            margin from the Courant number and the time step, (1 - c Delta_t /
+            Delta) n + 2 cells, so the box covers every cell the updates can
+            have reached and the results are exact, at the cost of fewer
+            skipped updates.
+
+        Returns
+        -------
+        measurements : list
+            The measurement points, with the fields recorded at them
+        """
+        self.prepare(eps_averaging, plot_space, backend)
+        # With active_region, only the cells within the light cone of the sources are updated (see grow_region)
+        self.set_active_region(active_region, active_margin)
+        # With visualize_fields, a frame is stored in the directory snapshot_path every visualize_fields steps
+        self.snapshots = snapshot_path
+        self.snapshot_decimation = snapshot_decimation
+        # If requested, the state is saved every checkpoint_interval steps (see resume)
+        self.checkpoint = checkpoint
+        self.checkpoint_interval = checkpoint_interval
+        self.set_stop(stop)
+        self.set_profiler(profile)
+
+        # With a cache (cache.Cache), the measurements of an identical earlier run are reused
+        # Runs which write snapshots or checkpoints always run
+        key = None
+        if cache is not None and visualize_fields == 0 and checkpoint is None:
+            options = {
+                "eps_averaging": eps_averaging,
+                "backend": backend,
+                "active_region": active_region,
+                "active_margin": active_margin,
+            }
+            key = cache.key(self, dict(options, stop=self.stop))
+        if key is not None and self.load_cached(cache.load(key)):
+            return self.measurement_points
+        measurements = self.time_steps(1, visualize_fields)
+        if key is not None:
+            cache.store(key, self)
+        return measurements
+
+    ## Take the (memory-mapped) measurements and monitor values of a cached run, False on a miss
+    # The fields themselves are not cached: after a hit, E_z, H_x and H_y are the initial fields
+    def load_cached(self, entry):
+        if entry is None:
+            return False
+        self.recorder.attach(entry["data"])
+        for monitor, values in zip(self.running_dfts(), entry["monitors"]):
+            monitor.values = values
+        self.run_info = entry["run_info"]
+        length = entry["data"].shape[-1]
+        for meas in self.measurement_points:
+            meas.set_time(meas.time_H[:length], meas.time_E[:length])
+        return True
+
+    ## Instrumentation of the time loop: None, True or a profiler.Profiler (see profiler.py)
+    def set_profiler(self, profile=None):
+        self.profile = None
+        if profile is None or profile is False:
+            self.profiler = profiler.Null_profiler()
+        elif profile is True:
+            self.profiler = profiler.Profiler()
+        else:
+            self.profiler = profile
+
+    ## Policies which end the time loop early: one or a list of the classes in stopping.py (None: run all N_t steps)
+    def set_stop(self, stop=None):
+        if stop is None:
+            stop = []
+        self.stop = list(stop) if isinstance(stop, (list, tuple)) else [stop]
+
+    ## Only update the region reached by the waves of the line sources (True) or always the whole grid (False)
+    def set_active_region(self, active_region=False, active_margin=ACTIVE_MARGIN):
+        if active_region and len(self.plane_waves) > 0:
+            raise NotImplementedError(
+                "Plane waves fill their whole total field region, so they don't support an active region"
+            )
+        self.active_region = active_region and len(self.sources) > 0
+        self.active_margin = active_margin
+
+    ## Everything needed before the first time step: eps_r, update coefficients and time arrays
+    def prepare(self, eps_averaging=True, plot_space=False, backend="numpy"):
+        if self.TE and self.absorbing_boundary is not None:
+            raise NotImplementedError("The TE polarisation only supports PEC walls")
+        if self.TE and len(self.plane_waves) > 0:
+            raise NotImplementedError("The TE polarisation doesn't support plane waves")
+        if self.TE and len(self.refinements) > 0:
+            raise NotImplementedError("The TE polarisation doesn't support refinements")
+        if self.TE and len(self.far_fields) > 0:
+            raise NotImplementedError(
+                "The TE polarisation doesn't support near-to-far-field transforms"
+            )
+        for refinement in self.refinements:
+            if self.dielectrics[refinement["dielectric"]].is_dispersive():
+                raise NotImplementedError(
+                    "Refinements of lossy or dispersive dielectrics aren't supported"
+                )
+        self.set_backend(backend)
+        self.eps_averaging = eps_averaging
+        # Initialize the dielectric properties of the space and the update coefficients
         self.initialize_space(eps_averaging, plot_space)
+        self.initialize_coefficients()
+        # With nothing to do between the H and E updates (TM without absorbing boundary, plane waves or lossy
+        # and dispersive dielectrics), the numba backend updates both in one sweep over the rows of the grid
+        self.single_pass = (
+            self.backend == "numba"
+            and self.TM
+            and not self.TE
+            and self.pml is None
+            and len(self.tfsf) == 0
+            and len(self.materials) == 0
+        )
+        for monitor in self.running_dfts():
+            monitor.initialize(self)
         # Making the discrete time arrays for H (offset by half a step) and E-measurements
         time_H = (np.arange(self.N_t) + 1 / 2) * self.Delta_t
         time_E = np.arange(self.N_t) * self.Delta_t
         for meas in self.measurement_points:
             # Adding the time arrays to our measurements
             meas.set_time(time_H, time_E)
-            meas.append_fields(0, 0, 0)
-        # Returning the list of measurements
-
-        # Calculating the discretized postions of our line source
-        i_source = int(self.source.pos_x / self.Delta_x)
-        j_source = int(self.source.pos_y / self.Delta_y)
-
-        # Use the iterative update functions for our fields
-        for n in range(1, self.N_t):
-            # 1: Update H_y
-            self.H_y[:, :] += (
-                self.Delta_t
-                / (mu_0 * self.Delta_x)
-                * (self.E_z[1:, :] - self.E_z[:-1, :])
-            )
 
-            # 2: Update H_x
-            self.H_x[:, :] -= (
-                self.Delta_t
-                / (mu_0 * self.Delta_y)
-                * (self.E_z[:, 1:] - self.E_z[:, :-1])
+    ## Use the iterative update functions for our fields, from time step 'start' onwards
+    def time_steps(self, start, visualize_fields=0):
+        writer = None
+        if visualize_fields != 0 and not self.TM:
+            raise NotImplementedError("Snapshots only show the TM fields")
+        if visualize_fields != 0:
+            writer = snapshots.Snapshot_writer(
+                self.snapshots,
+                self,
+                visualize_fields,
+                self.snapshot_decimation,
+                resume=start > 1,
             )
+        for policy in self.stop:
+            policy.initialize(self)
+        # The active region starts around the sources and grows until it covers the grid
+        self.growing = self.active_region
+        self.skipped_updates = 0
+        self.set_region()
+        self.profiler.start(self, start)
+        try:
+            last, stopped_by = self.leapfrog(start, writer)
+        finally:
+            if writer is not None:
+                writer.close()
+        self.profiler.stop(last)
+        self.finish(start, last, stopped_by)
 
-            # 3: Update E_z (inner space, edges = 0 as per boundary conditions)
-            self.E_z[1:-1, 1:-1] += (
-                self.Delta_t
-                / (eps_0 * self.Delta_x)
-                * (self.H_y[1:, 1:-1] - self.H_y[:-1, 1:-1])
-                / self.space
-            )
-            self.E_z[1:-1, 1:-1] -= (
-                self.Delta_t
-                / (eps_0 * self.Delta_y)
-                * (self.H_x[1:-1, 1:] - self.H_x[1:-1, :-1])
-                / self.space
-            )
-            self.E_z[i_source, j_source] -= (
-                self.source.get_current((n - 1 / 2) * self.Delta_t)
-                * self.Delta_t
-                / (self.Delta_x * self.Delta_y * eps_0 * self.space[i_source, j_source])
-            )
+        # Getting measurements
+        return self.measurement_points
 
-            # 4: Saving measurements
+    ## Report on the time loop (run_info) and, when it stopped early, cut the measurements at the last step
+    def finish(self, start, last, stopped_by):
+        self.run_info = {
+            "steps": last,
+            "N_t": self.N_t,
+            "steps_saved": self.N_t - 1 - last,
+            "stopped_by": stopped_by,
+            "cell_updates_saved": self.skipped_updates
+            / (self.N_x * self.N_y * max(last - start + 1, 1)),
+        }
+        # The profile summary is attached to the space and to every measurement
+        if isinstance(self.profiler, profiler.Profiler):
+            self.profile = self.profiler.summary()
             for meas in self.measurement_points:
-                # Rescaling the locations to indices
-                i, j = int(meas.pos_x / self.Delta_x), int(meas.pos_y / self.Delta_y)
-                H_x = self.H_x[i, j]
-                H_y = self.H_y[i, j]
-                E_z = self.E_z[i, j]
-                meas.append_fields(H_x, H_y, E_z)
-
-            # If requested, a periodic visualisation of the space is given
-            if visualize_fields != 0 and n % visualize_fields == 0:
-                # print("".format(n*self.Delta_t))
-                self.field_plot(
-                    abs(self.E_z),
-                    "i (x-axis)",
-                    "j (y-axis)",
-                    r"$E_z\ \ t = {:.2g} s$".format(n * self.Delta_t),
-                    filename="E_z-t_{:.2g}_s".format(n * self.Delta_t),
-                )
-                self.field_plot(
-                    np.sqrt(
-                        self.H_x[
-                            1:,
-                        ]
-                        ** 2
-                        + self.H_y[:, 1:] ** 2
-                    ),
-                    "i (x-axis)",
-                    "j (y-axis)",
-                    r"Amplitude $H\ \ t = {:.2g} s$".format(n * self.Delta_t),
-                    filename="Amplitude_H-t_{:.2g}_s$".format(n * self.Delta_t),
+                meas.profile = self.profile
+        if last < self.N_t - 1:
+            self.recorder.truncate(last + 1)
+            for meas in self.measurement_points:
+                meas.set_time(meas.time_H[: last + 1], meas.time_E[: last + 1])
+
+    ## The time loop of the leapfrog scheme, returns the last time step and the policies which stopped it
+    def leapfrog(self, start, writer=None):
+        # The profiler times the phases of every step (a Null_profiler when profiling is off)
+        prof = self.profiler
+        fields = [getattr(self, name) for name in self.fields]
+        dfts = self.running_dfts()
+        n = start - 1
+        for n in range(start, self.N_t):
+            # 0: Growing the active region with the light cone of the sources
+            if self.growing:
+                self.grow_region(n)
+            prof.lap("active_region")
+
+            # 1-2: Update H_y and H_x (and H_z, with its magnetic line currents)
+            self.update_H()
+            prof.lap("update_H")
+            if self.TE:
+                np.subtract.at(
+                    self.H_z,
+                    self.source_index,
+                    self.source_terms_TE[n],
                 )
-                # plt.quiver(self.H_x[1:,].T,self.H_y[:,1:].T)
-                # plt.quiver(self.H_y[:,1:],self.H_x[1:,:])
-                # plt.show()
+                prof.lap("sources")
+            for injection in self.tfsf:
+                injection.update_H()
+            prof.lap("plane_waves")
 
-        # Getting measurements
-        return self.measurement_points
+            # 3: Update E_z (with the currents of lossy and dispersive dielectrics) and add the source currents (a single scatter-add for all line sources)
+            for material in self.materials:
+                material.update_currents()
+            prof.lap("materials")
+            self.update_E()
+            prof.lap("update_E")
+            for material in self.materials:
+                material.update_E()
+            prof.lap("materials")
+            for injection in self.tfsf:
+                injection.update_E(n)
+            prof.lap("plane_waves")
+            if self.TM:
+                np.subtract.at(self.E_z, self.source_index, self.source_terms[n])
+            prof.lap("sources")
+            for patch in self.subgrids:
+                patch.update()
+            prof.lap("subgrids")
 
-    def field_plot(self, field, x_title, y_title, title, filename=None):
-        # visualizing the source & measurement points
-        plt.scatter(
-            self.meas_pos_x, self.meas_pos_y, c="silver", label="measurement points"
-        )
-        plt.scatter(
-            self.source.pos_x // self.Delta_x,
-            self.source.pos_y // self.Delta_y,
-            c="red",
-            label="source point",
+            # 4: Saving measurements
+            self.recorder.record(n, *fields)
+            for monitor in dfts:
+                monitor.update(n, self)
+            prof.lap("probes")
+
+            # If requested, a periodic snapshot of the fields is streamed to disk (see snapshots.render)
+            if writer is not None and n % writer.interval == 0:
+                writer.put(n, self.E_z, self.H_x, self.H_y)
+            prof.lap("snapshots")
+
+            # 5: Periodically saving the state, so a crashed run can be resumed
+            if self.checkpoint is not None and n % self.checkpoint_interval == 0:
+                self.save_checkpoint(self.checkpoint, n)
+            prof.lap("checkpoint")
+
+            # 6: Ending the loop early when a stopping policy says so
+            stopped_by = [
+                type(policy).__name__ for policy in self.stop if policy.check(self, n)
+            ]
+            prof.lap("stop")
+            prof.step(n)
+            if len(stopped_by) > 0:
+                return n, stopped_by
+        return n, []
+
+    ## Restrict the updates to the cells the waves of the sources can have reached at time step n
+    def grow_region(self, n):
+        # The same distance logic as the wave_time of the measurement points: a wave travels c Delta_t per step
+        # Numerical dispersion lets a tiny precursor run ahead of it (at most one cell per step), hence the margin
+        reach = c * n * self.Delta_t
+        if self.active_margin is None:
+            # The precursor: the cells between the light cone and the reach of the updates (one cell per step),
+            # and two more for the cells of the sources and the edges of the region
+            margin_x = int(np.ceil((1 - c * self.Delta_t / self.Delta_x) * n)) + 2
+            margin_y = int(np.ceil((1 - c * self.Delta_t / self.Delta_y) * n)) + 2
+        else:
+            margin_x = margin_y = self.active_margin
+        x = [src.pos_x for src in self.sources]
+        y = [src.pos_y for src in self.sources]
+        i_0 = max(int((min(x) - reach) // self.Delta_x) - margin_x, 0)
+        i_1 = min(int(-(-(max(x) + reach) // self.Delta_x)) + margin_x + 1, self.N_x)
+        j_0 = max(int((min(y) - reach) // self.Delta_y) - margin_y, 0)
+        j_1 = min(int(-(-(max(y) + reach) // self.Delta_y)) + margin_y + 1, self.N_y)
+        if (i_0, i_1, j_0, j_1) != self.region:
+            self.set_region(i_0, i_1, j_0, j_1)
+        # Once the region covers the grid, it stays the whole grid
+        self.growing = self.region != (0, self.N_x, 0, self.N_y)
+        self.skipped_updates += self.N_x * self.N_y - (i_1 - i_0) * (j_1 - j_0)
+
+    ## Arrays which make up the state of a running simulation
+    def state(self):
+        state = {name: getattr(self, name) for name in self.fields}
+        state["measurements"] = self.recorder.data
+        if self.pml is not None:
+            for k, psi in enumerate(self.pml.arrays()):
+                state["pml_{}".format(k)] = psi
+        for k, monitor in enumerate(self.running_dfts()):
+            state["monitor_{}".format(k)] = monitor.values
+        for k, material in enumerate(self.materials):
+            for l, array in enumerate(material.arrays()):
+                state["material_{}_{}".format(k, l)] = array
+        for k, injection in enumerate(self.tfsf):
+            for name, array in zip("eh", injection.arrays()):
+                state["tfsf_{}_{}".format(name, k)] = array
+        for k, patch in enumerate(self.subgrids):
+            for l, array in enumerate(patch.arrays()):
+                state["subgrid_{}_{}".format(k, l)] = array
+        return state
+
+    ## Write the state after time step n and the description of the scenario to an .npz file
+    def save_checkpoint(self, path, n):
+        options = {
+            "eps_averaging": self.eps_averaging,
+            "backend": self.backend,
+            "checkpoint_interval": self.checkpoint_interval,
+            "snapshots": self.snapshots,
+            "snapshot_decimation": self.snapshot_decimation,
+            "active_region": self.active_region,
+            "active_margin": self.active_margin,
+        }
+        # Writing to a temporary file first, so an interrupted write never replaces a valid checkpoint
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as file:
+            np.savez(
+                file,
+                step=n,
+                scenario=json.dumps(scenario.describe(self)),
+                options=json.dumps(options),
+                **self.state(),
+            )
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    ## Continue a simulation from a checkpoint written by FDTD, returns the space once it has finished
+    @classmethod
+    def resume(cls, path, visualize_fields=0, stop=None, profile=None):
+        with np.load(path) as checkpoint:
+            box = scenario.build(json.loads(str(checkpoint["scenario"])))
+            options = json.loads(str(checkpoint["options"]))
+            box.prepare(options["eps_averaging"], False, options["backend"])
+            for name, array in box.state().items():
+                array[...] = checkpoint[name]
+            step = int(checkpoint["step"])
+        # The resumed run keeps writing to the same checkpoint
+        box.checkpoint = path
+        box.checkpoint_interval = options["checkpoint_interval"]
+        box.snapshots = options["snapshots"]
+        box.snapshot_decimation = options["snapshot_decimation"]
+        box.set_active_region(
+            options.get("active_region", False),
+            options.get("active_margin", ACTIVE_MARGIN),
         )
-        # get axis orientation right
-        plt.imshow(np.transpose(field), origin="lower")
-        plt.title(title)
-        plt.xlabel(x_title)
-        plt.ylabel(y_title)
-        plt.legend(bbox_to_anchor=(1, 1), loc="upper left")
-        fig = plt.gcf()
-        if filename is not None:
-            fig.set_size_inches(20, 12)
-            fig.savefig("./plots/" + filename + ".png")
-        plt.show()
+        box.set_stop(stop)
+        box.set_profiler(profile)
+        box.time_steps(step + 1, visualize_fields)
+        return box
+
+    def field_plot(self, field, x_title, y_title, title, filename=None):
+        plt = plotting.pyplot()
+        with plotting.style():
+            # visualizing the source & measurement points
+            plt.scatter(
+                self.meas_pos_x, self.meas_pos_y, c="silver", label="measurement points"
+            )
+            plt.scatter(
+                [src.pos_x // self.Delta_x for src in self.sources],
+                [src.pos_y // self.Delta_y for src in self.sources],
+                c="red",
+                label="source point",
+            )
+            # get axis orientation right
+            plt.imshow(np.transpose(field), origin="lower")
+            plt.title(title)
+            plt.xlabel(x_title)
+            plt.ylabel(y_title)
+            plt.legend(bbox_to_anchor=(1, 1), loc="upper left")
+            fig = plt.gcf()
+            if filename is not None:
+                fig.set_size_inches(20, 12)
+                fig.savefig("./plots/" + filename + ".png")
+        plotting.show()
 
     ## String representation function for our box-space
     def __str__(self):
-        s = "Box parameters: {} m, {} m, {} s\n".format(
-            self.x_length, self.y_length, self.t_length
+        s = "Box parameters: {} m, {} m, {} s, {}\n".format(
+            self.x_length, self.y_length, self.t_length, self.polarization
         )
         s += "Discretization: {} m, {} m, {} s\n".format(
             self.Delta_x, self.Delta_y, self.Delta_t
         )
-        s += str(self.source) + "\n"
+        for src in self.sources + self.plane_waves:
+            s += str(src) + "\n"
         s += "Dielectrics ({}):\n".format(len(self.dielectrics))
         for diel in self.dielectrics:
             s += str(diel) + "\n"
@@ -0,0 +1,402 @@
+# Importing necessary libraries and files
+import warnings
+import numpy as np
+from constants import eps_0, mu_0, c
+import measurement
+import space
+
+# Field components, in the order of the recorded probe data
+COMPONENTS = ("E_x", "E_y", "E_z", "H_x", "H_y", "H_z")
+
+
+### Space3D class: FDTD on a 3D Yee grid in a PEC box, with the API of Space
+class Space3D:
+    """3D counterpart of Space: box and sphere dielectrics, dipole sources and probes of all six components
+
+    The nodes of the grid lie at (i Delta_x, j Delta_y, k Delta_z). Every
+    component is stored in its own array of exactly the size it needs:
+
+    E_x : (N_x - 1, N_y, N_z) at (i + 1/2, j, k)
+    E_y : (N_x, N_y - 1, N_z) at (i, j + 1/2, k)
+    E_z : (N_x, N_y, N_z - 1) at (i, j, k + 1/2)
+    H_x : (N_x, N_y - 1, N_z - 1) at (i, j + 1/2, k + 1/2)
+    H_y : (N_x - 1, N_y, N_z - 1) at (i + 1/2, j, k + 1/2)
+    H_z : (N_x - 1, N_y - 1, N_z) at (i + 1/2, j + 1/2, k)
+
+    The tangential E on the walls stays zero (PEC). Memory is dominated by
+    the six components and two work buffers of the size of the largest one
+    (about 8 values per cell): the update coefficients are scalars, except
+    1/eps_r which is only stored in the bounding box of the dielectrics.
+    A time step doesn't allocate memory.
+    """
+
+    ## Initialize the space by giving its dimensions
+    def __init__(self, x_length, y_length, z_length, t_length):
+        self.dielectrics = []
+        self.source = None
+        self.sources = []
+        self.x_length = x_length
+        self.y_length = y_length
+        self.z_length = z_length
+        self.t_length = t_length
+
+    ## Discretize the space and allocate the fields (Delta_t below the Courant limit 1 / (c sqrt(sum 1 / Delta^2)))
+    def define_discretization(
+        self, Delta_x, Delta_y, Delta_z, Delta_t, dtype=np.float64
+    ):
+        self.Delta_x = Delta_x
+        self.Delta_y = Delta_y
+        self.Delta_z = Delta_z
+        self.Delta_t = Delta_t
+        self.dtype = np.dtype(dtype)
+        courant = 1 / (c * np.sqrt(1 / Delta_x ** 2 + 1 / Delta_y ** 2 + 1 / Delta_z ** 2))
+        if Delta_t > courant:
+            warnings.warn(
+                "Delta_t is above the Courant limit of {:.3g} s, the simulation will be unstable".format(
+                    courant
+                )
+            )
+
+        # Calculating the amount of space/time indices
+        self.N_x = int(self.x_length / Delta_x + 1)
+        self.N_y = int(self.y_length / Delta_y + 1)
+        self.N_z = int(self.z_length / Delta_z + 1)
+        self.N_t = int(self.t_length / Delta_t)  # t_length not inclusive
+
+        # Initializing zero-valued fields of the correct size
+        N_x, N_y, N_z = self.N_x, self.N_y, self.N_z
+        self.E_x = np.zeros((N_x - 1, N_y, N_z), dtype=self.dtype)
+        self.E_y = np.zeros((N_x, N_y - 1, N_z), dtype=self.dtype)
+        self.E_z = np.zeros((N_x, N_y, N_z - 1), dtype=self.dtype)
+        self.H_x = np.zeros((N_x, N_y - 1, N_z - 1), dtype=self.dtype)
+        self.H_y = np.zeros((N_x - 1, N_y, N_z - 1), dtype=self.dtype)
+        self.H_z = np.zeros((N_x - 1, N_y - 1, N_z), dtype=self.dtype)
+
+    ## Set the dipole source of our space (replaces all sources)
+    def set_source(self, source):
+        self.source = source
+        self.sources = [source]
+
+    ## Add a list of dipole sources (see source.Dipole)
+    def add_sources(self, sources):
+        self.sources.extend(sources)
+        if self.source is None and len(self.sources) > 0:
+            self.source = self.sources[0]
+
+    ## Add a list of dielectrics (dielectric.Box or dielectric.Sphere), later objects are drawn on top of earlier ones
+    def add_objects(self, dielectrics):
+        self.dielectrics.extend(dielectrics)
+
+    ## Add a list of measurement points in the form of: [(x, y, z), ...], as well as optional titles for the measurements
+    def add_measurement_points(self, measurement_points, measurement_titles=[]):
+        if len(measurement_titles) == 0:
+            measurement_titles = [""] * len(measurement_points)
+        self.measurement_points = np.empty(
+            len(measurement_points), dtype=measurement.Measurement
+        )
+        self.interference_times = np.empty(len(measurement_points))
+        lengths = np.array([self.x_length, self.y_length, self.z_length])
+        positions = np.array(
+            [(src.pos_x, src.pos_y, src.pos_z) for src in self.sources]
+        ).reshape(-1, 1, 3)
+        for i, point in enumerate(measurement_points):
+            point = np.asarray(point, dtype=float)
+            if np.any(point <= 0) or np.any(point >= lengths):
+                raise ValueError("Measurement points must lie inside the space")
+            # The reflection of the nearest source in the nearest of the 6 PEC walls arrives first
+            mirrored = np.tile(point, (6, 1))
+            for axis in range(3):
+                mirrored[2 * axis, axis] = -point[axis]
+                mirrored[2 * axis + 1, axis] = 2 * lengths[axis] - point[axis]
+            distances = np.linalg.norm(mirrored - positions, axis=-1)
+            self.interference_times[i] = np.min(distances, initial=np.inf) / c
+            meas = measurement.Measurement(
+                point[0], point[1], self.interference_times[i], measurement_titles[i]
+            )
+            meas.pos_z = point[2]
+            if len(self.sources) > 0:
+                meas.wave_time = (
+                    np.min(np.linalg.norm(point - positions[:, 0], axis=-1)) / c
+                )
+            self.measurement_points[i] = meas
+        # Preallocating the storage for all six components at every measurement point and time step
+        self.recorder = measurement.Recorder(
+            self.measurement_points,
+            [int(meas.pos_x / self.Delta_x) for meas in self.measurement_points],
+            [int(meas.pos_y / self.Delta_y) for meas in self.measurement_points],
+            self.N_t,
+            self.dtype,
+            indices_z=[
+                int(meas.pos_z / self.Delta_z) for meas in self.measurement_points
+            ],
+            components=COMPONENTS,
+        )
+        return self.interference_times
+
+    ## Coordinates of the inner points (not on the PEC walls) of an E component, along x, y and z
+    def inner_points(self, component):
+        N = (self.N_x, self.N_y, self.N_z)
+        Delta = (self.Delta_x, self.Delta_y, self.Delta_z)
+        axis = "xyz".index(component[-1])
+        return [
+            (
+                (np.arange(N[a] - 1) + 1 / 2) * Delta[a]
+                if a == axis
+                else np.arange(1, N[a] - 1) * Delta[a]
+            )
+            for a in range(3)
+        ]
+
+    ## eps_r at the points x (along x) times y times z, averaged over the cell around every point
+    def permittivity(self, x, y, z, eps_averaging=True, samples=4):
+        # Without averaging, every point takes the eps_r of the dielectric it lies in
+        offsets = np.zeros(1)
+        if eps_averaging:
+            offsets = (np.arange(samples) + 1 / 2) / samples - 1 / 2
+        y_samples = (y[:, None] + offsets * self.Delta_y)[None, :, :, None, None]
+        z_samples = (z[:, None] + offsets * self.Delta_z)[None, None, None, :, :]
+        eps_r = np.ones((len(x), len(y), len(z)))
+        # One plane of points at a time, so the sample points take little memory
+        for i, x_i in enumerate(x):
+            x_samples = (x_i + offsets * self.Delta_x)[:, None, None, None, None]
+            for diel in self.dielectrics:
+                fraction = diel.contains(x_samples, y_samples, z_samples).mean(
+                    axis=(0, 2, 4)
+                )
+                eps_r[i] += fraction * (diel.eps_r - eps_r[i])
+        return eps_r
+
+    ## 1/eps_r of the inner points of every E component, in the bounding box of the dielectrics only
+    def initialize_space(self, eps_averaging=True, samples=4):
+        self.eps_averaging = eps_averaging
+        self.blocks = {}
+        if len(self.dielectrics) == 0:
+            return
+        low = np.min(
+            [(diel.pos_x, diel.pos_y, diel.pos_z) for diel in self.dielectrics], axis=0
+        )
+        high = np.max(
+            [
+                (
+                    diel.pos_x + diel.width,
+                    diel.pos_y + diel.height,
+                    diel.pos_z + diel.depth,
+                )
+                for diel in self.dielectrics
+            ],
+            axis=0,
+        )
+        Delta = np.array([self.Delta_x, self.Delta_y, self.Delta_z])
+        for component in ("E_x", "E_y", "E_z"):
+            points = self.inner_points(component)
+            # Every point whose cell can overlap a dielectric
+            region = tuple(
+                slice(
+                    np.searchsorted(points[a], low[a] - Delta[a]),
+                    np.searchsorted(points[a], high[a] + Delta[a], side="right"),
+                )
+                for a in range(3)
+            )
+            eps_r = self.permittivity(
+                *(points[a][region[a]] for a in range(3)), eps_averaging, samples
+            )
+            self.blocks[component] = (region, (1 / eps_r).astype(self.dtype))
+
+    ## Precompute the update coefficients, work buffers and the views used by every time step
+    def initialize_coefficients(self):
+        dt = self.dtype.type
+        C_h = [dt(self.Delta_t / (mu_0 * Delta)) for Delta in self.Deltas()]
+        C_e = [dt(self.Delta_t / (eps_0 * Delta)) for Delta in self.Deltas()]
+        E_x, E_y, E_z = self.E_x, self.E_y, self.E_z
+        H_x, H_y, H_z = self.H_x, self.H_y, self.H_z
+
+        # Two work buffers of the size of the largest component, shared by all updates
+        self.work = np.empty((2, max(E_x.size, E_y.size, E_z.size)), dtype=self.dtype)
+
+        # H -= C_a (A[0] - A[1]) - C_b (B[0] - B[1]), with A and B the differences of E of the curl
+        self.H_terms = [
+            (H, A, B, C_a, C_b, self.work_views(H.shape))
+            for H, A, B, C_a, C_b in [
+                (
+                    H_x,
+                    (E_z[:, 1:], E_z[:, :-1]),
+                    (E_y[:, :, 1:], E_y[:, :, :-1]),
+                    C_h[1],
+                    C_h[2],
+                ),
+                (
+                    H_y,
+                    (E_x[:, :, 1:], E_x[:, :, :-1]),
+                    (E_z[1:], E_z[:-1]),
+                    C_h[2],
+                    C_h[0],
+                ),
+                (H_z, (E_y[1:], E_y[:-1]), (E_x[:, 1:], E_x[:, :-1]), C_h[0], C_h[1]),
+            ]
+        ]
+        # E += (C_a (A[0] - A[1]) - C_b (B[0] - B[1])) / eps_r on the inner points
+        self.E_terms = [
+            (E, A, B, C_a, C_b, self.work_views(E.shape), self.blocks.get(component))
+            for component, E, A, B, C_a, C_b in [
+                (
+                    "E_x",
+                    E_x[:, 1:-1, 1:-1],
+                    (H_z[:, 1:, 1:-1], H_z[:, :-1, 1:-1]),
+                    (H_y[:, 1:-1, 1:], H_y[:, 1:-1, :-1]),
+                    C_e[1],
+                    C_e[2],
+                ),
+                (
+                    "E_y",
+                    E_y[1:-1, :, 1:-1],
+                    (H_x[1:-1, :, 1:], H_x[1:-1, :, :-1]),
+                    (H_z[1:, :, 1:-1], H_z[:-1, :, 1:-1]),
+                    C_e[2],
+                    C_e[0],
+                ),
+                (
+                    "E_z",
+                    E_z[1:-1, 1:-1, :],
+                    (H_y[1:, 1:-1, :], H_y[:-1, 1:-1, :]),
+                    (H_x[1:-1, 1:, :], H_x[1:-1, :-1, :]),
+                    C_e[0],
+                    C_e[1],
+                ),
+            ]
+        ]
+
+        # Dipoles, grouped per component: E -= Delta_t I / (eps_0 eps_r dA) in the cell of the dipole
+        self.source_groups = []
+        time_source = (np.arange(self.N_t) - 1 / 2) * self.Delta_t
+        for axis in "xyz":
+            sources = [src for src in self.sources if src.axis == axis]
+            if len(sources) == 0:
+                continue
+            a = "xyz".index(axis)
+            component = "E_" + axis
+            index = np.array(
+                [
+                    (
+                        int(src.pos_x / self.Delta_x),
+                        int(src.pos_y / self.Delta_y),
+                        int(src.pos_z / self.Delta_z),
+                    )
+                    for src in sources
+                ]
+            )
+            N = np.array([self.N_x, self.N_y, self.N_z])
+            others = [b for b in range(3) if b != a]
+            # Off the walls across the dipole, and inside the space along it (E_axis has N - 1 points along the axis)
+            if (
+                np.any(index[:, others] < 1)
+                or np.any(index[:, others] > N[others] - 2)
+                or np.any(index[:, a] < 0)
+                or np.any(index[:, a] > N[a] - 2)
+            ):
+                raise ValueError(
+                    "Dipoles must lie inside the space and can't lie on the PEC walls"
+                )
+            # eps_r at the position of the component
+            points = index * np.array(self.Deltas())
+            points[:, a] += self.Deltas()[a] / 2
+            eps_r = np.array(
+                [
+                    self.permittivity(*point[:, None], self.eps_averaging)[0, 0, 0]
+                    for point in points
+                ]
+            )
+            area = np.prod([self.Deltas()[b] for b in others])
+            C_sources = self.Delta_t / (eps_0 * eps_r * area)
+            currents = np.stack(
+                [src.get_current(time_source) for src in sources], axis=1
+            )
+            self.source_groups.append(
+                (getattr(self, component), tuple(index.T), currents * C_sources)
+            )
+
+    def Deltas(self):
+        return (self.Delta_x, self.Delta_y, self.Delta_z)
+
+    ## Views of the work buffers with the given shape
+    def work_views(self, shape):
+        size = int(np.prod(shape))
+        return self.work[0, :size].reshape(shape), self.work[1, :size].reshape(shape)
+
+    ## C_a (A[0] - A[1]) - C_b (B[0] - B[1]) in the first work buffer, without allocating memory
+    @staticmethod
+    def curl(A, B, C_a, C_b, work):
+        d_A, d_B = work
+        np.subtract(A[0], A[1], out=d_A)
+        np.multiply(d_A, C_a, out=d_A)
+        np.subtract(B[0], B[1], out=d_B)
+        np.multiply(d_B, C_b, out=d_B)
+        return np.subtract(d_A, d_B, out=d_A)
+
+    ## Leapfrog update of the H fields (in-place)
+    def update_H(self):
+        for H, A, B, C_a, C_b, work in self.H_terms:
+            np.subtract(H, self.curl(A, B, C_a, C_b, work), out=H)
+
+    ## Leapfrog update of the E fields (in-place, inner points, the tangential E on the walls stays 0)
+    def update_E(self):
+        for E, A, B, C_a, C_b, work, block in self.E_terms:
+            curl = self.curl(A, B, C_a, C_b, work)
+            if block is not None:
+                region, inv_eps_r = block
+                np.multiply(curl[region], inv_eps_r, out=curl[region])
+            np.add(E, curl, out=E)
+
+    ## Memory taken by the fields, work buffers and 1/eps_r [bytes]
+    def nbytes(self):
+        arrays = [getattr(self, component) for component in COMPONENTS] + [self.work]
+        arrays += [inv_eps_r for _, inv_eps_r in self.blocks.values()]
+        return sum(array.nbytes for array in arrays)
+
+    # The profiler selection and the run_info of the time loop are those of Space
+    set_profiler = space.Space.set_profiler
+    finish = space.Space.finish
+
+    ## Implementation of the FDTD method using the leapfrog scheme
+    def FDTD(self, eps_averaging=True, profile=None):
+        self.initialize_space(eps_averaging)
+        self.initialize_coefficients()
+        time_H = (np.arange(self.N_t) + 1 / 2) * self.Delta_t
+        time_E = np.arange(self.N_t) * self.Delta_t
+        for meas in self.measurement_points:
+            meas.set_time(time_H, time_E)
+
+        # Instrumentation of the time loop and the report on it, as in Space (see profiler.py)
+        self.set_profiler(profile)
+        self.profiler.start(self, 1)
+        self.leapfrog()
+        self.profiler.stop(self.N_t - 1)
+        self.skipped_updates = 0
+        self.finish(1, self.N_t - 1, [])
+        return self.measurement_points
+
+    ## The time loop of the leapfrog scheme
+    def leapfrog(self):
+        prof = self.profiler
+        fields = [getattr(self, component) for component in COMPONENTS]
+        for n in range(1, self.N_t):
+            self.update_H()
+            prof.lap("update_H")
+            self.update_E()
+            prof.lap("update_E")
+            for E, index, terms in self.source_groups:
+                np.subtract.at(E, index, terms[n])
+            prof.lap("sources")
+            self.recorder.record(n, *fields)
+            prof.lap("probes")
+            prof.step(n)
+
+    ## String representation function for our box-space
+    def __str__(self):
+        s = "Box parameters: {} m, {} m, {} m, {} s\n".format(
+            self.x_length, self.y_length, self.z_length, self.t_length
+        )
+        s += "Dielectrics:\n" + "".join(
+            "{}\n".format(diel) for diel in self.dielectrics
+        )
+        s += "".join(str(src) for src in self.sources)
+        return s
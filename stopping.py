@@ -0,0 +1,98 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0, mu_0
+
+
+### Probe_deadline class: stop once every measurement point is past its interference time
+class Probe_deadline:
+    ## Called by Space.FDTD before the first time step
+    def initialize(self, box):
+        # Measurements are used up to (not including) time step interference_time // Delta_t
+        self.last_step = max(
+            [
+                int(meas.interference_time // box.Delta_t)
+                for meas in box.measurement_points
+            ],
+            default=box.N_t,
+        )
+
+    ## True when the loop can stop after time step n
+    def check(self, box, n):
+        return n + 1 >= self.last_step
+
+    ## Description of the policy (part of the key of cached results)
+    def to_dict(self):
+        return {"type": "Probe_deadline"}
+
+
+### Energy_decay class: stop once the sources are off and the field energy fell below a fraction of its maximum
+class Energy_decay:
+    def __init__(self, threshold=10 ** (-6), interval=100):
+        self.threshold = threshold
+        self.interval = interval
+
+    def initialize(self, box):
+        self.maximum = 0
+        # Last time step with a noticeable source term
+        sources = np.abs(box.source_terms).max(axis=1, initial=0)
+        self.source_end = np.nonzero(sources > self.threshold * sources.max(initial=0))[
+            0
+        ].max(initial=0)
+        for injection in box.tfsf:
+            waveform = np.abs(injection.waveform)
+            self.source_end = max(
+                self.source_end,
+                np.nonzero(waveform > self.threshold * waveform.max())[0].max(
+                    initial=0
+                ),
+            )
+
+    ## Electromagnetic energy per unit length in the space [J/m]
+    def energy(self, box):
+        energy = 0
+        if box.TM:
+            E_z = box.E_z[1:-1, 1:-1].astype(np.float64)
+            energy += eps_0 * np.sum(box.space * E_z ** 2)
+            energy += mu_0 * (
+                np.sum(box.H_x.astype(np.float64) ** 2)
+                + np.sum(box.H_y.astype(np.float64) ** 2)
+            )
+        if box.TE:
+            E_x = box.E_x[:, 1:-1].astype(np.float64)
+            E_y = box.E_y[1:-1, :].astype(np.float64)
+            energy += eps_0 * (
+                np.sum(box.space_x * E_x ** 2) + np.sum(box.space_y * E_y ** 2)
+            )
+            energy += mu_0 * np.sum(box.H_z.astype(np.float64) ** 2)
+        return energy / 2 * box.Delta_x * box.Delta_y
+
+    def check(self, box, n):
+        if n % self.interval != 0:
+            return False
+        energy = self.energy(box)
+        self.maximum = max(self.maximum, energy)
+        return n > self.source_end and energy <= self.threshold * self.maximum
+
+    def to_dict(self):
+        return {
+            "type": "Energy_decay",
+            "threshold": self.threshold,
+            "interval": self.interval,
+        }
+
+
+### Callback class: stop when function(box, n) returns True, asked every interval time steps
+class Callback:
+    def __init__(self, function, interval=100):
+        self.function = function
+        self.interval = interval
+
+    def initialize(self, box):
+        pass
+
+    def check(self, box, n):
+        return n % self.interval == 0 and bool(self.function(box, n))
+
+    ## An arbitrary function can't be described, so runs with a callback are never cached
+    def to_dict(self):
+        return None
@@ -0,0 +1,114 @@
+# Importing necessary libraries and files
+import numpy as np
+import geometry
+
+
+### Subgrid class: refinement patch with ratio times smaller cells and time steps, coupled to the space around it
+class Subgrid:
+    """Local mesh refinement of a rectangle of the space
+
+    The patch covers the E_z points i0..i1, j0..j1 of the (coarse) space
+    and is itself a Space with cells and time step divided by an odd ratio,
+    so every coarse E_z, H_x and H_y point inside the patch coincides with a
+    fine point in space and (for H, at the middle sub-step) in time.
+
+    Every coarse time step:
+
+    1. the coarse grid is updated everywhere, as if there was no patch
+    2. the patch makes ratio sub-steps, with its edges (E_z) interpolated
+       linearly in space and time from the coarse E_z on the patch border
+    3. the coarse fields inside the patch are replaced by the fine ones
+
+    The patch border should lie in a homogeneous region, away from sources
+    and dielectric interfaces.
+    """
+
+    ## Build the fine grid of the patch (after the update coefficients of the coarse space)
+    def __init__(self, box, i0, i1, j0, j1, ratio, eps_averaging=True):
+        if ratio % 2 != 1:
+            raise ValueError("The refinement ratio has to be odd")
+        if not (1 <= i0 < i1 <= box.N_x - 2) or not (1 <= j0 < j1 <= box.N_y - 2):
+            raise ValueError("A refinement patch must lie inside the space")
+        for src in box.sources:
+            if (
+                i0 <= int(src.pos_x / box.Delta_x) <= i1
+                and j0 <= int(src.pos_y / box.Delta_y) <= j1
+            ):
+                raise ValueError("Line sources can't lie inside a refinement patch")
+        self.box = box
+        self.i0, self.i1, self.j0, self.j1 = i0, i1, j0, j1
+        self.ratio = ratio
+
+        # The fine grid is a space of its own, without sources (its edges are set by the coarse grid)
+        # Half a fine cell is added to the lengths, so rounding can't lose the last row or column
+        r = ratio
+        self.fine = type(box)(
+            (i1 - i0 + 1 / (2 * r)) * box.Delta_x,
+            (j1 - j0 + 1 / (2 * r)) * box.Delta_y,
+            box.Delta_t,
+        )
+        self.fine.define_discretization(
+            box.Delta_x / r, box.Delta_y / r, box.Delta_t / r, dtype=box.dtype
+        )
+        self.fine.set_backend(box.backend)
+        self.fine.space = geometry.permittivity_map(
+            box.dielectrics,
+            self.fine.N_x,
+            self.fine.N_y,
+            self.fine.Delta_x,
+            self.fine.Delta_y,
+            eps_averaging,
+            origin=(i0 * box.Delta_x, j0 * box.Delta_y),
+        )
+        self.fine.initialize_coefficients()
+
+        # Coarse E_z on the border at the previous time step: [left, right, bottom, top]
+        self.border_old = [np.zeros(len(side), box.dtype) for side in self.border()]
+        # Fine positions of the coarse points along the x and y sides (for the interpolation)
+        self.coarse_x = np.arange(i1 - i0 + 1) * r
+        self.coarse_y = np.arange(j1 - j0 + 1) * r
+        self.fine_x = np.arange(self.fine.N_x)
+        self.fine_y = np.arange(self.fine.N_y)
+
+    ## Coarse E_z on the border of the patch: [left, right, bottom, top]
+    def border(self):
+        E_z, i0, i1, j0, j1 = self.box.E_z, self.i0, self.i1, self.j0, self.j1
+        return [
+            E_z[i0, j0 : j1 + 1],
+            E_z[i1, j0 : j1 + 1],
+            E_z[i0 : i1 + 1, j0],
+            E_z[i0 : i1 + 1, j1],
+        ]
+
+    ## Set the edges of the fine E_z to the coarse border, interpolated at a fraction of the coarse time step
+    def set_edges(self, border_new, fraction):
+        E_z = self.fine.E_z
+        left, right, bottom, top = (
+            old + fraction * (new - old)
+            for old, new in zip(self.border_old, border_new)
+        )
+        E_z[0, :] = np.interp(self.fine_y, self.coarse_y, left)
+        E_z[-1, :] = np.interp(self.fine_y, self.coarse_y, right)
+        E_z[:, 0] = np.interp(self.fine_x, self.coarse_x, bottom)
+        E_z[:, -1] = np.interp(self.fine_x, self.coarse_x, top)
+
+    ## Advance the patch by one coarse time step (after the coarse update) and replace the coarse fields inside it
+    def update(self):
+        box, fine, r = self.box, self.fine, self.ratio
+        i0, i1, j0, j1 = self.i0, self.i1, self.j0, self.j1
+        border_new = [side.copy() for side in self.border()]
+        for m in range(r):
+            fine.update_H()
+            if m == (r - 1) // 2:
+                # The fine H of this sub-step lives at the same time as the coarse H
+                box.H_y[i0:i1, j0 + 1 : j1] = fine.H_y[(r - 1) // 2 :: r, r:-1:r]
+                box.H_x[i0 + 1 : i1, j0:j1] = fine.H_x[r:-1:r, (r - 1) // 2 :: r]
+            fine.update_E()
+            self.set_edges(border_new, (m + 1) / r)
+        box.E_z[i0 + 1 : i1, j0 + 1 : j1] = fine.E_z[r:-1:r, r:-1:r]
+        for old, new in zip(self.border_old, border_new):
+            old[...] = new
+
+    ## The arrays of the patch (the state of the refinement)
+    def arrays(self):
+        return [self.fine.E_z, self.fine.H_x, self.fine.H_y] + self.border_old
@@ -0,0 +1,153 @@
+# Importing necessary libraries and files
+import itertools
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+
+### Sweep_result class: Stacked measurement data of all the runs of a parameter sweep
+class Sweep_result:
+    ## Initialization with the (ordered) parameters and the results of the separate runs
+    def __init__(self, params, runs):
+        self.params = params
+        # Runs which raised an exception are kept as their traceback
+        self.errors = {k: run["error"] for k, run in enumerate(runs) if "error" in run}
+        succeeded = [run for run in runs if "error" not in run]
+
+        # Runs with a different discretization have a different amount of time steps,
+        # so the data is stacked in an array padded with NaN up to the longest run
+        self.lengths = np.array(
+            [run["data"].shape[-1] if "data" in run else 0 for run in runs]
+        )
+        self.Delta_t = np.array([run.get("Delta_t", np.nan) for run in runs])
+        self.durations = np.array([run.get("duration", np.nan) for run in runs])
+        # Time steps skipped by the stopping policies (see stopping.py)
+        self.steps_saved = np.array([run.get("steps_saved", 0) for run in runs])
+        shape = succeeded[0]["data"].shape[:-1] if succeeded else (0, 3)
+        # data[k, p, 0/1/2, n] holds H_x/H_y/E_z of probe p at time step n for the k-th parameter
+        self.data = np.full(
+            (len(runs),) + shape + (max(self.lengths, default=0),), np.nan
+        )
+        for k, run in enumerate(runs):
+            if "data" in run:
+                self.data[k, ..., : self.lengths[k]] = run["data"]
+
+    ## Index of a given parameter in the sweep
+    def index(self, param):
+        return self.params.index(param)
+
+    ## Data (n_probes, 3, N_t) of the run for the given parameter, without padding
+    def __getitem__(self, param):
+        k = self.index(param)
+        if k in self.errors:
+            raise RuntimeError(
+                "The run for {} failed:\n{}".format(param, self.errors[k])
+            )
+        return self.data[k, ..., : self.lengths[k]]
+
+    ## Time arrays (time_H, time_E) of the run for the given parameter
+    def times(self, param):
+        k = self.index(param)
+        time_E = np.arange(self.lengths[k]) * self.Delta_t[k]
+        return time_E + self.Delta_t[k] / 2, time_E
+
+    def __len__(self):
+        return len(self.params)
+
+
+## Build and simulate a single scenario (runs in a worker process)
+def run_scenario(build_fn, param, fdtd_kwargs):
+    start = time.perf_counter()
+    try:
+        box = build_fn(**param) if isinstance(param, dict) else build_fn(param)
+        box.FDTD(**fdtd_kwargs)
+        return {
+            "data": box.recorder.data,
+            "Delta_t": box.Delta_t,
+            "duration": time.perf_counter() - start,
+            "steps_saved": box.run_info["steps_saved"],
+        }
+    except Exception:
+        return {
+            "error": traceback.format_exc(),
+            "duration": time.perf_counter() - start,
+        }
+
+
+## Print the progress of a sweep on a single line
+def print_progress(done, total, param, run):
+    status = "failed" if "error" in run else "{:.2f} s".format(run["duration"])
+    if run.get("steps_saved", 0) > 0:
+        status += " ({} steps saved)".format(run["steps_saved"])
+    sys.stdout.write("\r[{}/{}] {}: {}".format(done, total, param, status))
+    if done == total:
+        sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+## Run independent FDTD simulations for every parameter in a process pool
+def sweep(build_fn, param_grid, workers=None, progress=print_progress, **fdtd_kwargs):
+    """Runs Space.FDTD for every parameter of param_grid in parallel
+
+    Parameters
+    ----------
+    build_fn : callable
+        Module-level function returning a Space (with source, discretization
+        and measurement points) for a given parameter
+    param_grid : list or dict
+        List of parameters passed to build_fn one by one, or a dict mapping
+        keyword names to lists of values, of which all combinations are
+        passed to build_fn as keyword arguments
+    workers : int
+        Number of worker processes (default: the amount of CPUs)
+    progress : callable
+        Called as progress(done, total, param, run) after every finished run,
+        None to stay silent
+    **fdtd_kwargs
+        Keyword arguments for Space.FDTD (plotting is disabled by default)
+
+    Returns
+    -------
+    result : Sweep_result
+        Stacked measurement data keyed by parameter; failed runs are NaN and
+        their traceback is kept in result.errors
+    """
+    if isinstance(param_grid, dict):
+        names = list(param_grid.keys())
+        params = [
+            dict(zip(names, values))
+            for values in itertools.product(*param_grid.values())
+        ]
+    else:
+        params = list(param_grid)
+    fdtd_kwargs.setdefault("plot_space", False)
+    fdtd_kwargs.setdefault("visualize_fields", 0)
+    workers = min(workers or os.cpu_count(), len(params))
+
+    runs = [None] * len(params)
+    if workers <= 1:
+        # No need for a process pool
+        for k, param in enumerate(params):
+            runs[k] = run_scenario(build_fn, param, fdtd_kwargs)
+            if progress is not None:
+                progress(k + 1, len(params), param, runs[k])
+        return Sweep_result(params, runs)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(run_scenario, build_fn, param, fdtd_kwargs): k
+            for k, param in enumerate(params)
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            k = futures[future]
+            try:
+                runs[k] = future.result()
+            except Exception:
+                # The worker itself died (e.g. killed or out of memory)
+                runs[k] = {"error": traceback.format_exc()}
+            if progress is not None:
+                progress(done, len(params), params[k], runs[k])
+    return Sweep_result(params, runs)
@@ -0,0 +1,97 @@
+import sys
+import tracemalloc
+import numpy as np
+from constants import c
+import space
+import space3d
+import source
+import dielectric
+import timeit
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = 1 / (2 * c * np.sqrt(3 / Delta ** 2))  # [s] (half the 3D Courant limit)
+src_parameters = (1, 30 * Delta_t, 8 * Delta_t)  # J0 [A], tc [s], sigma [s]
+
+# 1. A z-invariant 3D problem (a column of z-dipoles and a slab through the whole depth) is the 2D TMz problem
+x_length, y_length, z_length = 0.04, 0.04, 0.004  # [m]
+t_length = 150 * Delta_t  # [s]
+points = [(0.015, 0.02), (0.03, 0.02)]
+
+box = space.Space(x_length, y_length, t_length)
+box.set_source(source.Gaussian_pulse(0.02, 0.02, *src_parameters))
+box.add_objects([dielectric.Dielectric(0.025, 0.01, 0.01, 0.02, 4)])
+box.define_discretization(Delta, Delta, Delta_t)
+box.add_measurement_points(points)
+measurements_2d = box.FDTD(plot_space=False)
+
+box_3d = space3d.Space3D(x_length, y_length, z_length, t_length)
+box_3d.add_sources(
+    [
+        source.Dipole(0.02, 0.02, (k + 1 / 2) * Delta, *src_parameters)
+        for k in range(int(z_length / Delta))
+    ]
+)
+box_3d.add_objects([dielectric.Box(0.025, 0.01, -Delta, 0.01, 0.02, 0.01, 4)])
+box_3d.define_discretization(Delta, Delta, Delta, Delta_t)
+box_3d.add_measurement_points([(x, y, z_length / 2) for x, y in points])
+measurements_3d = box_3d.FDTD()
+for meas_2d, meas_3d in zip(measurements_2d, measurements_3d):
+    print(
+        "z-invariant, ({}, {}): max |E_z 3D - E_z 2D| / max |E_z 2D| = {:.2g}, max |E_x|, |H_z| = {:.2g}, {:.2g}".format(
+            meas_2d.pos_x,
+            meas_2d.pos_y,
+            np.max(np.abs(meas_3d.E_z - meas_2d.E_z)) / np.max(np.abs(meas_2d.E_z)),
+            np.max(np.abs(meas_3d.E_x)),
+            np.max(np.abs(meas_3d.H_z)),
+        )
+    )
+
+
+# 2. Scattering by a dielectric sphere: throughput and memory of the 3D time loop
+def experiment(cells, steps):
+    length = cells * Delta
+    box = space3d.Space3D(length, length, length, (steps + 1) * Delta_t)
+    box.add_objects(
+        [dielectric.Sphere(length / 2, length / 2, length / 2, length / 6, 4)]
+    )
+    box.set_source(
+        source.Dipole(length / 4, length / 2, length / 2, *src_parameters, axis="y")
+    )
+    box.define_discretization(Delta, Delta, Delta, Delta_t)
+    box.add_measurement_points(
+        [(3 * length / 4, length / 2, length / 2), (length / 2, length / 4, length / 2)]
+    )
+    return box
+
+
+for cells in [32, 64, 96]:
+    steps = 100
+    box = experiment(cells, steps)
+    start = timeit.default_timer()
+    box.FDTD()
+    time = timeit.default_timer() - start
+
+    # Allocations within the time steps (tracemalloc), on a shorter run
+    box = experiment(cells, 10)
+    box.initialize_space()
+    box.initialize_coefficients()
+    fields = [getattr(box, component) for component in space3d.COMPONENTS]
+    box.update_H(), box.update_E(), box.recorder.record(1, *fields)
+    tracemalloc.start()
+    blocks = sys.getallocatedblocks()
+    current, _ = tracemalloc.get_traced_memory()
+    for n in range(2, 10):
+        box.update_H()
+        box.update_E()
+        box.recorder.record(n, *fields)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(
+        "sphere, {}^3 cells: {:.3g} cell updates/s, {:.1f} bytes/cell, {} B temporaries per step, {} blocks leaked".format(
+            cells,
+            box.N_x * box.N_y * box.N_z * steps / time,
+            box.nbytes() / (box.N_x * box.N_y * box.N_z),
+            peak - current,
+            sys.getallocatedblocks() - blocks,
+        )
+    )
@@ -6,9 +6,16 @@ import space
 import source
 import dielectric
 import measurement
+import sweep
+import stopping
 
+# Defining experiment parameters
+J0 = 1
+start_time = 0.25 * 10 ** (-9)
+simulation_time = 1.6 * 10 ** (-9)
 
-def experiment(J0, eps_r, start_time, simulation_time):
+
+def experiment(eps_r):
     d = 0.05
     # PEC box parameters
     x_length, y_length = 0.5, 0.5  # [m] (i.c. approximately 30 wavelengths)
@@ -23,7 +30,6 @@ def experiment(J0, eps_r, start_time, simulation_time):
     )
     box.set_source(src)
 
-    print("lambda_min ({}): {}".format(eps_r, src.get_lambda_min(eps_r)))
     Delta_p = src.get_lambda_min(eps_r) / 25
     Delta_t = 1 / (3 * c * np.sqrt(2 / Delta_p ** 2))
     box.define_discretization(Delta_p, Delta_p, Delta_t)
@@ -34,115 +40,111 @@ def experiment(J0, eps_r, start_time, simulation_time):
         (1 / 2 * x_length + d, 1 / 2 * y_length),
     ]
     measurement_titles = ["Reflected field", "Transmitted field"]
-
-    # Getting measurments
     box.add_measurement_points(measurement_points, measurement_titles)
-    measurements = box.FDTD(
-        plot_space=False, visualize_fields=False, eps_averaging=False
-    )
-    start = int(start_time / Delta_t)
-    return np.array(
-        [
-            measurements[0].time_E[start:],
-            measurements[0].time_H[start:],
-            measurements[0].H_x[start:],
-            measurements[0].H_y[start:],
-            measurements[0].E_z[start:],
-            measurements[1].H_x[start:],
-            measurements[1].H_y[start:],
-            measurements[1].E_z[start:],
-        ]
-    )
+    return box
 
 
-measurements = []
-epsilons = []
-for i in range(1, 21):
-    measurements.append(experiment(1, i, 0.25 * 10 ** (-9), 1.6 * 10 ** (-9)))
-    epsilons.append(i)
+# The guard keeps worker processes from rerunning the sweep when they import this script
+if __name__ == "__main__":
+    # Running the experiments for all eps_r in parallel (one process per experiment)
+    epsilons = list(range(1, 21))
+    # Samples after the interference time are not used, so each run stops once its probes are past it
+    results = sweep.sweep(
+        experiment, epsilons, eps_averaging=False, stop=stopping.Probe_deadline()
+    )
+    print("{} time steps saved in total".format(np.sum(results.steps_saved)))
+    measurements = []
+    for eps_r in epsilons:
+        time_H, time_E = results.times(eps_r)
+        start = int(start_time / results.Delta_t[results.index(eps_r)])
+        # Reflected (probe 0) and transmitted (probe 1) H_x, H_y and E_z
+        fields = results[eps_r][:, :, start:].reshape(6, -1)
+        measurements.append(
+            np.concatenate([[time_E[start:], time_H[start:]], fields], axis=0)
+        )
 
-# Separate all fields
-E_times = [measure[0] for measure in measurements]
-H_times = [measure[1] for measure in measurements]
-H_x_r = [measure[2] for measure in measurements]
-H_y_r = [measure[3] for measure in measurements]
-E_z_r = [measure[4] for measure in measurements]
-H_x_t = [measure[5] for measure in measurements]
-H_y_t = [measure[6] for measure in measurements]
-E_z_t = [measure[7] for measure in measurements]
-labels = ["eps_r = {}".format(eps_r) for eps_r in epsilons]
+    # Separate all fields
+    E_times = [measure[0] for measure in measurements]
+    H_times = [measure[1] for measure in measurements]
+    H_x_r = [measure[2] for measure in measurements]
+    H_y_r = [measure[3] for measure in measurements]
+    E_z_r = [measure[4] for measure in measurements]
+    H_x_t = [measure[5] for measure in measurements]
+    H_y_t = [measure[6] for measure in measurements]
+    E_z_t = [measure[7] for measure in measurements]
+    labels = ["eps_r = {}".format(eps_r) for eps_r in epsilons]
 
-# Make and save all possible plots for these situations
-measurement.plot_multiple(
-    E_times,
-    E_z_t,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Transmitted E_z-fields for various eps_r",
-    "E_z_t_eps_r",
-)
-measurement.plot_multiple(
-    E_times,
-    E_z_r,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Reflected E_z-fields for various eps_r",
-    "E_z_r_eps_r",
-)
-measurement.plot_multiple(
-    H_times,
-    H_x_t,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Transmitted H_x-fields for various eps_r",
-    "H_x_t_eps_r",
-)
-measurement.plot_multiple(
-    H_times,
-    H_x_r,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Reflected H_x-fields for various eps_r",
-    "H_x_r_eps_r",
-)
-measurement.plot_multiple(
-    H_times,
-    H_y_t,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Transmitted H_y-fields for various eps_r",
-    "H_y_t_eps_r",
-)
-measurement.plot_multiple(
-    H_times,
-    H_y_r,
-    labels,
-    "time [s]",
-    "E_z [V/m]",
-    "Reflected H_y-fields for various eps_r",
-    "H_y_r_eps_r",
-)
+    # Make and save all possible plots for these situations
+    measurement.plot_multiple(
+        E_times,
+        E_z_t,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Transmitted E_z-fields for various eps_r",
+        "E_z_t_eps_r",
+    )
+    measurement.plot_multiple(
+        E_times,
+        E_z_r,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Reflected E_z-fields for various eps_r",
+        "E_z_r_eps_r",
+    )
+    measurement.plot_multiple(
+        H_times,
+        H_x_t,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Transmitted H_x-fields for various eps_r",
+        "H_x_t_eps_r",
+    )
+    measurement.plot_multiple(
+        H_times,
+        H_x_r,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Reflected H_x-fields for various eps_r",
+        "H_x_r_eps_r",
+    )
+    measurement.plot_multiple(
+        H_times,
+        H_y_t,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Transmitted H_y-fields for various eps_r",
+        "H_y_t_eps_r",
+    )
+    measurement.plot_multiple(
+        H_times,
+        H_y_r,
+        labels,
+        "time [s]",
+        "E_z [V/m]",
+        "Reflected H_y-fields for various eps_r",
+        "H_y_r_eps_r",
+    )
 
-# Get the maximum amplitudes for the transmitted and reflected E and H fields to obtain the Transmission and reflection coefficients
-E_t_amps = np.array([np.max(abs(E)) for E in E_z_t])
+    # Get the maximum amplitudes for the transmitted and reflected E and H fields to obtain the Transmission and reflection coefficients
+    E_t_amps = np.array([np.max(abs(E)) for E in E_z_t])
 
-# When eps_r = 1: full transmission --> maximum of E_t_amps is used as normalization factor for transmission and reflection coefficients
-T_meas = E_t_amps / np.max(E_t_amps)
-T_theory = 2 / (np.sqrt(epsilons) + 1)
-print(T_meas)
-print(T_theory)
+    # When eps_r = 1: full transmission --> maximum of E_t_amps is used as normalization factor for transmission and reflection coefficients
+    T_meas = E_t_amps / np.max(E_t_amps)
+    T_theory = 2 / (np.sqrt(epsilons) + 1)
+    print(T_meas)
+    print(T_theory)
 
-measurement.plot_multiple(
-    [epsilons] * 2,
-    [T_meas, T_theory],
-    ["measured T", "predicted T"],
-    "eps_r [-]",
-    "Relative amplitude [-]",
-    "T coefficient for various eps_r",
-    "TRcoeff_eps_r",
-)
+    measurement.plot_multiple(
+        [epsilons] * 2,
+        [T_meas, T_theory],
+        ["measured T", "predicted T"],
+        "eps_r [-]",
+        "Relative amplitude [-]",
+        "T coefficient for various eps_r",
+        "TRcoeff_eps_r",
+    )
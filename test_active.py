@@ -0,0 +1,71 @@
+import importlib.util
+import numpy as np
+from constants import c
+import space
+import source
+import timeit
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = Delta / (2 * c * np.sqrt(2))  # [s]
+length = 0.5  # [m]
+
+
+def experiment(polarization, steps):
+    box = space.Space(length, length, steps * Delta_t, polarization)
+    box.set_source(
+        source.Gaussian_pulse(0.1, length / 2, 1, 60 * Delta_t, 15 * Delta_t)
+    )
+    box.define_discretization(Delta, Delta, Delta_t)
+    if polarization == "TM":
+        box.set_absorbing_boundary(20)
+    # The far probe only sees the pulse after most of the run
+    box.add_measurement_points([(0.12, length / 2), (length - 0.05, length / 2)])
+    return box
+
+
+backends = ["numpy"]
+if importlib.util.find_spec("numba") is not None:
+    backends.append("numba")
+    # Compiling the kernels (also for the views of the active region) outside of the timed runs
+    for polarization in ["TM", "TE"]:
+        for active_region in [False, True]:
+            experiment(polarization, 2).FDTD(
+                backend="numba", active_region=active_region
+            )
+
+# The waves need about (length - 0.1) / (c Delta_t) = 1130 steps to reach the far end of the grid
+# The default margin (space.ACTIVE_MARGIN cells) is approximate, the one derived from the time step (None) exact
+for backend in backends:
+    for polarization in ["TM", "TE"]:
+        times, measurements, saved = {}, {}, {}
+        for margin in [False, space.ACTIVE_MARGIN, None]:
+            box = experiment(polarization, 1200)
+            start = timeit.default_timer()
+            measurements[margin] = box.FDTD(
+                backend=backend,
+                active_region=margin is not False,
+                active_margin=margin,
+            )
+            times[margin] = timeit.default_timer() - start
+            saved[margin] = box.run_info["cell_updates_saved"]
+        for margin, name in [
+            (space.ACTIVE_MARGIN, "margin {}".format(space.ACTIVE_MARGIN)),
+            (None, "derived margin"),
+        ]:
+            difference = max(
+                np.max(np.abs(getattr(active, field) - getattr(full, field)))
+                / np.max(np.abs(getattr(full, field)))
+                for active, full in zip(measurements[margin], measurements[False])
+                for field in space.FIELDS[polarization]
+            )
+            print(
+                "{}, {}, {}: full grid {:.2f} s, active region {:.2f} s ({:.0%} of the cell updates skipped), max relative difference {:.2g}".format(
+                    polarization,
+                    backend,
+                    name,
+                    times[False],
+                    times[margin],
+                    saved[margin],
+                    difference,
+                )
+            )
@@ -0,0 +1,60 @@
+import importlib.util
+import sys
+import tracemalloc
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = 1 / (2 * c * np.sqrt(2 / Delta ** 2))  # [s]
+length = 0.2  # [m]
+steps = 10
+
+
+def experiment(polarization):
+    box = space.Space(length, length, steps * Delta_t, polarization)
+    box.set_source(
+        source.Gaussian_pulse(length / 2, length / 2, 1, 5 * Delta_t, 2 * Delta_t)
+    )
+    box.add_objects([dielectric.Circle(0.3 * length, 0.3 * length, 0.1 * length, 4)])
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.add_measurement_points(
+        [(0.75 * length, length / 2), (0.25 * length, 0.5 * length)]
+    )
+    return box
+
+
+# The updates of the time loop only use the preallocated fields and work buffers:
+# after the first step, the memory allocated and freed again within a step stays far below the size of a field
+# (numpy's ufuncs may use a fixed iteration buffer of up to 128 kB for the differences along y, whatever the grid)
+backends = ["numpy"]
+if importlib.util.find_spec("numba") is not None:
+    backends.append("numba")
+for backend in backends:
+    for polarization in ["TM", "TE", "TE+TM"]:
+        box = experiment(polarization)
+        box.prepare(eps_averaging=True, backend=backend)
+        fields = [getattr(box, name) for name in box.fields]
+        # Warming up: the first step compiles the kernels and creates the lazily allocated buffers
+        box.update_H(), box.update_E(), box.recorder.record(1, *fields)
+        tracemalloc.start()
+        blocks = sys.getallocatedblocks()
+        current, _ = tracemalloc.get_traced_memory()
+        for n in range(2, steps):
+            box.update_H()
+            box.update_E()
+            box.recorder.record(n, *fields)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        field_size = min(getattr(box, name).nbytes for name in box.fields)
+        print(
+            "{}, {}: {} B temporaries per step ({} field-sized), {} blocks leaked".format(
+                polarization,
+                backend,
+                peak - current,
+                (peak - current) // field_size,
+                sys.getallocatedblocks() - blocks,
+            )
+        )
@@ -0,0 +1,82 @@
+import numpy as np
+from constants import c
+import space
+import source
+
+# Phased array of 8 line sources, lambda / 2 apart along y, of a pulse modulated at 5 GHz
+f = 5 * 10 ** 9  # [Hz]
+spacing = c / f / 2  # [m]
+elements = 8
+prototype = source.Gaussian_modulated_rf_pulse(
+    0, 0, 1, 1.2 * 10 ** (-9), 3 * 10 ** (-10), 2 * np.pi * f
+)
+Delta = 2 * 10 ** (-3)  # [m]
+Delta_t = Delta / (2 * c * np.sqrt(2))  # [s]
+length = 0.5  # [m]
+center = (0.2, length / 2)  # [m]
+radius = 0.2  # [m]
+angles = np.radians(np.arange(-60, 61, 2))  # [rad]
+
+
+def experiment(delay, sources=None):
+    box = space.Space(length, length, 3.2 * 10 ** (-9))
+    if sources is None:
+        sources = source.line_array(
+            prototype,
+            center[0],
+            center[1] - (elements - 1) / 2 * spacing,
+            center[0],
+            center[1] + (elements - 1) / 2 * spacing,
+            elements,
+            delay,
+        )
+    box.add_sources(sources)
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.set_absorbing_boundary(15)
+    # Probes on an arc in front of the array
+    box.add_measurement_points(
+        [
+            (center[0] + radius * np.cos(angle), center[1] + radius * np.sin(angle))
+            for angle in angles
+        ]
+    )
+    box.FDTD()
+    return box, sources
+
+
+# 1. Every element carries the whole waveform of the prototype (envelope and carrier), delayed
+t = np.linspace(0, 3 * 10 ** (-9), 1000)
+delay = 10 ** (-10)  # [s]
+sources = source.line_array(prototype, 0, 0, 0, 1, elements, delay)
+print(
+    "max |element k(t) - prototype(t - k delay)| = {:.3g} A".format(
+        max(
+            np.max(np.abs(src.get_current(t) - prototype.get_current(t - k * delay)))
+            for k, src in enumerate(sources)
+        )
+    )
+)
+
+# 2. The fields of the array are the sum of the fields of its elements (all injected in the same step)
+box, sources = experiment(delay)
+total = np.zeros_like(box.recorder.data)
+for src in sources:
+    total += experiment(delay, [src])[0].recorder.data
+print(
+    "max |array - sum of the elements| / max |array| = {:.3g}".format(
+        np.max(np.abs(box.recorder.data - total)) / np.max(np.abs(box.recorder.data))
+    )
+)
+
+# 3. A delay of k delay per element steers the beam to sin(theta) = c delay / spacing
+# (the arc lies about one array length away, so the near field bends the beam by a few degrees)
+for delay in [0, 0.25 / f / 2, 0.5 / f / 2]:
+    box, _ = experiment(delay)
+    energy = np.sum(box.recorder.data[:, 2] ** 2, axis=-1)
+    print(
+        "delay {:.3g} s: beam at {:.0f} degrees, expected {:.0f} degrees".format(
+            delay,
+            np.degrees(angles[np.argmax(energy)]),
+            np.degrees(np.arcsin(c * delay / spacing)),
+        )
+    )
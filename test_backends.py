@@ -0,0 +1,68 @@
+import importlib.util
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import scenario
+import stopping
+import test_T_coefficients
+
+
+# The setup of test_simple.py: a line source in front of a dielectric half-space in a 1.5 m PEC box
+def simple():
+    x_length, y_length, d, eps_r = 1.5, 1.5, 0.2, 4
+    box = space.Space(x_length, y_length, 3 * 10 ** (-9))
+    box.add_objects(
+        [dielectric.Dielectric(1 / 2 * x_length, 0, 1 / 2 * x_length, y_length, eps_r)]
+    )
+    src = source.Gaussian_pulse(
+        1 / 2 * x_length - d, 1 / 2 * y_length, 1, 4 * 10 ** (-10), 10 ** (-10)
+    )
+    box.set_source(src)
+    Delta_p = src.get_lambda_min(eps_r) / 25
+    Delta_t = 1 / (3 * c * np.sqrt(2 / Delta_p ** 2))
+    box.define_discretization(Delta_p, Delta_p, Delta_t)
+    box.add_measurement_points(
+        [
+            (1 / 2 * x_length - d, 1 / 2 * y_length),
+            (1 / 2 * x_length + d, 1 / 2 * y_length),
+        ]
+    )
+    return box
+
+
+# The same scenario with another polarisation
+def polarized(box, polarization):
+    description = scenario.describe(box)
+    description["polarization"] = polarization
+    return scenario.build(description)
+
+
+if importlib.util.find_spec("numba") is None:
+    print("numba is not installed, nothing to compare")
+else:
+    # The numba kernels do the same floating point operations in the same order as numpy
+    setups = [("test_simple", simple(), {})] + [
+        (
+            "test_T_coefficients, eps_r = {}".format(eps_r),
+            test_T_coefficients.experiment(eps_r),
+            dict(eps_averaging=False, stop=stopping.Probe_deadline()),
+        )
+        for eps_r in (1, 4, 20)
+    ]
+    for name, box, options in setups:
+        for polarization in ["TM", "TE", "TE+TM"]:
+            data = {}
+            for backend in ["numpy", "numba"]:
+                run = polarized(box, polarization)
+                run.FDTD(backend=backend, **options)
+                data[backend] = np.asarray(run.recorder.data)
+            print(
+                "{}, {}: max |numba - numpy| = {:.3g} (max |field| {:.3g})".format(
+                    name,
+                    polarization,
+                    np.max(np.abs(data["numba"] - data["numpy"])),
+                    np.max(np.abs(data["numpy"])),
+                )
+            )
@@ -0,0 +1,108 @@
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import batch
+import timeit
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = 1 / (2 * c * np.sqrt(2 / Delta ** 2))  # [s]
+omegas = 2 * np.pi * np.array([2, 4]) * 10 ** 9  # [rad/s]
+
+
+# Spaces on the same grid which differ in their dielectric, source and probe
+def experiment(k, cells, steps, polarization="TM", features=False):
+    length = cells * Delta
+    box = space.Space(length, length, steps * Delta_t, polarization)
+    box.add_objects(
+        [
+            dielectric.Circle(
+                0.3 * length,
+                0.5 * length,
+                0.1 * length,
+                2 + k,
+                poles=[dielectric.Debye(2, 10 ** (-10))] if features else [],
+            )
+        ]
+    )
+    box.set_source(
+        source.Gaussian_pulse(
+            (0.4 + 0.01 * k) * length, 0.5 * length, 1, 20 * Delta_t, 6 * Delta_t
+        )
+    )
+    if features:
+        box.add_plane_wave(
+            source.Plane_wave(
+                0.2 * length,
+                0.2 * length,
+                0.6 * length,
+                0.6 * length,
+                1,
+                30 * Delta_t,
+                8 * Delta_t,
+            )
+        )
+    box.define_discretization(Delta, Delta, Delta_t)
+    if features:
+        box.set_absorbing_boundary(8)
+        box.add_frequency_monitor(omegas, x=0.8 * length, y=0.5 * length)
+        box.add_far_field(
+            omegas, 0.15 * length, 0.15 * length, 0.7 * length, 0.7 * length
+        )
+    box.add_measurement_points([(0.7 * length, (0.4 + 0.02 * k) * length)])
+    return box
+
+
+# Everything a space ends up with: the probe data and the running DFTs
+def results(box):
+    return [np.asarray(box.recorder.data)] + [
+        np.asarray(monitor.values) for monitor in box.running_dfts()
+    ]
+
+
+# 1. A batch gives the same results as separate runs
+for polarization, features in [
+    ("TM", False),
+    ("TE", False),
+    ("TE+TM", False),
+    ("TM", True),
+]:
+    spaces = [experiment(k, 64, 200, polarization, features) for k in range(4)]
+    batch.FDTD(spaces)
+    difference = 0
+    for k, box in enumerate(spaces):
+        single = experiment(k, 64, 200, polarization, features)
+        single.FDTD()
+        difference = max(
+            difference,
+            max(np.max(np.abs(a - b)) for a, b in zip(results(box), results(single))),
+        )
+    print(
+        "{}{}: max difference between the batch and separate runs {:.3g}".format(
+            polarization,
+            (
+                " (absorbing boundary, dispersion, plane wave, monitors)"
+                if features
+                else ""
+            ),
+            difference,
+        )
+    )
+
+# 2. Small grids: one time loop for the whole batch instead of one per space
+for cells, K in [(48, 16), (128, 16)]:
+    steps = 500
+    spaces = [experiment(k, cells, steps) for k in range(K)]
+    start = timeit.default_timer()
+    batch.FDTD(spaces)
+    time_batch = timeit.default_timer() - start
+    start = timeit.default_timer()
+    for k in range(K):
+        experiment(k, cells, steps).FDTD()
+    time_separate = timeit.default_timer() - start
+    print(
+        "{}^2 cells, K = {}: batch {:.2f} s, separate runs {:.2f} s ({:.2f}x faster)".format(
+            cells, K, time_batch, time_separate, time_separate / time_batch
+        )
+    )
@@ -0,0 +1,65 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import traceback
+import numpy as np
+from constants import c
+import space
+import source
+import cache
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = Delta / (2 * c * np.sqrt(2))  # [s]
+path = tempfile.mkdtemp()
+
+
+# A small scenario, so that the runs of the workers overlap with the stores of the others
+def experiment(steps):
+    box = space.Space(0.03, 0.03, steps * Delta_t)
+    box.set_source(source.Gaussian_pulse(0.015, 0.015, 1, 20 * Delta_t, 5 * Delta_t))
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.add_measurement_points([(0.02, 0.015)])
+    return box
+
+
+# Every worker runs the same scenarios (stored, loaded and refreshed by the others meanwhile), in a cache
+# which only holds a few entries, so the entries are also evicted while other workers load them
+def work(worker):
+    errors, results = [], {}
+    for round in range(40):
+        steps = 40 + round % 8
+        store = cache.Cache(path, max_bytes=4 * 1024, refresh=(worker + round) % 3 == 0)
+        try:
+            box = experiment(steps)
+            box.FDTD(cache=store)
+            results[steps] = np.array(box.recorder.data)
+        except Exception:
+            errors.append(traceback.format_exc())
+    return errors, results
+
+
+if __name__ == "__main__":
+    reference = {}
+    for steps in range(40, 48):
+        box = experiment(steps)
+        box.FDTD()
+        reference[steps] = np.asarray(box.recorder.data)
+    with multiprocessing.Pool(8) as pool:
+        outcomes = pool.map(work, range(8))
+    errors = [error for worker_errors, _ in outcomes for error in worker_errors]
+    difference = max(
+        np.max(np.abs(data - reference[steps]))
+        for _, results in outcomes
+        for steps, data in results.items()
+    )
+    # Stores which lost the race remove their temporary directory
+    leftovers = len([name for name in os.listdir(path) if ".tmp" in name])
+    print(
+        "8 workers x 40 runs of 8 scenarios: {} errors, max difference with uncached runs {:.3g}, {} temporary directories left".format(
+            len(errors), difference, leftovers
+        )
+    )
+    if len(errors) > 0:
+        print(errors[0])
+    shutil.rmtree(path)
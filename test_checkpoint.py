@@ -0,0 +1,86 @@
+import os
+import tempfile
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import stopping
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = 1 / (2 * c * np.sqrt(2 / Delta ** 2))  # [s]
+length = 0.1  # [m]
+steps, interrupt = 400, 150
+omegas = 2 * np.pi * np.array([2, 4]) * 10 ** 9  # [rad/s]
+
+
+def scattering():
+    box = space.Space(length, length, steps * Delta_t)
+    box.add_objects(
+        [
+            dielectric.Circle(
+                length / 2,
+                length / 2,
+                0.01,
+                2,
+                poles=[dielectric.Debye(4, 10 ** (-10))],
+            )
+        ]
+    )
+    box.add_plane_wave(
+        source.Plane_wave(0.03, 0.03, 0.04, 0.04, 1, 30 * Delta_t, 8 * Delta_t)
+    )
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.set_absorbing_boundary(10)
+    box.add_measurement_points([(0.08, 0.05)])
+    box.add_frequency_monitor(omegas, x=0.08, y=0.05)
+    box.add_far_field(omegas, 0.02, 0.02, 0.06, 0.06)
+    return box, {}
+
+
+def line_source(polarization="TM", active_margin=space.ACTIVE_MARGIN):
+    box = space.Space(length, length, steps * Delta_t, polarization)
+    box.add_objects([dielectric.Dielectric(0.07, 0.02, 0.01, 0.06, 4)])
+    box.set_source(source.Gaussian_pulse(0.03, 0.05, 1, 30 * Delta_t, 8 * Delta_t))
+    box.define_discretization(Delta, Delta, Delta_t)
+    if polarization == "TM":
+        box.set_absorbing_boundary(10)
+    box.add_measurement_points([(0.08, 0.05), (0.05, 0.09)])
+    return box, {"active_region": polarization == "TM", "active_margin": active_margin}
+
+
+# Everything a run ends up with: the probe data and the running DFTs
+def results(box):
+    return [np.asarray(box.recorder.data)] + [
+        np.asarray(monitor.values) for monitor in box.running_dfts()
+    ]
+
+
+# A run which is interrupted after a checkpoint and resumed gives exactly the results of an uninterrupted one
+path = os.path.join(tempfile.mkdtemp(), "checkpoint.npz")
+for name, build in [
+    ("CPML, plane wave, Debye, monitor and far field", scattering),
+    ("TM with an active region", line_source),
+    ("TM with an active region of derived margin", lambda: line_source("TM", None)),
+    ("TE+TM", lambda: line_source("TE+TM")),
+]:
+    box, options = build()
+    box.FDTD(**options)
+    reference = results(box)
+
+    box, options = build()
+    box.FDTD(
+        checkpoint=path,
+        checkpoint_interval=interrupt,
+        stop=stopping.Callback(lambda box, n: n == interrupt, interval=1),
+        **options
+    )
+    resumed = space.Space.resume(path)
+    print(
+        "{}: interrupted after {} steps, resumed until {}, max difference {:.3g}".format(
+            name,
+            box.run_info["steps"],
+            resumed.run_info["steps"],
+            max(np.max(np.abs(a - b)) for a, b in zip(results(resumed), reference)),
+        )
+    )
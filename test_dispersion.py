@@ -0,0 +1,93 @@
+import numpy as np
+from scipy import special as sp
+from constants import c
+import space
+import source
+import dielectric
+import timeit
+
+# Modulated pulse covering 1.5 - 3 GHz
+omegas = 2 * np.pi * np.linspace(1.5 * 10 ** 9, 3 * 10 ** 9, 7)  # [rad/s]
+sigma = 3 / (2 * np.pi * 10 ** 9)  # [s]
+# J0 [A], tc [s], sigma [s], omega_c [rad/s]
+src_parameters = (1, 3 * sigma, sigma, 2 * np.pi * 2.25 * 10 ** 9)
+Delta = 1.2 * 10 ** (-3)  # [m]
+length = 0.3  # [m]
+r_1, r_2 = 0.04, 0.08  # [m]
+
+# Materials filling the whole space: eps_r (eps_inf), conductivity and poles
+materials = {
+    "vacuum": dict(eps_r=1),
+    "conductor": dict(eps_r=4, sigma=0.05),
+    "Debye": dict(eps_r=2, poles=[dielectric.Debye(8, 1 / (2 * np.pi * 2 * 10 ** 9))]),
+    "Drude": dict(
+        eps_r=1, poles=[dielectric.Drude(2 * np.pi * 10 ** 9, 2 * np.pi * 2 * 10 ** 8)]
+    ),
+    "Lorentz": dict(
+        eps_r=2,
+        poles=[dielectric.Lorentz(2, 2 * np.pi * 4 * 10 ** 9, 2 * np.pi * 2 * 10 ** 8)],
+    ),
+}
+
+# 1. The spectra at two distances from a line source in a homogeneous medium are in the ratio of the Hankel
+# functions H0(k r_2) / H0(k r_1), with k = omega sqrt(eps(omega)) / c
+for name, parameters in materials.items():
+    box = space.Space(length, length, 9 * 10 ** (-9))
+    medium = dielectric.Dielectric(
+        -length, -length, 3 * length, 3 * length, **parameters
+    )
+    box.add_objects([medium])
+    box.set_source(
+        source.Gaussian_modulated_rf_pulse(length / 2, length / 2, *src_parameters)
+    )
+    box.define_discretization(Delta, Delta, Delta / (2 * c * np.sqrt(2)))
+    box.set_absorbing_boundary(20)
+    box.add_measurement_points([(length / 2 + r, length / 2) for r in (r_1, r_2)])
+    monitors = [
+        box.add_frequency_monitor(omegas, x=length / 2 + r, y=length / 2)
+        for r in (r_1, r_2)
+    ]
+    start = timeit.default_timer()
+    box.FDTD()
+    time = timeit.default_timer() - start
+    ratio = monitors[1].values / monitors[0].values
+
+    # Distances between the grid points of the source and the measurement points
+    distances = [
+        (int((length / 2 + r) / Delta) - int(length / 2 / Delta)) * Delta
+        for r in (r_1, r_2)
+    ]
+
+    def hankel_ratio(eps_r):
+        k = omegas / c * np.sqrt(eps_r)
+        return sp.hankel2(0, k * distances[1]) / sp.hankel2(0, k * distances[0])
+
+    print(
+        "{}: {:.1f} s, relative error {:.2g} (without the losses and dispersion: {:.2g})".format(
+            name,
+            time,
+            np.max(np.abs(ratio / hankel_ratio(medium.permittivity(omegas)) - 1)),
+            np.max(np.abs(ratio / hankel_ratio(medium.eps_r) - 1)),
+        )
+    )
+
+# 2. The auxiliary currents only take memory on the points of the dispersive dielectric
+box = space.Space(1, 1, 10 ** (-10))
+box.add_objects(
+    [
+        dielectric.Circle(
+            0.5, 0.5, 0.02, 2, sigma=0.01, poles=[dielectric.Debye(8, 10 ** (-10))]
+        )
+    ]
+)
+box.set_source(source.Gaussian_pulse(0.25, 0.5, 1, 10 ** (-11), 10 ** (-12)))
+box.define_discretization(Delta, Delta, Delta / (2 * c * np.sqrt(2)))
+box.add_measurement_points([(0.75, 0.5)])
+box.prepare()
+print(
+    "{} cells, fields {} B, lossy and dispersive points {} B".format(
+        box.N_x * box.N_y,
+        box.E_z.nbytes + box.H_x.nbytes + box.H_y.nbytes,
+        sum(material.nbytes() for material in box.materials),
+    )
+)
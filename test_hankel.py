@@ -8,6 +8,7 @@ import space
 import source
 import dielectric
 import measurement
+import cache
 
 import timeit
 
@@ -57,9 +58,21 @@ measurement_points = (
 # Debugging:
 print(box)
 
-# Getting measurments
+# Frequencies in the bandwidth of the source
+reffreq = np.linspace(
+    max(omega_c - 3 / sigma, 0), omega_c + 3 / sigma, 1000
+)  # array of omega
+
+# Getting measurments, with the spectrum of E_z (until the interference time) accumulated during the simulation
 max_times = box.add_measurement_points(measurement_points)
-measurements = box.FDTD(plot_space=True, visualize_fields=00)
+monitors = [
+    box.add_frequency_monitor(
+        reffreq, x=meas.pos_x, y=meas.pos_y, stop_time=meas.interference_time
+    )
+    for meas in box.measurement_points
+]
+# Replotting reuses the results of an identical earlier run (cache.Cache(refresh=True) recomputes them)
+measurements = box.FDTD(plot_space=True, visualize_fields=00, cache=cache.Cache())
 
 measurement.plot(
     measurements[0].time_E,
@@ -91,34 +104,21 @@ def SOURCE(omega):
     return fourier
 
 
-# restrict to bandwidth source
-pad_zeros = 100000
-reffreq = np.fft.rfftfreq(pad_zeros, d=Delta_t) * 2 * np.pi  # array of omega
-use_indices = np.where(
-    (reffreq >= (omega_c - 3 / sigma)) & (reffreq <= (omega_c + 3 / sigma))
-)
-reffreq = reffreq[use_indices]
-
-validE_z = measurements[0].E_z[: int(measurements[0].interference_time // Delta_t)]
-ref = np.fft.rfft(validE_z, n=pad_zeros) * Delta_t
-ref = ref[use_indices]
+ref = monitors[0].values
 
 
 def SOURCE_EXP(omega):
     t = measurements[0].time_E
     current = box.source.get_current(t)
-    fourier = np.fft.rfft(current, n=pad_zeros) * Delta_t
-    return fourier[use_indices]
+    fourier = np.exp(-1j * np.outer(omega, t)) @ current * Delta_t
+    return fourier
 
 
-for meas in measurements[1:]:
+for meas, monitor in zip(measurements[1:], monitors[1:]):
     # hankel
     h = E_z_hankel(meas.pos_x, meas.pos_y, reffreq)
-    # meas
-    validE_z = meas.E_z[: int(meas.interference_time // Delta_t)]
-    meas_e = np.fft.rfft(validE_z, n=pad_zeros) * Delta_t
-    # restrict to bandwith source
-    meas_e = meas_e[use_indices]
+    # meas: DFT of E_z until the interference time, restricted to the bandwidth of the source
+    meas_e = monitor.values
 
     plt.plot(reffreq, abs(meas_e) / SOURCE(reffreq), label="experimental")
     plt.plot(reffreq, abs(h), label="analytical")
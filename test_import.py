@@ -0,0 +1,32 @@
+import subprocess
+import sys
+import numpy as np
+
+# Time of 'import space' in a fresh interpreter (as in every batch worker), which should stay within a budget
+budget = 0.3  # [s]
+repeat = 5
+command = (
+    "import sys, time; start = time.perf_counter(); import space; "
+    "print(time.perf_counter() - start, 'matplotlib' in sys.modules, 'numba' in sys.modules)"
+)
+
+
+def experiment():
+    output = subprocess.run(
+        [sys.executable, "-c", command], capture_output=True, text=True, check=True
+    ).stdout.split()
+    return float(output[0]), output[1] == "True", output[2] == "True"
+
+
+# The first run fills the bytecode caches
+experiment()
+runs = [experiment() for _ in range(repeat)]
+times = np.array([run[0] for run in runs])
+print(
+    "import space: {:.3f} s (min {:.3f} s, max {:.3f} s, budget {:.3f} s)".format(
+        np.median(times), times.min(), times.max(), budget
+    )
+)
+print("imports matplotlib: {}, imports numba: {}".format(runs[0][1], runs[0][2]))
+if np.median(times) > budget or runs[0][1]:
+    sys.exit("import space is over its budget or imports matplotlib")
@@ -0,0 +1,61 @@
+import numpy as np
+from constants import c
+import space
+import source
+import timeit
+
+# Source parameters
+J0 = 1  # [A]
+sigma = 10 ** (-10)  # [s]
+tc = 4 * sigma  # [s]
+t_length = 2.5 * 10 ** (-9)  # [s]
+
+# Discretization parameters (shared by all experiments)
+Delta_p = source.Gaussian_pulse(0, 0, J0, tc, sigma).get_lambda_min(1) / 25
+Delta_t = 1 / (3 * c * np.sqrt(2 / Delta_p ** 2))
+
+# Measurement point, relative to the source (in cells)
+offset_x, offset_y = 20, 10
+
+
+def experiment(n_half, thickness=None):
+    # Square box of 2 * n_half cells with the source in the middle
+    length = 2 * n_half * Delta_p
+    box = space.Space(length, length, t_length)
+    src = source.Gaussian_pulse(
+        (n_half + 1 / 2) * Delta_p, (n_half + 1 / 2) * Delta_p, J0, tc, sigma
+    )
+    box.set_source(src)
+    box.define_discretization(Delta_p, Delta_p, Delta_t)
+    if thickness is not None:
+        box.set_absorbing_boundary(thickness)
+    interference_times = box.add_measurement_points(
+        [((n_half + offset_x + 1 / 2) * Delta_p, (n_half + offset_y + 1 / 2) * Delta_p)]
+    )
+    return box, interference_times[0]
+
+
+def run(box):
+    start = timeit.default_timer()
+    measurements = box.FDTD(plot_space=False)
+    return measurements[0].E_z.copy(), timeit.default_timer() - start
+
+
+# Padded PEC box: the smallest box in which no reflection reaches the measurement point in time
+n_half = offset_x
+while experiment(n_half)[1] < t_length:
+    n_half += 5
+box, _ = experiment(n_half)
+E_z_pec, time_pec = run(box)
+print("PEC box:  {} x {} cells, {:.2f} s".format(box.N_x, box.N_y, time_pec))
+
+# Box just around the measurement point, lined with a CPML of increasing thickness
+for thickness in [5, 10, 20]:
+    box, _ = experiment(offset_x + 10 + thickness, thickness)
+    E_z_pml, time_pml = run(box)
+    error = np.max(np.abs(E_z_pml - E_z_pec)) / np.max(np.abs(E_z_pec))
+    print(
+        "CPML ({} cells): {} x {} cells, {:.2f} s, speedup {:.1f}, relative reflection error {:.2g}".format(
+            thickness, box.N_x, box.N_y, time_pml, time_pec / time_pml, error
+        )
+    )
@@ -0,0 +1,84 @@
+import importlib.util
+import numpy as np
+from constants import c, eps_0, mu_0
+import space
+import source
+import dielectric
+import timeit
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = 1 / (2 * c * np.sqrt(2 / Delta ** 2))  # [s]
+tc, sigma = 40 * Delta_t, 10 * Delta_t  # [s]
+
+
+def experiment(polarization, length, steps, dielectrics=True, shift=0):
+    box = space.Space(length, length, steps * Delta_t, polarization)
+    box.set_source(
+        source.Gaussian_pulse(
+            length / 2 + Delta / 4, length / 2 + Delta / 4, 1, tc + shift, sigma
+        )
+    )
+    if dielectrics:
+        box.add_objects(
+            [
+                dielectric.Dielectric(
+                    0.7 * length, 0.2 * length, 0.1 * length, 0.6 * length, 4
+                ),
+                dielectric.Circle(0.3 * length, 0.3 * length, 0.1 * length, 6),
+            ]
+        )
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.add_measurement_points(
+        [
+            (length / 2 + 5.25 * Delta, length / 2 + 2.25 * Delta),
+            (0.75 * length + Delta / 4, length / 2 + Delta / 4),
+        ]
+    )
+    return box
+
+
+# 1. Duality: in vacuum, the TE H_z of a magnetic line current is the TM E_z of an electric one times eps_0 / mu_0
+# (H_z of step n lives at (n + 1/2) Delta_t, half a step after E_z, so the TE source is delayed by half a step;
+# the walls are out of reach)
+TM = experiment("TM", 0.12, 150, dielectrics=False).FDTD()[0]
+TE = experiment("TE", 0.12, 150, dielectrics=False, shift=Delta_t / 2).FDTD()[0]
+print(
+    "duality: max |E_z - H_z mu_0 / eps_0| / max |E_z| = {:.2g}".format(
+        np.max(np.abs(TM.E_z - TE.H_z * mu_0 / eps_0)) / np.max(np.abs(TM.E_z))
+    )
+)
+
+# 2-3. Both polarisations at once give the same fields as two separate runs, in about the same time
+# (the TE and TM fields share no data, only the per-step overhead of the time loop is saved:
+# measured 0.93-0.98 of the separate runs on 65^2 cells, 0.96-1.12 on 513^2 cells)
+backends = ["numpy"]
+if importlib.util.find_spec("numba") is not None:
+    backends.append("numba")
+    # Compiling the kernels outside of the timed runs
+    for polarization in ["TM", "TE", "TE+TM"]:
+        experiment(polarization, 0.02, 2).FDTD(backend="numba")
+for length, steps in [(0.064, 2000), (0.512, 300)]:
+    for backend in backends:
+        times, measurements = {}, {}
+        for polarization in ["TM", "TE", "TE+TM"]:
+            box = experiment(polarization, length, steps)
+            start = timeit.default_timer()
+            measurements[polarization] = box.FDTD(backend=backend)
+            times[polarization] = timeit.default_timer() - start
+        difference = max(
+            np.max(np.abs(getattr(both, field) - getattr(single, field)))
+            for polarization in ["TM", "TE"]
+            for both, single in zip(measurements["TE+TM"], measurements[polarization])
+            for field in space.FIELDS[polarization]
+        )
+        print(
+            "{}^2 cells, {}: TM {:.2f} s, TE {:.2f} s, TE+TM {:.2f} s ({:.2f} of TM and TE separately), max difference {:.2g}".format(
+                box.N_x,
+                backend,
+                times["TM"],
+                times["TE"],
+                times["TE+TM"],
+                times["TE+TM"] / (times["TM"] + times["TE"]),
+                difference,
+            )
+        )
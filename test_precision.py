@@ -0,0 +1,82 @@
+# Importing necessary libraries and files
+import numpy as np
+from scipy import special as sp
+from constants import mu_0, c
+import space
+import source
+import timeit
+
+# Same experiment as test_hankel.py, run with float64 and float32 fields
+x_source = 100  # [m]
+y_source = 100  # [m]
+J0 = 1  # [A]
+sigma = 5 * 10 ** (-9)  # [s]
+tc = 3 * sigma  # [s]
+src = source.Gaussian_pulse(x_source, y_source, J0, tc, sigma)
+x_length, y_length = 2 * x_source, 2 * y_source  # [m]
+t_length = 12 * tc  # [s]
+Delta_x = src.get_lambda_min(1) / 25
+Delta_y = Delta_x
+Delta_t = 1 / (c * np.sqrt(1 / Delta_x ** 2 + 1 / Delta_y ** 2)) / 3
+measurement_points = (
+    [(x_source, y_source)]
+    + [(1.1 * x_source, 1.1 * y_source)]
+    + [(1.2 * x_source, 1.24 * y_source)]
+)
+
+
+def experiment(dtype):
+    box = space.Space(x_length, y_length, t_length)
+    box.set_source(src)
+    box.define_discretization(Delta_x, Delta_y, Delta_t, dtype=dtype)
+    box.add_measurement_points(measurement_points)
+    start = timeit.default_timer()
+    measurements = box.FDTD(plot_space=False)
+    time = timeit.default_timer() - start
+    memory = box.E_z.nbytes + box.H_x.nbytes + box.H_y.nbytes
+    return measurements, time, memory
+
+
+## Frequency domain E_z (normalized to the source spectrum) as in test_hankel.py
+def spectrum(meas, pad_zeros=100000):
+    omega = np.fft.rfftfreq(pad_zeros, d=Delta_t) * 2 * np.pi
+    use_indices = np.where((omega > 0) & (omega <= 3 / sigma))
+    omega = omega[use_indices]
+    validE_z = meas.E_z[: int(meas.interference_time // Delta_t)].astype(np.float64)
+    E_z = np.fft.rfft(validE_z, n=pad_zeros)[use_indices] * Delta_t
+    source_spectrum = (
+        J0 * np.sqrt(2 * np.pi) * sigma * np.exp(-(sigma ** 2) * (omega ** 2) / 2)
+    )
+    return omega, E_z / source_spectrum
+
+
+## Analytical solution: E_z of a line source
+def E_z_hankel(x, y, omega):
+    z = omega / c * np.sqrt((x - x_source) ** 2 + (y - y_source) ** 2)
+    return -J0 * mu_0 * omega / 4 * sp.hankel2(0, z)
+
+
+results = {dtype: experiment(dtype) for dtype in (np.float64, np.float32)}
+measurements_64, time_64, memory_64 = results[np.float64]
+measurements_32, time_32, memory_32 = results[np.float32]
+print("float64: {:.2f} s, {:.1f} MB of fields".format(time_64, memory_64 / 10 ** 6))
+print(
+    "float32: {:.2f} s, {:.1f} MB of fields (speedup {:.2f})".format(
+        time_32, memory_32 / 10 ** 6, time_64 / time_32
+    )
+)
+
+for meas_64, meas_32 in zip(measurements_64[1:], measurements_32[1:]):
+    # Time domain: deviation of float32 with respect to float64
+    deviation = np.max(np.abs(meas_32.E_z - meas_64.E_z)) / np.max(np.abs(meas_64.E_z))
+    # Frequency domain: relative error of the amplitude with respect to the Hankel solution
+    omega, E_64 = spectrum(meas_64)
+    _, E_32 = spectrum(meas_32)
+    h = np.abs(E_z_hankel(meas_64.pos_x, meas_64.pos_y, omega))
+    error_64 = np.median(np.abs(np.abs(E_64) - h) / h)
+    error_32 = np.median(np.abs(np.abs(E_32) - h) / h)
+    print(
+        "({:g} , {:g}): float32 vs float64 max deviation {:.2g}, median Hankel error float64 {:.3g}, float32 {:.3g}".format(
+            meas_64.pos_x, meas_64.pos_y, deviation, error_64, error_32
+        )
+    )
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import decomposition
+import timeit
+
+
+def experiment():
+    # Defining experiment parameters
+    J0 = 1
+    simulation_time = 1 * 10 ** (-9)
+    # PEC box parameters
+    x_length, y_length = 2, 2  # [m]
+
+    # Initializing a space with a PEC bounding box
+    box = space.Space(x_length, y_length, simulation_time)
+    box.add_objects(
+        [dielectric.Dielectric(1 / 2 * x_length, 0, 1 / 2 * x_length, y_length, 4)]
+    )
+    src = source.Gaussian_pulse(
+        1 / 2 * x_length, 1 / 2 * y_length, J0, 4 * 10 ** (-10), 10 ** (-10)
+    )
+    box.set_source(src)
+
+    Delta_p = src.get_lambda_min(4) / 25
+    Delta_t = 1 / (3 * c * np.sqrt(2 / Delta_p ** 2))
+    box.define_discretization(Delta_p, Delta_p, Delta_t)
+
+    # Measurement parameters
+    measurement_points = [(1 / 4 * x_length, 1 / 2 * y_length)]
+    box.add_measurement_points(measurement_points)
+    return box
+
+
+# Strong scaling: the same problem divided over an increasing amount of workers
+if __name__ == "__main__":
+    box = experiment()
+    print("Grid: {} x {} cells, {} time steps".format(box.N_x, box.N_y, box.N_t))
+    start = timeit.default_timer()
+    reference_E_z = box.FDTD(plot_space=False)[0].E_z.copy()
+    time_single = timeit.default_timer() - start
+    print("single process: {:.2f} s".format(time_single))
+
+    workers = 1
+    while workers <= os.cpu_count():
+        box = experiment()
+        start = timeit.default_timer()
+        measurements = decomposition.FDTD(box, workers=workers)
+        time = timeit.default_timer() - start
+        error = np.max(np.abs(measurements[0].E_z - reference_E_z))
+        print(
+            "{} workers: {:.2f} s, speedup {:.2f}, efficiency {:.2f}, max deviation {:.2g}".format(
+                workers,
+                time,
+                time_single / time,
+                time_single / time / workers,
+                error,
+            )
+        )
+        workers *= 2
@@ -6,6 +6,7 @@ import space
 import source
 import dielectric
 import measurement
+import snapshots
 
 # Defining experiment parameters
 J0 = 1
@@ -41,6 +42,8 @@ measurement_titles = ["Reflected field", "Transmitted field"]
 # Getting measurments
 box.add_measurement_points(measurement_points, measurement_titles)
 measurements = box.FDTD(plot_space=True, visualize_fields=1000, eps_averaging=False)
+# Rendering the field snapshots that were streamed to disk during the simulation
+snapshots.render("./plots/snapshots")
 
 for measure in measurements:
     measure.plot_all(measure.title, indicators=False)
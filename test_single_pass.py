@@ -0,0 +1,59 @@
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import timeit
+
+Delta = 10 ** (-3)  # [m]
+Delta_t = Delta / (2 * c * np.sqrt(2))  # [s]
+
+
+# A line source in front of a dielectric half-space in a PEC box: nothing runs between the H and E updates
+def experiment(cells, steps):
+    length = (cells - 1) * Delta
+    box = space.Space(length, length, steps * Delta_t)
+    box.add_objects([dielectric.Dielectric(length / 2, 0, length / 2, length, 4)])
+    box.set_source(
+        source.Gaussian_pulse(length / 4, length / 2, 1, 40 * Delta_t, 10 * Delta_t)
+    )
+    box.define_discretization(Delta, Delta, Delta_t)
+    box.add_measurement_points([(length / 3, length / 2)])
+    return box
+
+
+# The time loop of Space.FDTD with the numba backend, with the H and E updates in one sweep or in two passes
+def run(cells, steps, single_pass):
+    box = experiment(cells, steps)
+    box.prepare(eps_averaging=False, backend="numba")
+    box.single_pass = single_pass
+    box.set_stop()
+    box.set_profiler()
+    box.set_active_region()
+    box.checkpoint = None
+    start = timeit.default_timer()
+    box.time_steps(1)
+    return timeit.default_timer() - start, np.asarray(box.recorder.data)
+
+
+# Compiling the kernels outside of the timed runs
+experiment(32, 3).FDTD(backend="numba")
+# The best of 2 runs each, alternating
+for cells, steps in [(513, 2000), (2049, 150), (4097, 40)]:
+    runs = [
+        [run(cells, steps, single_pass) for single_pass in [False, True]]
+        for _ in range(2)
+    ]
+    (time_two, two), (time_single, single) = [
+        (min(time for time, _ in results), results[0][1]) for results in zip(*runs)
+    ]
+    print(
+        "{}^2 cells, {} steps: two passes {:.2f} s, single pass {:.2f} s ({:.2f}x faster), max difference {:.3g}".format(
+            cells,
+            steps,
+            time_two,
+            time_single,
+            time_two / time_single,
+            np.max(np.abs(single - two)),
+        )
+    )
@@ -0,0 +1,65 @@
+import numpy as np
+from constants import c
+import space
+import source
+import snapshots
+import timeit
+
+# Box of test_hankel.py (with a coarser grid), timed without and with streamed field snapshots
+x_source = 100  # [m]
+y_source = 100  # [m]
+J0 = 1  # [A]
+sigma = 5 * 10 ** (-9)  # [s]
+tc = 3 * sigma  # [s]
+src = source.Gaussian_pulse(x_source, y_source, J0, tc, sigma)
+x_length, y_length = 2 * x_source, 2 * y_source  # [m]
+t_length = 12 * tc  # [s]
+Delta_x = src.get_lambda_min(1) / 10
+Delta_y = Delta_x
+Delta_t = 1 / (c * np.sqrt(1 / Delta_x ** 2 + 1 / Delta_y ** 2)) / 3
+path = "./plots/snapshots"
+
+
+def experiment(visualize_fields, decimation=1, repeat=2):
+    times = []
+    for _ in range(repeat):
+        box = space.Space(x_length, y_length, t_length)
+        box.set_source(src)
+        box.define_discretization(Delta_x, Delta_y, Delta_t)
+        box.add_measurement_points([(1.1 * x_source, 1.1 * y_source)])
+        start = timeit.default_timer()
+        box.FDTD(
+            visualize_fields=visualize_fields,
+            snapshot_path=path,
+            snapshot_decimation=decimation,
+        )
+        times.append(timeit.default_timer() - start)
+    # Best of a few runs: steps per second
+    return box, (box.N_t - 1) / min(times)
+
+
+box, rate_off = experiment(0)
+print(
+    "{} x {} cells, {} steps: {:.0f} steps/s without snapshots".format(
+        box.N_x, box.N_y, box.N_t, rate_off
+    )
+)
+for visualize_fields, decimation in [(5, 4), (10, 2), (50, 1)]:
+    box, rate_on = experiment(visualize_fields, decimation)
+    store = snapshots.load(path)
+    print(
+        "every {} steps, decimation {}: {:.0f} steps/s ({:+.1f} %), {} frames of {:.2f} MB, {} dropped".format(
+            visualize_fields,
+            decimation,
+            rate_on,
+            (rate_on / rate_off - 1) * 100,
+            len(store["steps"]),
+            store["E_z"][0].nbytes * 2 / 10 ** 6,
+            np.sum(store["steps"] < 0),
+        )
+    )
+
+# Rendering happens afterwards, from the store on disk (frames of the last experiment)
+start = timeit.default_timer()
+snapshots.render(path)
+print("rendering: {:.2f} s".format(timeit.default_timer() - start))
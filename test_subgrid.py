@@ -0,0 +1,60 @@
+import numpy as np
+from constants import c
+import space
+import source
+import dielectric
+import timeit
+
+# A small cylinder with a high eps_r in a large vacuum box, lined with a CPML
+eps_r = 10
+Delta_p = 0.003  # [m] (lambda_min / 20 in vacuum)
+t_length = 1.5 * 10 ** (-9)  # [s]
+src_parameters = (1, 4 * 10 ** (-10), 10 ** (-10))  # J0 [A], tc [s], sigma [s]
+
+
+## Position of coarse cell k (slightly inside, so the coarse and fine grids pick the same points)
+def p(k):
+    return (k + 0.05) * Delta_p
+
+
+def experiment(ratio, refine):
+    # ratio: cells (and time step) ratio times smaller than Delta_p, everywhere or only around the cylinder
+    Delta = Delta_p if refine else Delta_p / ratio
+    box = space.Space(100 * Delta_p, 80 * Delta_p, t_length)
+    cylinder = dielectric.Circle(50 * Delta_p, 40 * Delta_p, 6.5 * Delta_p, eps_r)
+    box.add_objects([cylinder])
+    box.set_source(source.Gaussian_pulse(p(17), p(40), *src_parameters))
+    box.define_discretization(Delta, Delta, 1 / (3 * c * np.sqrt(2 / Delta ** 2)))
+    if refine and ratio > 1:
+        box.add_refinement(cylinder, ratio, margin=3)
+    box.set_absorbing_boundary(10 * int(Delta_p / Delta))
+    box.add_measurement_points(
+        [(p(33), p(40)), (p(67), p(40)), (p(50), p(40))],
+        ["Reflected field", "Transmitted field", "Inside the cylinder"],
+    )
+    start = timeit.default_timer()
+    box.FDTD()
+    time = timeit.default_timer() - start
+    cells = box.N_x * box.N_y + sum(
+        patch.fine.N_x * patch.fine.N_y for patch in box.subgrids
+    )
+    # E_z at the time steps of the coarse grid
+    stride = 1 if refine else ratio
+    return [meas.E_z[::stride] for meas in box.measurement_points], cells, time
+
+
+# Reference: the whole space with cells 3 times smaller
+reference, cells_ref, time_ref = experiment(3, refine=False)
+print("fine everywhere: {} cells, {:.2f} s".format(cells_ref, time_ref))
+# Coarse grid without (ratio 1) and with a refinement patch around the cylinder
+for ratio in [1, 3, 5]:
+    E_z, cells, time = experiment(ratio, refine=True)
+    errors = [
+        np.max(np.abs(E[: len(ref)] - ref[: len(E)])) / np.max(np.abs(ref))
+        for E, ref in zip(E_z, reference)
+    ]
+    print(
+        "coarse, refinement ratio {}: {} cells, {:.2f} s, relative error (reflected, transmitted, inside) {}".format(
+            ratio, cells, time, ", ".join("{:.2g}".format(error) for error in errors)
+        )
+    )
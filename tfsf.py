@@ -0,0 +1,74 @@
+# Importing necessary libraries and files
+import numpy as np
+from constants import eps_0, c
+
+
+### TFSF class: total-field/scattered-field injection of a plane wave (source.Plane_wave) travelling along +x
+class TFSF:
+    """Injects a plane wave into a rectangle of the grid (the total-field region)
+
+    The incident field is computed on a 1D auxiliary grid with the same
+    Delta_x and Delta_t, so it has exactly the numerical dispersion of the
+    2D grid for propagation along x. The update equations of the fields
+    just in- and outside the rectangle are corrected with this incident
+    field: inside, E_z and H are the total fields; outside, only the
+    scattered fields remain. The edges of the rectangle should lie in
+    vacuum and outside of an absorbing boundary.
+    """
+
+    ## Build the auxiliary grid for a space whose update coefficients are initialized
+    def __init__(self, box, wave):
+        self.box = box
+        # Total-field region: the E_z points i0..i1, j0..j1
+        self.i0 = int(wave.pos_x / box.Delta_x)
+        self.i1 = int((wave.pos_x + wave.width) / box.Delta_x)
+        self.j0 = int(wave.pos_y / box.Delta_y)
+        self.j1 = int((wave.pos_y + wave.height) / box.Delta_y)
+        if not (1 <= self.i0 <= self.i1 <= box.N_x - 2) or not (
+            1 <= self.j0 <= self.j1 <= box.N_y - 2
+        ):
+            raise ValueError(
+                "The total-field region of a plane wave must lie inside the space"
+            )
+
+        # Auxiliary grid: e[k] at the E_z points i = k + offset, h[k] at the H_y points in between
+        # The hard source e[0] lies two cells before the region. The grid is long enough that
+        # the reflection at its far end doesn't return to the region during the simulation.
+        self.offset = self.i0 - 2
+        courant = c * box.Delta_t / box.Delta_x
+        length = self.i1 - self.offset + int(courant * box.N_t / 2) + 10
+        self.e = np.zeros(length, dtype=box.dtype)
+        self.h = np.zeros(length - 1, dtype=box.dtype)
+        self.C_e = box.dtype.type(box.Delta_t / (eps_0 * box.Delta_x))
+        # Incident E_z at the hard source for every time step
+        self.waveform = wave.get_field(np.arange(box.N_t) * box.Delta_t).astype(
+            box.dtype
+        )
+        self.e[0] = self.waveform[0]
+
+    ## Correct the H fields next to the region after their regular update, then step the auxiliary H
+    def update_H(self):
+        box, e = self.box, self.e
+        i0, i1, j0, j1, a = self.i0, self.i1, self.j0, self.j1, self.offset
+        # H_y just left and right of the region
+        box.H_y[i0 - 1, j0 : j1 + 1] -= box.C_hy * e[i0 - a]
+        box.H_y[i1, j0 : j1 + 1] += box.C_hy * e[i1 - a]
+        # H_x just below and above the region
+        box.H_x[i0 : i1 + 1, j0 - 1] += box.C_hx * e[i0 - a : i1 + 1 - a]
+        box.H_x[i0 : i1 + 1, j1] -= box.C_hx * e[i0 - a : i1 + 1 - a]
+        # Incident H_y (the incident H_x is zero)
+        self.h += box.C_hy * (e[1:] - e[:-1])
+
+    ## Correct E_z at the left and right edges of the region after its regular update, then step the auxiliary E_z
+    def update_E(self, n):
+        box, h = self.box, self.h
+        i0, i1, j0, j1, a = self.i0, self.i1, self.j0, self.j1, self.offset
+        box.E_z[i0, j0 : j1 + 1] -= box.C_ezx[i0 - 1, j0 - 1 : j1] * h[i0 - 1 - a]
+        box.E_z[i1, j0 : j1 + 1] += box.C_ezx[i1 - 1, j0 - 1 : j1] * h[i1 - a]
+        # Incident E_z, driven by the hard source
+        self.e[1:-1] += self.C_e * (h[1:] - h[:-1])
+        self.e[0] = self.waveform[n]
+
+    ## The arrays of the auxiliary grid (the state of the injection)
+    def arrays(self):
+        return [self.e, self.h]